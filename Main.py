@@ -2,20 +2,35 @@
 # IMPORTS
 # -------------------------------
 import customtkinter as ctk
-from datetime import datetime
+from tkinter import filedialog, messagebox
 import os
 from database import VehicleDatabase
-from utils import assign_warranty
+from remote_database import RemoteVehicleDatabase
+from async_database import AsyncVehicleDatabase
+from change_watcher import ChangeWatcher
+from utils import fill_stale_warranties
+from inventory_index import InventoryIndex, RETAIL_BUCKET_ORDER, WHOLESALE_BUCKET
+from importer import read_import_file, format_import_report
 from popups.add_vehicle_popup import AddVehiclePopup
 from popups.delete_vehicle_popup import DeleteVehiclePopup
 from popups.notes_popup import NotesPopup
 from popups.photo_tracker_popup import PhotoTrackerPopup
-from functools import partial
+from popups.notes_search_popup import NotesSearchPopup
+from popups.popup_manager import PopupManager
+from widgets.vehicle_grid import VehicleGrid, GridSeparator
 
 # -------------------------------
 # GLOBAL CONFIGURATION
 # -------------------------------
 DB_FILE = os.path.join(os.path.dirname(__file__), "vehicles.db")
+DB_POOLED = False  # WAL + reader pool; only when vehicles.db lives on this machine
+DB_WRITE_BEHIND = False  # batch dropdown/notes/photos writes into one commit per burst (opt-in)
+# URL of a running inventory_service (e.g. "http://10.0.0.5:8765") to use instead of DB_FILE
+DB_SERVICE_URL = os.environ.get("VEHICLETRACKER_SERVICE", "")
+WARRANTY_CHECK_MS = 60 * 60 * 1000  # how often to check for a new warranty year
+LOAD_FIRST_PAGE = 200    # vehicles in the first page: enough to fill the screen right away
+LOAD_PAGE_SIZE = 5000    # vehicles per page after that
+CHANGE_POLL_MS = 1000    # how often to look for edits made on other workstations
 ctk.set_appearance_mode("system")
 ctk.set_default_color_theme("blue")
 
@@ -38,11 +53,33 @@ class VehicleTracker(ctk.CTk):
         self.DROPDOWN_W = 90
         self.NOTES_W = 60
         self.NOTES_PAD_RIGHT = 12
-        self.ROW_PADY = 6
+        self.ROW_HEIGHT = 44
+        self.WHOLESALE_SEPARATOR = GridSeparator(
+            "--------------------------------------------------------------------------------------------------------------------------- "
+            "Wholesale"
+            "-------------------------------------------------------------------------------------------------- "
+        )
 
         # Vehicles list and database
-        self.vehicles = []
-        self.db = VehicleDatabase()
+        self.inventory = InventoryIndex()
+        self._load_generation = 0  # bumped on every reload so stale pages are ignored
+        if DB_SERVICE_URL:
+            self.db = RemoteVehicleDatabase(DB_SERVICE_URL)
+        else:
+            self.db = VehicleDatabase(DB_FILE, pooled=DB_POOLED, write_behind=DB_WRITE_BEHIND)
+        self.db_async = AsyncVehicleDatabase(self.db, self, on_error=self.show_db_error)
+        # A failed timed flush stays queued and is retried; tell the user (on the Tk thread)
+        self.db.on_flush_error = lambda error: self.db_async.submit(
+            lambda: None, callback=lambda _: self.show_db_error(error))
+        # With write-behind, an edit is only "saved" once its batch is committed
+        self.db.on_flushed = lambda: self.db_async.submit(
+            lambda: None, callback=lambda _: self.show_feedback("Changes saved!"))
+        self.watcher = ChangeWatcher(self.db)
+        self._poll_pending = False
+        self._local_edits = set()  # ids edited here since the last poll was sent
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.popups = PopupManager()
+        self.register_popups()
 
         # Dashboard label
         self.label = ctk.CTkLabel(self, text="Tracker Dashboard",
@@ -72,20 +109,58 @@ class VehicleTracker(ctk.CTk):
         self.current_view = "ALL"
         # Load vehicles from database
         self.load_vehicles()
+        self.after(WARRANTY_CHECK_MS, self.check_warranty_year)
+        self.after(CHANGE_POLL_MS, self.poll_changes)
+
+        # Build the light popups while idle so their first open is instant
+        self.after_idle(lambda: self.popups.prewarm("add_vehicle"))
+        self.after_idle(lambda: self.popups.prewarm("sell_vehicle"))
 
 
     # -------------------------------
     # HELPER METHODS
     # -------------------------------
-    def show_feedback(self, message, duration=1000):
+    def on_close(self):
+        """Finish in-flight and queued database writes before the window goes away."""
+        self.db_async.shutdown(wait=True)
+        self.db.on_flushed = self.db.on_flush_error = None  # the worker thread is gone
+        while True:
+            try:
+                self.db.flush()
+                break
+            except Exception as e:
+                if not messagebox.askretrycancel(
+                    "Unsaved Changes",
+                    f"Some changes could not be saved:\n{e}\n\n"
+                    "Retry to try again, or Cancel to discard them and close."
+                ):
+                    self.db.discard_pending()
+                    break
+        self.destroy()
+
+    def show_feedback(self, message, duration=1000, color="green"):
         """Display a temporary feedback message."""
-        self.feedback_label.configure(text=message)
+        self.feedback_label.configure(text=message, text_color=color)
         self.after(duration, lambda: self.feedback_label.configure(text=""))
 
+    def show_pending(self, message):
+        """Display a message that stays until the pending database call reports back."""
+        self.feedback_label.configure(text=message, text_color="gray")
+
+    def show_db_error(self, error):
+        self.show_feedback(f"Database error: {error}", duration=5000, color="red")
+
+    def show_saved(self, message):
+        """Confirm a finished write; a write-behind one is only queued until on_flushed reports it."""
+        if getattr(self.db, "write_behind", False):
+            self.show_pending("Saving changes...")
+        else:
+            self.show_feedback(message)
+
     def get_retail_category(self, vehicle):
-        make = vehicle.get("Make", "").lower()
-        cert = vehicle.get("Certification", "").lower()  # or however you store CPO / As-Is
-        status = vehicle.get("Status", "Undecided")
+        make = vehicle.make.lower()
+        cert = vehicle.certification.lower()  # or however you store CPO / As-Is
+        status = vehicle.status
 
         if status == "Wholesale":
             return None
@@ -117,7 +192,7 @@ class VehicleTracker(ctk.CTk):
         top_bar = ctk.CTkFrame(self)
         top_bar.grid(row=2, column=0, padx=20, pady=10, sticky="ew")
         top_bar.grid_columnconfigure(0, weight=1)
-        top_bar.grid_columnconfigure(1, weight=1)
+        top_bar.grid_columnconfigure(2, weight=1)
 
         # LEFT: Action buttons
         action_button_frame = ctk.CTkFrame(top_bar)
@@ -144,9 +219,32 @@ class VehicleTracker(ctk.CTk):
         )
         self.photos_button.grid(row=0, column=2, padx=10, pady=10)
 
+        self.import_button = ctk.CTkButton(
+            action_button_frame,
+            text="Import",
+            command=self.open_import_dialog
+        )
+        self.import_button.grid(row=0, column=3, padx=10, pady=10)
+
+        # MIDDLE: Notes search
+        search_frame = ctk.CTkFrame(top_bar)
+        search_frame.grid(row=0, column=1, padx=10)
+
+        self.search_entry = ctk.CTkEntry(search_frame, width=220, placeholder_text="Search notes...")
+        self.search_entry.grid(row=0, column=0, padx=(10, 5), pady=10)
+        self.search_entry.bind("<Return>", lambda event: self.search_notes())
+
+        self.search_button = ctk.CTkButton(
+            search_frame,
+            text="Search",
+            width=80,
+            command=self.search_notes
+        )
+        self.search_button.grid(row=0, column=1, padx=(5, 10))
+
         # RIGHT: View buttons
         view_button_frame = ctk.CTkFrame(top_bar)
-        view_button_frame.grid(row=0, column=1, sticky="e")
+        view_button_frame.grid(row=0, column=2, sticky="e")
 
         self.all_view_button = ctk.CTkButton(
             view_button_frame,
@@ -196,288 +294,192 @@ class VehicleTracker(ctk.CTk):
             lbl.grid(row=0, column=col, padx=8, pady=8, sticky="w")
 
     def setup_vehicle_list_frame(self):
-        """Scrollable frame to display vehicles."""
+        """Virtualized grid to display vehicles."""
         self.list_frame = ctk.CTkFrame(self.container_frame)
         self.list_frame.grid(row=1, column=0, sticky="nsew")
         self.list_frame.grid_rowconfigure(0, weight=1)
         self.list_frame.grid_columnconfigure(0, weight=1)
 
-        self.scrollable_frame = ctk.CTkScrollableFrame(self.list_frame)
-        self.scrollable_frame.grid(row=0, column=0, sticky="nsew")
+        self.vehicle_grid = VehicleGrid(
+            self.list_frame,
+            col_widths=self.COL_WIDTHS,
+            row_font=self.ROW_FONT,
+            row_height=self.ROW_HEIGHT,
+            dropdown_w=self.DROPDOWN_W,
+            notes_w=self.NOTES_W,
+            notes_pad_right=self.NOTES_PAD_RIGHT,
+            on_status_change=self._on_status_change,
+            on_location_change=self._on_location_change,
+            on_notes=self.open_notes_popup
+        )
+        self.vehicle_grid.grid(row=0, column=0, sticky="nsew")
 
 
     # -------------------------------
     # DATABASE / LOADING
     # -------------------------------
     def load_vehicles(self):
-        """Load vehicles from database into memory and refresh list."""
-        self.vehicles.clear()
-        rows = self.db.get_vehicles()
-
-        for row in rows:
-            vehicle_data = {
-                "id": row["id"],
-                "Stock Number": row["stock_number"],
-                "VIN": row["vin"],
-                "Make": row["make"],
-                "Model": row["model"],
-                "Year": row["year"],
-                "Mileage": row["mileage"],
-                "Certification": row["certification"] or "",
-                "notes": row["notes"] or "",
-                "Status": row["status"] or "Undecided",
-                "Location": row["location"] or "Service",
-                "Traded In By": row["traded_in_by"] or "",
-                "warranty": assign_warranty(row["make"], int(row["year"] or datetime.now().year),
-                                            int(row["mileage"] or 0)),
-                "photos_taken": row["photos_taken"] or "No"
-            }
-            self.vehicles.append(vehicle_data)
+        """
+        Load vehicles from the database page by page (keyset-paginated, on the
+        worker thread); the grid fills in as each page arrives.
+        """
+        self._load_generation += 1
+        self.show_pending("Loading vehicles...")
+        # Queued ahead of the first page, so changes made during the load are picked up after it
+        self.db_async.submit(self.watcher.start)
+        self._fetch_next_page(self._load_generation, None, LOAD_FIRST_PAGE)
+
+    def _fetch_next_page(self, generation, after, limit):
+        self.db_async.submit(self._fetch_vehicles, after, limit,
+                             callback=lambda page: self._on_vehicles_page(generation, after, limit, page),
+                             errback=self.show_db_error)
+
+    def _fetch_vehicles(self, after, limit):
+        # Runs on the database worker thread: no widget access here
+        return fill_stale_warranties(self.db.get_vehicles_page(after=after, limit=limit))
+
+    def _on_vehicles_page(self, generation, after, limit, page):
+        if generation != self._load_generation:
+            return  # a newer reload has started
+        if after is None:
+            self.inventory.load(page)
+        else:
+            self.inventory.extend(page)
+        self.refresh_vehicle_list()
 
+        if len(page) == limit:
+            self._fetch_next_page(generation, page[-1].id, LOAD_PAGE_SIZE)
+        else:
+            self.feedback_label.configure(text="")
+
+    def check_warranty_year(self):
+        """Refresh stored warranties once the year rolls over (a no-op otherwise)."""
+        def on_refreshed(updated):
+            if updated:
+                self.load_vehicles()
+
+        self.db_async.refresh_warranties(callback=on_refreshed, errback=self.show_db_error)
+        self.after(WARRANTY_CHECK_MS, self.check_warranty_year)
+
+    def poll_changes(self):
+        """Pick up edits made on other workstations (cheap when there are none)."""
+        if not self._poll_pending:
+            self._poll_pending = True
+            self._local_edits.clear()
+            self.db_async.submit(self.watcher.poll, callback=self._on_changes, errback=self._on_poll_failed)
+        self.after(CHANGE_POLL_MS, self.poll_changes)
+
+    def _on_poll_failed(self, error):
+        # Transient (e.g. database busy); the next poll retries
+        self._poll_pending = False
+
+    def _on_changes(self, changes):
+        self._poll_pending = False
+        if not changes:
+            return
+        if changes.get("reload"):
+            self.load_vehicles()
+            return
+
+        dirty = False
+        for vehicle in fill_stale_warranties(changes["changed"]):
+            # A local edit made after the poll was sent is newer than this row
+            if vehicle.id in self._local_edits:
+                continue
+            current = self.inventory.get(vehicle.id)
+            if current is None or (current.stock_number, current.vin) != (vehicle.stock_number, vehicle.vin):
+                self.inventory.add(vehicle)
+                dirty = True
+                continue
+            # Edit the loaded record in place so the row keeps its place in the view
+            edits = {field: value for field, value in vehicle.as_dict().items() if getattr(current, field) != value}
+            if edits:
+                self.inventory.update(current, **edits)
+                dirty = True
+        for vehicle_id in changes["removed"]:
+            dirty = self.inventory.remove(vehicle_id) is not None or dirty
+        if dirty:
+            self.refresh_vehicle_list()
+
+    # -------------------------------
+    # INCREMENTAL UPDATES
+    # -------------------------------
+    def on_vehicle_added(self, stock_number):
+        """Patch a newly added vehicle into the list instead of reloading everything."""
+        def patch(vehicle):
+            if vehicle is None:
+                return
+            self.inventory.add(fill_stale_warranties([vehicle])[0])
+            self.refresh_vehicle_list()
+
+        self.db_async.get_vehicle_by_stock(stock_number, callback=patch, errback=self.show_db_error)
+
+    def on_vehicle_sold(self, stock_number):
+        """Drop a sold vehicle from the list instead of reloading everything."""
+        self.inventory.remove_stock(stock_number)
         self.refresh_vehicle_list()
 
+    def on_vehicle_edited(self, vehicle):
+        """Repaint one vehicle's row after its record was edited in place."""
+        self.vehicle_grid.refresh_item(vehicle)
+
 
     # -------------------------------
     # REFRESH VEHICLE LIST
     # -------------------------------
     def refresh_vehicle_list(self):
-        # Clear existing rows
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-
-        self.status_vars = {}
-        self.location_vars = {}
-
-        for col, minw in enumerate(self.COL_WIDTHS):
-            self.scrollable_frame.grid_columnconfigure(
-                col, weight=1, minsize=minw, uniform="fullwidth"
-            )
+        """
+        Rebuild the ordered item list for the current view and reconcile the grid.
+        The grid diffs it against what is on screen and only rebinds rows that changed.
+        """
+        return self.vehicle_grid.set_items(self.build_view_items())
 
-        row_idx = 0
+    def build_view_items(self):
+        """Return the vehicles (and separators) to display for the current view, in order."""
+        items = []
 
         # -------------------------------
         # ALL VIEW
         # -------------------------------
         if self.current_view == "ALL":
-            buckets = {
-                "kia_cpo": [],
-                "kia_limited": [],
-                "kia_as_is": [],
-                "non_kia_limited": [],
-                "non_kia_as_is": [],
-                "wholesale": []
-            }
-
-            for vehicle in self.vehicles:
-                status = vehicle.get("Status", "")
-                warranty = vehicle.get("warranty", "")
-                make = vehicle.get("Make", "").lower()
-
-                if status == "Wholesale":
-                    buckets["wholesale"].append(vehicle)
-                    continue
-
-                # Retail ordering
-                if "kia" in make:
-                    if warranty == "CPO":
-                        buckets["kia_cpo"].append(vehicle)
-                    elif warranty == "Limited":
-                        buckets["kia_limited"].append(vehicle)
-                    else:
-                        buckets["kia_as_is"].append(vehicle)
-                else:
-                    if warranty == "Limited":
-                        buckets["non_kia_limited"].append(vehicle)
-                    else:
-                        buckets["non_kia_as_is"].append(vehicle)
-
-            display_order = [
-                "kia_cpo",
-                "kia_limited",
-                "kia_as_is",
-                "non_kia_limited",
-                "non_kia_as_is"
-            ]
-
-            row_idx = 0
-            # Draw all retail vehicles first
-            for key in display_order:
-                for vehicle in buckets[key]:
-                    self.draw_vehicle_row(vehicle, row_idx)
-                    row_idx += 1
-
-            # -------------------------------
-            # Separator for Wholesale
-            # -------------------------------
-            sep_text = "Wholesale"
-            # Create a label that looks like a thin line with text in the center
-            sep_label = ctk.CTkLabel(
-                self.scrollable_frame,
-                text=f"--------------------------------------------------------------------------------------------------------------------------- {sep_text}-------------------------------------------------------------------------------------------------- ",
-                text_color="blue",
-                font=ctk.CTkFont(size=12, weight="bold")
-            )
-            sep_label.grid(row=row_idx, column=0, columnspan=self.COL_COUNT, sticky="ew", pady=6)
-            row_idx += 1
-
-
-            # Draw all wholesale vehicles below separator
-            for vehicle in buckets["wholesale"]:
-                self.draw_vehicle_row(vehicle, row_idx)
-                row_idx += 1
+            # All retail vehicles first, bucket by bucket
+            for bucket in RETAIL_BUCKET_ORDER:
+                items.extend(self.inventory.in_bucket(bucket))
 
-            return
+            # Separator, then all wholesale vehicles below it
+            items.append(self.WHOLESALE_SEPARATOR)
+            items.extend(self.inventory.in_bucket(WHOLESALE_BUCKET))
+            return items
 
         # -------------------------------
         # RETAIL VIEW
         # -------------------------------
         if self.current_view == "RETAIL":
-            for vehicle in self.vehicles:
-                if vehicle.get("Status") in ("Retail", "Undecided"):
-                    self.draw_vehicle_row(vehicle, row_idx)
-                    row_idx += 1
-            return
+            return self.inventory.with_status("Retail", "Undecided")
 
         # -------------------------------
         # WHOLESALE VIEW
         # -------------------------------
         if self.current_view == "WHOLESALE":
-            for vehicle in self.vehicles:
-                if vehicle.get("Status") == "Wholesale":
-                    self.draw_vehicle_row(vehicle, row_idx)
-                    row_idx += 1
-            return
-
-
-
-    def draw_vehicle_row(self, vehicle, row_idx, is_separator=False):
-        """
-        Draw a vehicle row in the scrollable frame.
-        If is_separator=True, draws a thin blue line with 'WHOLESALE' text.
-        """
-        if is_separator:
-            # Separator row
-            sep_label = ctk.CTkLabel(
-                self.scrollable_frame,
-                text="-------- WHOLESALE --------",
-                font=ctk.CTkFont(size=12, weight="bold"),
-                text_color="blue"
-            )
-            sep_label.grid(
-                row=row_idx,
-                column=0,
-                columnspan=self.COL_COUNT,
-                sticky="ew",
-                pady=4
-            )
-            return
-
-        # -------------------------------
-        # TEXT COLUMNS
-        # -------------------------------
-        texts = [
-            vehicle.get("Stock Number", ""),
-            vehicle.get("Make", ""),
-            vehicle.get("Model", ""),
-            vehicle.get("Year", "")
-        ]
-
-        for col, text in enumerate(texts):
-            ctk.CTkLabel(
-                self.scrollable_frame,
-                text=text,
-                font=self.ROW_FONT
-            ).grid(
-                row=row_idx,
-                column=col,
-                padx=8,
-                pady=self.ROW_PADY,
-                sticky="w"
-            )
-
-        # -------------------------------
-        # STATUS DROPDOWN
-        # -------------------------------
-        status_var = ctk.StringVar(value=vehicle.get("Status", "Undecided"))
-        self.status_vars[vehicle["id"]] = status_var
-
-        status_menu = ctk.CTkOptionMenu(
-            self.scrollable_frame,
-            values=["Undecided", "Retail", "Wholesale"],
-            variable=status_var,
-            width=self.DROPDOWN_W
-        )
-        status_menu.grid(
-            row=row_idx,
-            column=4,
-            padx=8,
-            pady=self.ROW_PADY,
-            sticky="w"
-        )
-
-        status_var.trace_add(
-            "write",
-            lambda *args, vid=vehicle["id"], var=status_var: self._on_status_change(vid=vid, var=var)
-        )
-
-        # -------------------------------
-        # LOCATION DROPDOWN
-        # -------------------------------
-        location_var = ctk.StringVar(value=vehicle.get("Location", "Service"))
-        self.location_vars[vehicle["id"]] = location_var
-
-        location_menu = ctk.CTkOptionMenu(
-            self.scrollable_frame,
-            values=["Service", "Detail", "Retail lot", "Wholesale lot"],
-            variable=location_var,
-            width=self.DROPDOWN_W
-        )
-        location_menu.grid(
-            row=row_idx,
-            column=5,
-            padx=8,
-            pady=self.ROW_PADY,
-            sticky="w"
-        )
-
-        location_var.trace_add(
-            "write",
-            lambda *args, vid=vehicle["id"], var=location_var: self._on_location_change(vid=vid, var=var)
-        )
-
-        # -------------------------------
-        # NOTES BUTTON
-        # -------------------------------
-        notes_btn = ctk.CTkButton(
-            self.scrollable_frame,
-            text="Notes",
-            width=self.NOTES_W,
-            command=lambda v=vehicle: self.open_notes_popup(v)
-        )
-        notes_btn.grid(
-            row=row_idx,
-            column=6,
-            padx=(0, self.NOTES_PAD_RIGHT),
-            pady=self.ROW_PADY,
-            sticky="w"
-        )
+            return self.inventory.with_status("Wholesale")
 
+        return items
 
 
     # -------------------------------
     # STATUS / LOCATION CHANGES
     # -------------------------------
-    def _on_status_change(self, *args, vid, var):
-        new_status = var.get()
-        for v in self.vehicles:
-            if v["id"] == vid:
-                v["Status"] = new_status
-                break
-        try:
-            self.db.update_vehicle(vid, "status", new_status)
-            self.show_feedback("Status saved!")
-        except Exception:
-            pass
+    def _on_status_change(self, vehicle, new_status):
+        # The row may still hold a record from before the last reload
+        vehicle = self.inventory.get(vehicle.id)
+        if vehicle is None:
+            return
+        self._local_edits.add(vehicle.id)
+        self.inventory.update(vehicle, status=new_status)
+        self.show_pending("Saving status...")
+        self.db_async.update_vehicle(vehicle.id, "status", new_status,
+                                     callback=lambda _: self.show_saved("Status saved!"),
+                                     errback=self.show_db_error)
 
         # Only switch view if not in ALL
         if self.current_view != "ALL":
@@ -485,43 +487,104 @@ class VehicleTracker(ctk.CTk):
                 self.set_view("RETAIL")
             elif new_status.lower() == "wholesale":
                 self.set_view("WHOLESALE")
+        else:
+            # Move the row into its new bucket; only shifted rows are rebound
+            self.refresh_vehicle_list()
 
-    def _on_location_change(self, *args, vid, var):
-        new_location = var.get()
+    def _on_location_change(self, vehicle, new_location):
+        vehicle = self.inventory.get(vehicle.id)
+        if vehicle is None:
+            return
 
-        # Update in-memory vehicle list
-        for v in self.vehicles:
-            if v["id"] == vid:
-                v["Location"] = new_location
-                break
+        # Update in-memory vehicle
+        self._local_edits.add(vehicle.id)
+        self.inventory.update(vehicle, location=new_location)
 
         # Update in database
-        try:
-            self.db.update_vehicle(vid, "location", new_location)
-            self.show_feedback("Location saved!")
-        except Exception:
-            pass
+        self.show_pending("Saving location...")
+        self.db_async.update_vehicle(vehicle.id, "location", new_location,
+                                     callback=lambda _: self.show_saved("Location saved!"),
+                                     errback=self.show_db_error)
 
-        # Refresh ALL view if needed so the row moves correctly
-        if self.current_view == "ALL":
-            self.refresh_vehicle_list()
+        # Location doesn't change bucket order, so just repaint this row
+        self.on_vehicle_edited(vehicle)
 
 
 
     # -------------------------------
     # POPUPS
     # -------------------------------
+    def register_popups(self):
+        """Popups are built once by the PopupManager, then hidden and reused."""
+        self.popups.register("add_vehicle", lambda visible: AddVehiclePopup(
+            self, self.db, refresh_callback=self.on_vehicle_added, db_async=self.db_async,
+            visible=visible))
+        self.popups.register("sell_vehicle", lambda visible: DeleteVehiclePopup(
+            self, self.db, refresh_callback=self.on_vehicle_sold, db_async=self.db_async,
+            inventory=self.inventory, visible=visible))
+        self.popups.register("notes", lambda vehicle, visible: NotesPopup(
+            self, self.db, vehicle, refresh_callback=self.on_vehicle_edited, db_async=self.db_async,
+            visible=visible))
+        self.popups.register("photo_tracker", lambda visible: PhotoTrackerPopup(
+            self, self.db, db_async=self.db_async, inventory=self.inventory, visible=visible))
+
     def open_add_vehicle_popup(self):
-        AddVehiclePopup(self, self.db, refresh_callback=self.load_vehicles)
+        self.popups.show("add_vehicle")
 
     def open_delete_vehicle_popup(self):
-        DeleteVehiclePopup(self, self.db, refresh_callback=self.load_vehicles)
+        self.popups.show("sell_vehicle")
 
     def open_notes_popup(self, vehicle):
-        NotesPopup(self, self.db, vehicle)
+        self.popups.show("notes", vehicle)
 
     def open_photo_tracker(self):
-        PhotoTrackerPopup(self, self.db)
+        self.popups.show("photo_tracker")
+
+    # -------------------------------
+    # BULK IMPORT
+    # -------------------------------
+    def open_import_dialog(self):
+        path = filedialog.askopenfilename(
+            title="Import Vehicles",
+            filetypes=[("Inventory exports", "*.csv *.json"), ("CSV", "*.csv"), ("JSON", "*.json")]
+        )
+        if not path:
+            return
+
+        def on_imported(report):
+            if report["added"]:
+                self.load_vehicles()
+            else:
+                self.feedback_label.configure(text="")
+            messagebox.showinfo("Import Complete", format_import_report(report))
+
+        def on_failed(error):
+            # Chunks committed before the failure stay imported
+            self.load_vehicles()
+            messagebox.showerror("Import Failed", f"{error}\n\nRows imported before the error were kept; "
+                                                  "importing the file again skips them as duplicates.")
+
+        self.show_pending("Importing vehicles...")
+        self.db_async.submit(lambda: self.db.add_vehicles_bulk(read_import_file(path)),
+                             callback=on_imported, errback=on_failed)
+
+    def search_notes(self):
+        """Full-text search over all notes (active and sold) and list the hits."""
+        query = self.search_entry.get().strip()
+        if not query:
+            return
+
+        def on_results(hits):
+            self.feedback_label.configure(text="")
+            NotesSearchPopup(self, query, hits, on_open=self.open_notes_for_id)
+
+        self.show_pending("Searching notes...")
+        self.db_async.search_notes(query, callback=on_results, errback=self.show_db_error)
+
+    def open_notes_for_id(self, vehicle_id):
+        vehicle = self.inventory.get(vehicle_id)
+        if vehicle is not None:
+            self.open_notes_popup(vehicle)
 
 
 # -------------------------------
@@ -0,0 +1,82 @@
+import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_MS = 15  # how often the Tk thread checks for finished database calls
+
+log = logging.getLogger(__name__)
+
+
+class AsyncVehicleDatabase:
+    """
+    Runs VehicleDatabase calls on a single worker thread so the Tk mainloop
+    never waits on SQLite.
+
+    Any VehicleDatabase method can be called on this object; it returns a
+    concurrent.futures.Future immediately. callback(result) / errback(exc)
+    are always run on the Tk thread (results are handed over through a queue
+    that the Tk thread drains with after()), so they may touch widgets.
+
+        db_async.update_vehicle(vid, "status", "Retail",
+                                callback=lambda _: show_feedback("Saved"))
+
+    Calls made without an errback report their failure to on_error(exc)
+    (also on the Tk thread), or to the log when on_error is None. Exceptions
+    raised by a callback or errback are logged.
+    """
+
+    def __init__(self, db, tk_root, on_error=None):
+        self.db = db
+        self.root = tk_root
+        self.on_error = on_error
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vehicle-db")
+        self._done = queue.Queue()
+        self._closed = False
+        self.root.after(POLL_MS, self._drain)
+
+    # ------------------------------- Submission ------------------------------- #
+    def submit(self, func, *args, callback=None, errback=None, **kwargs):
+        """Run func(*args, **kwargs) on the worker thread; returns a Future."""
+        future = self._executor.submit(func, *args, **kwargs)
+        # Always delivered, so a failure without an errback still reaches on_error
+        future.add_done_callback(lambda f: self._done.put((f, callback, errback)))
+        return future
+
+    def __getattr__(self, name):
+        method = getattr(self.db, name)
+        if not callable(method):
+            return method
+
+        def call(*args, callback=None, errback=None, **kwargs):
+            return self.submit(method, *args, callback=callback, errback=errback, **kwargs)
+        return call
+
+    # ------------------------------- Delivery ------------------------------- #
+    def _drain(self):
+        while True:
+            try:
+                future, callback, errback = self._done.get_nowait()
+            except queue.Empty:
+                break
+            error = future.exception()
+            try:
+                if error is None:
+                    if callback:
+                        callback(future.result())
+                elif errback:
+                    errback(error)
+                elif self.on_error:
+                    self.on_error(error)
+                else:
+                    log.error("Database call failed", exc_info=error)
+            except Exception:
+                # A failing UI callback must not stop delivery of the others
+                log.exception("Database callback failed")
+
+        if not self._closed:
+            self.root.after(POLL_MS, self._drain)
+
+    def shutdown(self, wait=True):
+        """Finish queued calls (when wait=True) and stop the worker thread."""
+        self._closed = True
+        self._executor.shutdown(wait=wait)
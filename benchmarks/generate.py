@@ -0,0 +1,139 @@
+"""
+Seeded synthetic inventory generator.
+
+Fills a vehicles.db with realistic makes/models (from vehicle_catalog),
+unique VINs and stock numbers, years, mileages, notes histories and sold
+records. The same seed always produces the same database.
+"""
+import random
+from datetime import datetime, timedelta
+
+from database import VehicleDatabase
+from utils import assign_warranty, NOTE_TS_DB_FORMAT
+from vehicle_catalog import MAKE_MODEL_MAP
+
+VIN_ALPHABET = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789"  # no I, O, Q
+STATUSES = ["Undecided", "Retail", "Wholesale"]
+STATUS_WEIGHTS = [3, 5, 2]
+LOCATIONS = ["Service", "Detail", "Retail lot", "Wholesale lot"]
+AUTHORS = [("Mike", "Service"), ("Sarah", "Sales"), ("Luis", "Parts"),
+           ("Dana", "Sales"), ("Priya", "Service"), ("Tom", "Sales")]
+NOTE_BODIES = [
+    "Needs front brakes and rotors.",
+    "Cracked windshield, sent to glass vendor.",
+    "Customer interested, follow up Friday.",
+    "Detail complete, ready for photos.",
+    "Check engine light on, code P0420.",
+    "Two keys present, owner's manual missing.",
+    "Tires at 4/32, recommend replacement.",
+    "Appraised at auction value, manager approved.",
+    "Minor door ding on passenger side.",
+    "Oil change and multipoint inspection done.",
+]
+
+CHUNK = 10000
+
+
+def _vin(rng, serial):
+    # 11 random characters + 6-character serial keeps every VIN unique
+    prefix = "".join(rng.choice(VIN_ALPHABET) for _ in range(11))
+    digits = []
+    for _ in range(6):
+        serial, r = divmod(serial, len(VIN_ALPHABET))
+        digits.append(VIN_ALPHABET[r])
+    return prefix + "".join(reversed(digits))
+
+
+def _vehicle(rng, index, makes, now, prefix):
+    make = rng.choice(makes)
+    model = rng.choice(MAKE_MODEL_MAP[make])
+    year = rng.randint(now.year - 15, now.year + 1)
+    age = max(0, now.year - year)
+    mileage = max(0, int(rng.gauss(age * 12000, 6000)))
+    return {
+        "stock_number": f"{prefix}{index:07d}",
+        "vin": _vin(rng, index),
+        "make": make,
+        "model": model,
+        "year": str(year),
+        "mileage": str(mileage),
+        "status": rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+        "location": rng.choice(LOCATIONS),
+        "warranty": assign_warranty(make, year, mileage),
+        "photos_taken": rng.choice(["Yes", "No"]),
+        "traded_in_by": rng.choice(AUTHORS)[0],
+        "date_added": (now - timedelta(days=rng.randint(0, 150))).strftime(NOTE_TS_DB_FORMAT),
+    }
+
+
+def _notes(rng, count, now):
+    notes = []
+    ts = now - timedelta(days=rng.randint(1, 365))
+    for _ in range(count):
+        ts += timedelta(hours=rng.randint(1, 72))
+        author, department = rng.choice(AUTHORS)
+        notes.append((ts.strftime(NOTE_TS_DB_FORMAT), author, department, rng.choice(NOTE_BODIES)))
+    return notes
+
+
+def generate_inventory(db_file, size, seed=42, sold_ratio=0.25, notes_per_vehicle=2):
+    """
+    Create a database with `size` active vehicles plus sold history.
+    :param db_file: path of the database to create (should not exist yet)
+    :param size: number of active vehicles
+    :param sold_ratio: sold records per active vehicle
+    :param notes_per_vehicle: average notes per active vehicle
+    :return: dict summary of what was generated
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+    makes = sorted(MAKE_MODEL_MAP)
+
+    db = VehicleDatabase(db_file)
+    conn = db.conn
+    note_count = 0
+
+    # ---------------- Active vehicles + notes ---------------- #
+    for start in range(0, size, CHUNK):
+        batch = [_vehicle(rng, i, makes, now, "A") for i in range(start, min(size, start + CHUNK))]
+        conn.executemany("""
+            INSERT INTO vehicles (user_name, stock_number, vin, make, model, year, mileage,
+                                  status, location, warranty, photos_taken, traded_in_by, certification,
+                                  date_added)
+            VALUES ('Default', :stock_number, :vin, :make, :model, :year, :mileage,
+                    :status, :location, :warranty, :photos_taken, :traded_in_by, '', :date_added)
+        """, batch)
+
+        first_id = conn.execute("SELECT id FROM vehicles WHERE stock_number = ?",
+                                (batch[0]["stock_number"],)).fetchone()[0]
+        note_rows = []
+        for offset in range(len(batch)):
+            count = min(int(rng.expovariate(1 / notes_per_vehicle)), 40) if notes_per_vehicle else 0
+            note_rows.extend((first_id + offset,) + n for n in _notes(rng, count, now))
+        conn.executemany(
+            "INSERT INTO vehicle_notes (vehicle_id, ts, author, department, body) VALUES (?, ?, ?, ?, ?)",
+            note_rows
+        )
+        note_count += len(note_rows)
+        conn.commit()
+
+    # ---------------- Sold history ---------------- #
+    sold = int(size * sold_ratio)
+    for start in range(0, sold, CHUNK):
+        batch = []
+        for i in range(start, min(sold, start + CHUNK)):
+            v = _vehicle(rng, i, makes, now, "Z")
+            sold_on = now - timedelta(days=rng.randint(0, 3 * 365), minutes=rng.randint(0, 1440))
+            added_on = sold_on - timedelta(days=rng.randint(3, 120), minutes=rng.randint(0, 1440))
+            batch.append((v["stock_number"], v["vin"], v["make"], v["model"], v["year"], v["mileage"],
+                          rng.choice(NOTE_BODIES), "Retail", "Retail lot", rng.choice(AUTHORS)[0],
+                          added_on.strftime(NOTE_TS_DB_FORMAT), sold_on.strftime(NOTE_TS_DB_FORMAT)))
+        conn.executemany("""
+            INSERT INTO sold_vehicles (stock_number, vin, make, model, year, mileage,
+                                       notes, status, location, seller_name, date_added, date_sold)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, batch)
+        conn.commit()
+
+    db.close()
+    return {"vehicles": size, "sold_vehicles": sold, "vehicle_notes": note_count, "seed": seed}
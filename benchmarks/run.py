@@ -0,0 +1,157 @@
+"""
+Benchmark suite for VehicleDatabase and the load/warranty hot paths.
+
+    python -m benchmarks.run --sizes 1000 10000 100000 1000000
+    python -m benchmarks.run --compare benchmarks/results/bench-<old>.json
+
+Each size gets a freshly generated temp database. Results are written as
+JSON so runs can be compared for regressions.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Allow `python benchmarks/run.py` as well as `python -m benchmarks.run`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import VehicleDatabase
+from utils import assign_warranty, assign_warranty_batch, fill_stale_warranties, format_note, NOTE_TS_DB_FORMAT
+from benchmarks.generate import generate_inventory
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Operations per size for the point operations
+LOOKUPS = 2000
+NOTES = 500
+SELLS = 200
+SEARCHES = ["cracked windshield", "brakes", "P0420", "door ding", "tires"]
+
+
+def _timed(results, size, op, count, func):
+    start = time.perf_counter()
+    func()
+    total = time.perf_counter() - start
+    results.append({
+        "size": size,
+        "op": op,
+        "count": count,
+        "total_s": round(total, 6),
+        "per_op_us": round(total / max(count, 1) * 1e6, 3),
+    })
+    print(f"  {op:<28} {count:>8} ops  {total:9.4f}s  {total / max(count, 1) * 1e6:11.2f} us/op")
+
+
+def bench_size(size, seed, workdir):
+    results = []
+    db_file = os.path.join(workdir, f"bench_{size}.db")
+
+    start = time.perf_counter()
+    summary = generate_inventory(db_file, size, seed=seed)
+    print(f"size {size}: generated {summary} in {time.perf_counter() - start:.1f}s")
+
+    db = VehicleDatabase(db_file)
+    rng = random.Random(seed)
+
+    rows = []
+    _timed(results, size, "get_vehicles", 1, lambda: rows.extend(db.get_vehicles()))
+    _timed(results, size, "iter_vehicles", len(rows),
+           lambda: sum(1 for _ in db.iter_vehicles()))
+    # Opening the database already refreshed every stored warranty, so mark the
+    # loaded rows stale (as after a year rollover) to time the recompute path
+    for vehicle in rows:
+        vehicle.warranty_year = None
+    _timed(results, size, "fill_stale_warranties", len(rows),
+           lambda: fill_stale_warranties(rows))
+
+    makes = [v.make for v in rows]
+    years = [v.year for v in rows]
+    mileages = [v.mileage for v in rows]
+    _timed(results, size, "assign_warranty", len(rows),
+           lambda: [assign_warranty(m, y, mi) for m, y, mi in zip(makes, years, mileages)])
+    _timed(results, size, "assign_warranty_batch", len(rows),
+           lambda: assign_warranty_batch(makes, years, mileages))
+
+    vins = [rows[rng.randrange(len(rows))].vin for _ in range(LOOKUPS)] if rows else []
+    _timed(results, size, "vin_exists", len(vins), lambda: [db.vin_exists(v) for v in vins])
+
+    _timed(results, size, "search_notes", len(SEARCHES),
+           lambda: [db.search_notes(q) for q in SEARCHES])
+
+    _timed(results, size, "aging_report", 1, lambda: db.aging_report(by="make"))
+    _timed(results, size, "turn_time_report", 1,
+           lambda: db.turn_time_report(group_by=("make", "month")))
+
+    ids = [rows[rng.randrange(len(rows))].id for _ in range(NOTES)] if rows else []
+    _timed(results, size, "add_note", len(ids),
+           lambda: [db.add_note(i, "Benchmark note", "bench", "Sales") for i in ids])
+    note = format_note(datetime.now().strftime(NOTE_TS_DB_FORMAT), "bench", "Sales", "Benchmark note")
+    _timed(results, size, "append_note", len(ids),
+           lambda: [db.append_note(i, note) for i in ids])
+
+    stocks = [v.stock_number for v in rng.sample(rows, min(SELLS, len(rows)))]
+    _timed(results, size, "sell_vehicle", len(stocks),
+           lambda: [db.sell_vehicle(s, "bench") for s in stocks])
+
+    db.close()
+    os.remove(db_file)
+    return results
+
+
+def compare(current, baseline_file):
+    """Print per-op ratios against an earlier results file (>1.0 means slower now)."""
+    with open(baseline_file) as f:
+        baseline = {(r["size"], r["op"]): r for r in json.load(f)["results"]}
+
+    print(f"\ncompared with {baseline_file}:")
+    for r in current:
+        old = baseline.get((r["size"], r["op"]))
+        if old and old["per_op_us"]:
+            print(f"  {r['size']:>8} {r['op']:<28} {r['per_op_us'] / old['per_op_us']:6.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VehicleTracker benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results JSON path (default: benchmarks/results/bench-<time>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            results.extend(bench_size(size, args.seed, workdir))
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+
+    with open(output, "w") as f:
+        json.dump({
+            "meta": {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "seed": args.seed,
+                "sizes": args.sizes,
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform(),
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"\nresults written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Checks that database.WARRANTY_CASE_SQL and the Python warranty rules agree.
+
+    python -m benchmarks.warranty_parity
+    python -m benchmarks.warranty_parity --rows 100000 --seed 7 --year 2031
+
+Runs every boundary case (ages and mileages either side of each cut-off,
+blank, negative and non-numeric text, mixed-case makes) plus seeded random
+rows through both the SQL expression and fill_stale_warranties on Vehicle
+records, the way the app loads them. Exits 1 and lists the first mismatches
+if any row disagrees.
+"""
+import argparse
+import itertools
+import os
+import random
+import sqlite3
+import sys
+from datetime import datetime
+
+# Allow `python benchmarks/warranty_parity.py` as well as `python -m benchmarks.warranty_parity`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import WARRANTY_CASE_SQL
+from models import Vehicle
+from utils import assign_warranty, fill_stale_warranties
+
+MAKES = ["Kia", "KIA", "kia", "Honda", "Kia ", "", None]
+ODD_VALUES = [None, "", " ", "abc", "-", "2019.5", "1e3", "45,000", " 2020 ", "\t7\n", "+3", "2019abc"]
+MAX_REPORTED = 20
+
+
+def boundary_rows(reference_year):
+    """Every age/mileage cut-off from either side, plus text the forms let through."""
+    years = [str(reference_year - age) for age in range(-1, 10)] + ODD_VALUES + ["0"]
+    mileages = [str(m) for m in (-5, 0, 79999, 80000, 99999, 100000, 250000)] + ODD_VALUES
+    return list(itertools.product(MAKES, years, mileages))
+
+
+def random_rows(count, seed, reference_year):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        year = str(reference_year - rng.randint(-1, 15))
+        mileage = str(rng.randint(-1000, 200000))
+        if rng.random() < 0.05:
+            year = rng.choice(ODD_VALUES)
+        if rng.random() < 0.05:
+            mileage = rng.choice(ODD_VALUES)
+        rows.append((rng.choice(MAKES), year, mileage))
+    return rows
+
+
+def sql_warranties(rows, reference_year):
+    """WARRANTY_CASE_SQL over the rows stored as TEXT, like the vehicles table."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE vehicles (id INTEGER PRIMARY KEY, make TEXT, year TEXT, mileage TEXT)")
+    conn.executemany("INSERT INTO vehicles (id, make, year, mileage) VALUES (?, ?, ?, ?)",
+                     [(i, *row) for i, row in enumerate(rows)])
+    result = [w for (w,) in conn.execute(f"SELECT {WARRANTY_CASE_SQL} FROM vehicles ORDER BY id",
+                                         {"ref": reference_year})]
+    conn.close()
+    return result
+
+
+def python_warranties(rows, reference_year):
+    """fill_stale_warranties on freshly loaded (stale) Vehicle records."""
+    vehicles = [Vehicle(i, "", f"P{i}", "", make, "", year, mileage, "", "", None, None, "", "", "", None)
+                for i, (make, year, mileage) in enumerate(rows)]
+    return [v.warranty for v in fill_stale_warranties(vehicles, reference_year)]
+
+
+def check(rows, reference_year):
+    """:return: list of (row, sql, python) for every disagreement"""
+    python = python_warranties(rows, reference_year)
+    mismatches = [(row, s, p) for row, s, p in zip(rows, sql_warranties(rows, reference_year), python) if s != p]
+
+    # The scalar rule must agree with the batch one on clean integer input too
+    for (make, year, mileage), batch in zip(rows, python):
+        if (year or "").isdigit() and (mileage or "").isdigit():
+            single = assign_warranty(make or "", int(year), int(mileage), reference_year)
+            if single != batch:
+                mismatches.append(((make, year, mileage), "assign_warranty: " + single, batch))
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WARRANTY_CASE_SQL / assign_warranty parity check")
+    parser.add_argument("--rows", type=int, default=20000, help="random rows on top of the boundary cases")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--year", type=int, default=datetime.now().year, help="reference year")
+    args = parser.parse_args(argv)
+
+    rows = boundary_rows(args.year) + random_rows(args.rows, args.seed, args.year)
+    mismatches = check(rows, args.year)
+    if not mismatches:
+        print(f"{len(rows)} rows: SQL and Python warranties agree")
+        return 0
+
+    print(f"{len(mismatches)} of {len(rows)} rows disagree (make, year, mileage: sql / python):")
+    for row, sql, python in mismatches[:MAX_REPORTED]:
+        print(f"  {row!r}: {sql} / {python}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
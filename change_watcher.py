@@ -0,0 +1,47 @@
+"""
+Notices changes other workstations make to vehicles.db.
+
+poll() first compares VehicleDatabase.change_token() (PRAGMA data_version,
+which moves whenever another connection commits) with the last value seen.
+That costs no table reads, so polling every second is cheap. Only when it
+moved are the changed rows fetched, from the vehicle_changes log.
+
+Main.py calls poll() on the database worker thread about once a second and
+applies the result to its InventoryIndex and grid.
+"""
+
+
+class ChangeWatcher:
+    """Tracks the last seen change token and vehicle_changes sequence for one database."""
+
+    def __init__(self, db):
+        self.db = db
+        self.token = None
+        self.seq = None
+
+    def start(self):
+        """Mark "now" as seen. Call right before a full load, so nothing is missed in between."""
+        self.token = self.db.change_token()
+        self.seq = self.db.get_change_seq()
+
+    def poll(self):
+        """
+        :return: None when nothing changed; {"reload": True} when the watcher fell
+                 behind the pruned log; otherwise get_changes_since's dict
+                 ({"seq", "changed": [Vehicle], "removed": [ids]})
+        """
+        if self.seq is None:
+            self.start()
+            return None
+
+        token = self.db.change_token()
+        if token == self.token:
+            return None
+
+        changes = self.db.get_changes_since(self.seq)
+        self.token = token
+        if changes is None:
+            self.start()
+            return {"reload": True}
+        self.seq = changes["seq"]
+        return changes
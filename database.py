@@ -1,141 +1,650 @@
 ﻿import sqlite3
+import logging
 import os
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from migrations import apply_migrations, ensure_notes_search
+from models import VEHICLE_COLUMNS, Vehicle, vehicle_row_factory
+from utils import (assign_warranty_batch, validate_vin, validate_stock_number,
+                   format_note, parse_notes_blob, fts_query, normalize_date, NOTE_TS_DB_FORMAT)
 
 DB_FILE = os.path.join(os.path.dirname(__file__), "vehicles.db")
 
+log = logging.getLogger(__name__)
+
+# Pooled-mode tuning
+DEFAULT_READERS = 4
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KB = 16384          # page cache per connection (negative PRAGMA value = KiB)
+MMAP_SIZE = 256 * 1024 * 1024  # memory-map up to 256 MB of the file
+
+NOTES_PAGE_SIZE = 50
+SEARCH_LIMIT = 50
+SNIPPET_TOKENS = 12  # words of context around a search hit
+
+VEHICLE_SELECT = f"SELECT {', '.join(VEHICLE_COLUMNS)} FROM vehicles"
+VEHICLE_PAGE_SIZE = 1000
+# Orderings iter_vehicles can page through: unique, indexed columns only
+VEHICLE_ORDERINGS = ("id", "stock_number")
+VEHICLE_FILTER_COLUMNS = ("status", "location", "make", "warranty")
+
+# SQL version of models._to_int for a TEXT column: the integer for text like
+# "2019", " -5 " or "45,000", NULL when blank or not a whole number (a bare
+# CAST would turn "abc" into 0 and "45,000" into 45).
+_SQL_TO_INT = """
+    (SELECT CASE WHEN v GLOB '[0-9]*' AND v NOT GLOB '*[^0-9]*'
+                   OR v GLOB '[-+][0-9]*' AND substr(v, 2) NOT GLOB '*[^0-9]*'
+                 THEN CAST(v AS INTEGER) END
+     FROM (SELECT replace(trim({column}, ' ' || char(9, 10, 11, 12, 13)), ',', '') AS v))
+"""
+
+# Set-based version of utils.fill_stale_warranties / assign_warranty; keep the two
+# in step (benchmarks/warranty_parity.py checks it). :ref is the reference year;
+# a year that isn't a number counts as :ref, a mileage that isn't one as 0.
+_WARRANTY_AGE = f":ref - COALESCE({_SQL_TO_INT.format(column='year')}, :ref)"
+_WARRANTY_MILES = f"MAX(0, COALESCE({_SQL_TO_INT.format(column='mileage')}, 0))"
+WARRANTY_CASE_SQL = f"""
+    CASE
+        WHEN lower(make) = 'kia' THEN
+            CASE
+                WHEN {_WARRANTY_AGE} <= 5 AND {_WARRANTY_MILES} < 80000 THEN 'CPO'
+                WHEN {_WARRANTY_AGE} <= 7 AND {_WARRANTY_MILES} < 100000 THEN 'Limited'
+                ELSE 'As-Is'
+            END
+        WHEN {_WARRANTY_AGE} < 7 AND {_WARRANTY_MILES} < 100000 THEN 'Limited'
+        ELSE 'As-Is'
+    END
+"""
+
+# vehicle_events.field codes (stored as integers to keep the log compact); append only
+EVENT_FIELDS = {"status": 1, "location": 2, "photos_taken": 3}
+EVENT_FIELD_NAMES = {code: name for name, code in EVENT_FIELDS.items()}
+
+# vehicle_changes rows kept at startup (older ones are pruned; a watcher that fell
+# further behind than this reloads everything)
+CHANGE_LOG_KEEP = 100000
+
+# Write-behind tuning
+FLUSH_DELAY = 0.25  # seconds to gather queued updates before one commit
+
 
 class VehicleDatabase:
-    """SQLite database handler for active and sold vehicles."""
+    """
+    SQLite database handler for active and sold vehicles.
+
+    By default a single connection is shared for reads and writes.
+    With pooled=True the database is switched to WAL mode and uses one
+    dedicated writer connection plus a pool of reader connections, so reads
+    never wait behind a long write. WAL needs every client on the same
+    machine as vehicles.db; don't enable it for a file on a network share.
+    The journal mode is stored in the file, so a non-pooled instance switches
+    it back to DELETE (and logs a warning when it can't, because a pooled
+    instance still has the file open).
+
+    With write_behind=True, update_vehicle, update_photos_taken and
+    add_note/append_note are queued instead of committed immediately. Repeated writes
+    to the same field are merged and everything queued is written in one
+    transaction after flush_delay seconds, before any other read or write,
+    or when flush()/close() is called. A flush that fails puts everything back
+    on the queue (newer queued values win) and retries after flush_delay;
+    failures of the timed flush go to on_flush_error(exc), or the log.
 
-    def __init__(self, db_file=DB_FILE):
+    Every status, location and photos_taken change is also appended to
+    vehicle_events in the same transaction as the update (author defaults to
+    user, the OS login unless given), see get_vehicle_history / get_vehicles_as_of.
+    """
+
+    def __init__(self, db_file=DB_FILE, pooled=False, readers=DEFAULT_READERS,
+                 write_behind=False, flush_delay=FLUSH_DELAY, user=None, on_flush_error=None):
         self.db_file = db_file
-        self.conn = sqlite3.connect(self.db_file)
-        self.conn.row_factory = sqlite3.Row
+        self.pooled = pooled
+        # Recorded as the author of change history events unless a call passes its own
+        self.user = user or os.environ.get("USERNAME") or os.environ.get("USER", "")
+        self._write_lock = threading.RLock()
+
+        # Write-behind queue
+        self.write_behind = write_behind
+        self.flush_delay = flush_delay
+        self._pending_lock = threading.Lock()
+        self._pending_fields = {}  # (vehicle_id, column) -> (value, author)
+        self._pending_notes = []   # (vehicle_id, ts, author, department, body), in order
+        self._flush_timer = None
+        self.on_flush_error = on_flush_error  # called (on the timer thread) when a timed flush fails
+        self.on_flushed = None  # called (on the flushing thread) after queued changes were committed
+
+        # Writer connection (also used for reads when not pooled)
+        self.conn = self._connect()
+        if self.pooled:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        else:
+            self._leave_wal()
         self._init_db()
 
+        self._readers = queue.Queue()
+        self._all_readers = []
+        self._token_conn = None  # pooled: its own connection, so change_token never waits on the writer
+        self._token_lock = threading.Lock()
+        if self.pooled:
+            for _ in range(max(1, readers)):
+                reader = self._connect()
+                reader.execute("PRAGMA query_only=ON")
+                self._readers.put(reader)
+                self._all_readers.append(reader)
+            self._token_conn = self._connect()
+            self._token_conn.execute("PRAGMA query_only=ON")
+            self._all_readers.append(self._token_conn)
+
+    def _leave_wal(self):
+        """Undo a WAL mode left in the file by an earlier pooled instance."""
+        # Don't wait out the busy timeout: if WAL is in use elsewhere, that won't end soon
+        self.conn.execute("PRAGMA busy_timeout=0")
+        try:
+            mode = self.conn.execute("PRAGMA journal_mode=DELETE").fetchone()[0].lower()
+        except sqlite3.OperationalError:
+            mode = "wal"  # locked: a pooled instance has the file open
+        finally:
+            self.conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        if mode != "delete":
+            log.warning("%s is still in %s journal mode because a pooled instance has it open; "
+                        "WAL is unsafe if this file is reached over a network share",
+                        self.db_file, mode)
+
     def __del__(self):
-        """Ensure database connection closes cleanly."""
+        """Ensure database connections close cleanly."""
+        self.close()
+
+    def close(self):
         try:
-            self.conn.close()
+            self.flush()
         except Exception:
-            pass
+            log.exception("Could not write queued changes before closing; they are lost")
+        with self._pending_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        for conn in [getattr(self, "conn", None)] + getattr(self, "_all_readers", []):
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    # ------------------------------- Connections ------------------------------- #
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, timeout=BUSY_TIMEOUT_MS / 1000,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # Lets SQL render notes exactly like the UI (used when selling)
+        conn.create_function("format_note", 4, format_note, deterministic=True)
+        if self.pooled:
+            conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL: only the last commit can be lost on power cut
+            conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+            conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        return conn
+
+    @contextmanager
+    def _reader(self):
+        """Borrow a connection for reading (after flushing queued writes)."""
+        if self._pending_fields or self._pending_notes:
+            self.flush()
+
+        if not self.pooled:
+            with self._write_lock:
+                yield self.conn
+            return
+
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    @contextmanager
+    def _writer(self):
+        """Hold the writer connection; commits on success, rolls back on error."""
+        with self._write_lock:
+            self.flush()
+            try:
+                yield self.conn
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def change_token(self):
+        """
+        Opaque string that changes whenever the file is changed, by this object
+        (total_changes) or any other connection or process (PRAGMA data_version).
+        Costs no table reads, so callers can poll it or use it as an ETag.
+
+        Pooled, it is read on a connection of its own, which sees this object's
+        writer as just another connection: no write lock, so it never queues
+        behind a write. data_version is per connection, hence not a pool reader.
+        """
+        if self._pending_fields or self._pending_notes:
+            self.flush()
+
+        if self._token_conn is not None:
+            with self._token_lock:
+                return str(self._token_conn.execute("PRAGMA data_version").fetchone()[0])
+
+        with self._write_lock:
+            data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            return f"{data_version}.{self.conn.total_changes}"
+
+    # ------------------------------- Write-Behind Queue ------------------------------- #
+    def _queue_field(self, vehicle_id, field, value, author):
+        with self._pending_lock:
+            self._pending_fields[(vehicle_id, field)] = (value, author)
+            self._schedule_flush()
+
+    def _queue_note(self, note_params):
+        with self._pending_lock:
+            self._pending_notes.append(note_params)
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        # Caller holds _pending_lock
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_delay, self._timed_flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _timed_flush(self):
+        try:
+            self.flush()
+        except Exception as e:
+            # The batch is back on the queue and a retry is scheduled; just report it
+            if self.on_flush_error is not None:
+                self.on_flush_error(e)
+            else:
+                log.exception("Write-behind flush failed; will retry")
+
+    def flush(self):
+        """
+        Write every queued write-behind change in a single transaction.
+        Returns True if anything was written.
+        """
+        with self._write_lock:
+            with self._pending_lock:
+                fields, notes = self._pending_fields, self._pending_notes
+                self._pending_fields, self._pending_notes = {}, []
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+
+            if not fields and not notes:
+                return False
+
+            by_field = {}
+            for (vehicle_id, field), (value, author) in fields.items():
+                by_field.setdefault(field, []).append((vehicle_id, value, author))
+
+            try:
+                for field, updates in by_field.items():
+                    self._write_field(self.conn, field, updates)
+
+                # Notes for vehicles that no longer exist are skipped
+                self.conn.executemany(self.INSERT_NOTE_SQL, [p + (p[0],) for p in notes])
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                self._requeue(fields, notes)
+                raise
+        if self.on_flushed is not None:
+            self.on_flushed()
+        return True
+
+    def _requeue(self, fields, notes):
+        """Put a batch that failed to write back on the queue and schedule a retry."""
+        with self._pending_lock:
+            # Anything queued while the batch was being written is newer
+            fields.update(self._pending_fields)
+            self._pending_fields = fields
+            self._pending_notes = notes + self._pending_notes
+            self._schedule_flush()
+
+    def discard_pending(self):
+        """Drop every queued write-behind change without writing it; returns how many there were."""
+        with self._pending_lock:
+            count = len(self._pending_fields) + len(self._pending_notes)
+            self._pending_fields, self._pending_notes = {}, []
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        return count
 
     # ------------------------------- Database Setup ------------------------------- #
     def _init_db(self):
-        cursor = self.conn.cursor()
-
-        # Active vehicles table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS vehicles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_name TEXT,
-                stock_number TEXT UNIQUE NOT NULL,
-                vin TEXT,
-                make TEXT,
-                model TEXT,
-                year TEXT,
-                mileage TEXT,
-                notes TEXT,
-                status TEXT,
-                location TEXT,
-                warranty TEXT,
-                photos_taken TEXT DEFAULT 'No',
-                traded_in_by TEXT,
-                certification TEXT
-                
-            )
-        """)
-
-        # Sold vehicles table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sold_vehicles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                stock_number TEXT,
-                vin TEXT,
-                make TEXT,
-                model TEXT,
-                year TEXT,
-                mileage TEXT,
-                notes TEXT,
-                status TEXT,
-                location TEXT,
-                seller_name TEXT,
-                date_sold TEXT
-            )
-        """)
+        """
+        Create or upgrade the schema to the latest migration, then refresh stale
+        warranties and trim the change log. Each step only opens a write
+        transaction when it has something to write, so an ordinary open (CLI,
+        service, desk) doesn't take the write lock.
+        """
+        with self._write_lock:
+            apply_migrations(self.conn)
+            # Not left to migration 5 alone: SQLite may have gained FTS5 since it ran
+            self.notes_search = ensure_notes_search(self.conn)
+        self.refresh_warranties()
+        self._prune_changes()
 
-        self.conn.commit()
+    # ------------------------------- Warranty ------------------------------- #
+    def refresh_warranties(self, reference_year=None):
+        """
+        Recompute the stored warranty for every row not computed for reference_year,
+        in one UPDATE. Cheap when nothing is stale (indexed on warranty_year).
+        :return: number of rows updated
+        """
+        reference_year = reference_year or datetime.now().year
+        stale_filter = "warranty_year IS NULL OR warranty_year < :ref OR warranty_year > :ref"
+        with self._write_lock:
+            stale = self.conn.execute(f"SELECT 1 FROM vehicles WHERE {stale_filter} LIMIT 1",
+                                      {"ref": reference_year}).fetchone()
+        if stale is None:
+            return 0
+
+        with self._writer() as conn:
+            cursor = conn.execute(f"""
+                UPDATE vehicles
+                SET warranty = {WARRANTY_CASE_SQL}, warranty_year = :ref
+                WHERE {stale_filter}
+            """, {"ref": reference_year})
+            return cursor.rowcount
 
     # ------------------------------- Vehicle Retrieval ------------------------------- #
     def get_vehicle_by_stock(self, stock_number):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM vehicles WHERE stock_number = ?", (stock_number,))
-        return cursor.fetchone()
+        """Return the Vehicle with this stock number, or None."""
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = vehicle_row_factory
+            cursor.execute(f"{VEHICLE_SELECT} WHERE stock_number = ?", (stock_number,))
+            return cursor.fetchone()
 
     def get_vehicle_by_id(self, vehicle_id):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM vehicles WHERE id = ?", (vehicle_id,))
-        return cursor.fetchone()
+        """Return the Vehicle with this id, or None."""
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = vehicle_row_factory
+            cursor.execute(f"{VEHICLE_SELECT} WHERE id = ?", (vehicle_id,))
+            return cursor.fetchone()
 
     def stock_exists(self, stock_number):
         return self.get_vehicle_by_stock(stock_number) is not None
 
     def vin_exists(self, vin: str) -> bool:
         """Check if a VIN already exists in the database."""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT 1 FROM vehicles WHERE vin = ? LIMIT 1",
-            (vin.upper(),)
-        )
-        return cursor.fetchone() is not None
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT 1 FROM vehicles WHERE vin = ? LIMIT 1",
+                (vin.upper(),)
+            )
+            return cursor.fetchone() is not None
 
 
-    def get_vehicles(self, exclude_status=None):
-        cursor = self.conn.cursor()
-        query = """
-            SELECT id, user_name, stock_number, vin, make, model, year,
-                   mileage, notes, status, location, warranty, photos_taken,
-                   traded_in_by, certification
-            FROM vehicles
+    @staticmethod
+    def _vehicle_filters(filters=None, exclude_status=None):
         """
-        params = []
+        WHERE terms for vehicle queries.
+        :param filters: {column: value or list of values}, columns from VEHICLE_FILTER_COLUMNS
+        :param exclude_status: status or list of statuses to leave out
+        :return: (list of SQL terms, list of params)
+        """
+        where, params = [], []
+        for column, value in (filters or {}).items():
+            if column not in VEHICLE_FILTER_COLUMNS:
+                raise ValueError(f"Cannot filter vehicles by '{column}'")
+            values = [value] if isinstance(value, str) else list(value)
+            where.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params += values
         if exclude_status:
             if isinstance(exclude_status, str):
                 exclude_status = [exclude_status]
-            placeholders = ", ".join("?" * len(exclude_status))
-            query += f" WHERE status NOT IN ({placeholders})"
-            params = exclude_status
-        cursor.execute(query, params)
-        return cursor.fetchall()
+            where.append(f"status NOT IN ({', '.join('?' * len(exclude_status))})")
+            params += list(exclude_status)
+        return where, params
+
+    def get_vehicles(self, exclude_status=None):
+        """Return every active vehicle as a list of Vehicle records."""
+        where, params = self._vehicle_filters(exclude_status=exclude_status)
+        query = VEHICLE_SELECT + (" WHERE " + " AND ".join(where) if where else "")
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = vehicle_row_factory
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+    def get_vehicles_page(self, filters=None, order_by="id", limit=VEHICLE_PAGE_SIZE, after=None,
+                          exclude_status=None):
+        """
+        One page of vehicles sorted by order_by, starting just after the key `after`
+        (the order_by value of the last vehicle on the previous page). Keyset
+        pagination on an indexed column: page 1000 costs the same as page 1.
+        :return: list of Vehicle records (shorter than limit on the last page)
+        """
+        if order_by not in VEHICLE_ORDERINGS:
+            raise ValueError(f"Cannot page vehicles by '{order_by}'")
+        where, params = self._vehicle_filters(filters, exclude_status)
+        if after is not None:
+            where.append(f"{order_by} > ?")
+            params.append(after)
+
+        query = VEHICLE_SELECT + (" WHERE " + " AND ".join(where) if where else "")
+        query += f" ORDER BY {order_by} LIMIT ?"
+        params.append(limit)
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = vehicle_row_factory
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+    def iter_vehicles(self, filters=None, order_by="id", page_size=VEHICLE_PAGE_SIZE, after=None,
+                      exclude_status=None):
+        """
+        Yield vehicles lazily, one keyset page at a time, so memory stays at one
+        page however large the table is. Each page is its own short read; no
+        connection is held while the caller works through the rows.
+
+            for vehicle in db.iter_vehicles({"status": "Retail"}, order_by="stock_number"):
+                ...
+        """
+        while True:
+            page = self.get_vehicles_page(filters, order_by, page_size, after, exclude_status)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = getattr(page[-1], order_by)
 
     # ------------------------------- Vehicle Updates ------------------------------- #
-    def update_vehicle(self, vehicle_id, field, value):
-        allowed_fields = {"status", "location", "notes"}
+    # Logs the old -> new value; rows where the value doesn't change are skipped
+    RECORD_EVENT_SQL = """
+        INSERT INTO vehicle_events (vehicle_id, ts, field, old_value, new_value, author)
+        SELECT id, ?, ?, {field}, ?, ? FROM vehicles WHERE id = ? AND {field} IS NOT ?
+    """
+
+    @classmethod
+    def _write_field(cls, conn, field, updates):
+        """
+        Update one column for many vehicles and append their vehicle_events rows,
+        on conn inside the caller's transaction.
+        :param updates: list of (vehicle_id, value, author)
+        """
+        ts = datetime.now().strftime(NOTE_TS_DB_FORMAT)
+        conn.executemany(cls.RECORD_EVENT_SQL.format(field=field),
+                         [(ts, EVENT_FIELDS[field], value, author, vehicle_id, value)
+                          for vehicle_id, value, author in updates])
+        conn.executemany(f"UPDATE vehicles SET {field} = ? WHERE id = ?",
+                         [(value, vehicle_id) for vehicle_id, value, _ in updates])
+
+    def update_vehicle(self, vehicle_id, field, value, author=None):
+        allowed_fields = {"status", "location"}
         if field not in allowed_fields:
             raise ValueError(f"Cannot update field '{field}'")
-        cursor = self.conn.cursor()
-        cursor.execute(f"UPDATE vehicles SET {field} = ? WHERE id = ?", (value, vehicle_id))
-        self.conn.commit()
+        author = author or self.user
+        if self.write_behind:
+            self._queue_field(vehicle_id, field, value, author)
+            return
+        with self._writer() as conn:
+            self._write_field(conn, field, [(vehicle_id, value, author)])
+
+    def update_vehicle_fields(self, vehicle_id, changes, author=None):
+        """
+        Set several of status / location / photos_taken in one transaction:
+        either every change is written or none is.
+        :param changes: {field: value}
+        """
+        for field in changes:
+            if field not in EVENT_FIELDS:
+                raise ValueError(f"Cannot update field '{field}'")
+        author = author or self.user
+        if self.write_behind:
+            with self._pending_lock:
+                for field, value in changes.items():
+                    self._pending_fields[(vehicle_id, field)] = (value, author)
+                self._schedule_flush()
+            return
+        with self._writer() as conn:
+            for field, value in changes.items():
+                self._write_field(conn, field, [(vehicle_id, value, author)])
+
+    # ------------------------------- Notes ------------------------------- #
+    INSERT_NOTE_SQL = """
+        INSERT INTO vehicle_notes (vehicle_id, ts, author, department, body)
+        SELECT ?, ?, ?, ?, ?
+        WHERE EXISTS (SELECT 1 FROM vehicles WHERE id = ?)
+    """
+
+    def add_note(self, vehicle_id, body, author="", department="", ts=None):
+        """
+        Append one note row for a vehicle (O(1), no rewrite of earlier notes).
+        :param ts: timestamp in NOTE_TS_DB_FORMAT; defaults to now
+        """
+        ts = ts or datetime.now().strftime(NOTE_TS_DB_FORMAT)
+        params = (vehicle_id, ts, author, department, body)
+        if self.write_behind:
+            # Unknown vehicle IDs are skipped at flush time instead of raising
+            self._queue_note(params)
+            return
+        with self._writer() as conn:
+            cursor = conn.execute(self.INSERT_NOTE_SQL, params + (vehicle_id,))
+            if cursor.rowcount == 0:
+                raise ValueError(f"Vehicle ID {vehicle_id} not found")
 
     def append_note(self, vehicle_id, new_note):
-        vehicle = self.get_vehicle_by_id(vehicle_id)
-        if vehicle is None:
-            raise ValueError(f"Vehicle ID {vehicle_id} not found")
-        updated_notes = (vehicle["notes"] or "") + "\n" + new_note
-        self.update_vehicle(vehicle_id, "notes", updated_notes.strip())
+        """Append a note given as formatted text ("[timestamp] name (dept)\nbody...")."""
+        for note in parse_notes_blob(new_note) or [{"ts": "", "author": "", "department": "", "body": new_note}]:
+            self.add_note(vehicle_id, note["body"], note["author"], note["department"], note["ts"] or None)
+
+    def get_notes(self, vehicle_id, limit=NOTES_PAGE_SIZE, before=None):
+        """
+        One page of a vehicle's notes, newest first.
+        :param before: (ts, id) of the oldest note already shown, to fetch the next page
+        :return: list of rows (id, vehicle_id, ts, author, department, body)
+        """
+        query = "SELECT id, vehicle_id, ts, author, department, body FROM vehicle_notes WHERE vehicle_id = ?"
+        params = [vehicle_id]
+        if before is not None:
+            query += " AND (ts < ? OR (ts = ? AND id < ?))"
+            params += [before[0], before[0], before[1]]
+        query += " ORDER BY ts DESC, id DESC LIMIT ?"
+        params.append(limit)
+        with self._reader() as conn:
+            return conn.execute(query, params).fetchall()
+
+    def get_notes_text(self, vehicle_id, conn=None):
+        """All of a vehicle's notes rendered oldest-first as one text block."""
+        query = """
+            SELECT ts, author, department, body FROM vehicle_notes
+            WHERE vehicle_id = ? ORDER BY ts, id
+        """
+        if conn is not None:
+            rows = conn.execute(query, (vehicle_id,)).fetchall()
+        else:
+            with self._reader() as reader:
+                rows = reader.execute(query, (vehicle_id,)).fetchall()
+        return "\n".join(format_note(r["ts"], r["author"], r["department"], r["body"]) for r in rows)
+
+    # ------------------------------- Notes Search ------------------------------- #
+    # hit: every matching note with its bm25 rank; best: the top vehicles by their best note.
+    # snippet() is only computed for those, which is most of the cost on common words.
+    SEARCH_NOTES_SQL = """
+        WITH hit AS MATERIALIZED (
+            SELECT rowid, rank FROM vehicle_notes_fts WHERE vehicle_notes_fts MATCH :query
+        ),
+        best AS MATERIALIZED (
+            SELECT v.id AS vehicle_id, v.stock_number, v.year, v.make, v.model,
+                   MIN(hit.rank) AS score, hit.rowid AS note_id
+            FROM hit
+            JOIN vehicle_notes n ON n.id = hit.rowid
+            JOIN vehicles v ON v.id = n.vehicle_id
+            GROUP BY v.id
+            ORDER BY score LIMIT :limit
+        )
+        SELECT 0 AS sold, best.vehicle_id, best.stock_number, best.year, best.make, best.model,
+               best.score, snippet(vehicle_notes_fts, 0, '[', ']', '...', :tokens) AS snippet
+        FROM best
+        JOIN vehicle_notes_fts ON vehicle_notes_fts.rowid = best.note_id
+        WHERE vehicle_notes_fts MATCH :query
+    """
+
+    SEARCH_SOLD_NOTES_SQL = """
+        SELECT * FROM (
+            SELECT 1 AS sold, NULL AS vehicle_id, s.stock_number, s.year, s.make, s.model,
+                   hit.rank AS score,
+                   snippet(sold_notes_fts, 0, '[', ']', '...', :tokens) AS snippet
+            FROM sold_notes_fts AS hit
+            JOIN sold_vehicles s ON s.id = hit.rowid
+            WHERE sold_notes_fts MATCH :query
+            ORDER BY hit.rank LIMIT :limit
+        )
+    """
+
+    def search_notes(self, text, limit=SEARCH_LIMIT, include_sold=True):
+        """
+        Full-text search over notes on active (and sold) vehicles, best match first.
+        Each active vehicle appears once, with the snippet of its best matching note.
+        :param text: words typed by the user (all must match, last one as a prefix)
+        :return: list of dicts: sold, vehicle_id (None when sold), stock_number,
+                 year, make, model, score (lower is better), snippet
+        """
+        if not self.notes_search:
+            raise RuntimeError("Notes search needs SQLite with FTS5 support")
+        query = fts_query(text)
+        if not query:
+            return []
+
+        sql = self.SEARCH_NOTES_SQL
+        if include_sold:
+            sql += " UNION ALL " + self.SEARCH_SOLD_NOTES_SQL
+        sql += " ORDER BY score LIMIT :limit"
+
+        with self._reader() as conn:
+            try:
+                rows = conn.execute(sql, {"query": query, "tokens": SNIPPET_TOKENS, "limit": limit}).fetchall()
+            except sqlite3.OperationalError as e:
+                if "no such table" in str(e) or "no such module" in str(e):
+                    raise RuntimeError("Notes search needs SQLite with FTS5 support") from e
+                raise
+        return [dict(row) for row in rows]
 
     # ------------------------------- Add Vehicle ------------------------------- #
-    def add_vehicle(self, vehicle_data):
-        cursor = self.conn.cursor()
-        date_added = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        cursor.execute("""
-            INSERT INTO vehicles (
-                user_name, stock_number, vin, make, model, year, mileage,
-                notes, status, location, warranty, photos_taken, traded_in_by, certification
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    BULK_CHUNK = 500  # imported rows per transaction
+
+    INSERT_VEHICLE_SQL = """
+        INSERT INTO vehicles (
+            user_name, stock_number, vin, make, model, year, mileage,
+            notes, status, location, warranty, warranty_year, photos_taken, traded_in_by, certification,
+            date_added
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    @staticmethod
+    def _vehicle_params(vehicle_data, date_added, warranty_year=None):
+        return (
             vehicle_data.get("User Name", "Default"),
             vehicle_data["Stock Number"],
             vehicle_data.get("VIN", ""),
@@ -143,66 +652,473 @@ class VehicleDatabase:
             vehicle_data.get("Model", ""),
             vehicle_data.get("Year", ""),
             vehicle_data.get("Mileage", ""),
-            vehicle_data.get("Notes", ""),
+            None,  # notes live in vehicle_notes
             vehicle_data.get("Status", "Undecided"),
             vehicle_data.get("Location", "Service"),
             vehicle_data.get("Warranty", ""),
+            # Rows without a warranty stay stale until refresh_warranties fills them
+            (warranty_year or datetime.now().year) if vehicle_data.get("Warranty") else None,
             vehicle_data.get("Photos Taken", "No"),
             vehicle_data.get("Traded In By", ""),
-             vehicle_data.get("certification", "")
-        ))
-        self.conn.commit()
+            vehicle_data.get("certification", ""),
+            normalize_date(vehicle_data.get("Date Added")) or date_added
+        )
+
+    def add_vehicle(self, vehicle_data):
+        date_added = datetime.now().strftime(NOTE_TS_DB_FORMAT)
+        with self._writer() as conn:
+            cursor = conn.execute(self.INSERT_VEHICLE_SQL, self._vehicle_params(vehicle_data, date_added))
+            vehicle_id = cursor.lastrowid
+            if not vehicle_data.get("Warranty"):
+                conn.execute(f"UPDATE vehicles SET warranty = {WARRANTY_CASE_SQL}, warranty_year = :ref "
+                             f"WHERE id = :id", {"ref": datetime.now().year, "id": vehicle_id})
+            if vehicle_data.get("Notes"):
+                conn.execute(self.INSERT_NOTE_SQL, (vehicle_id, date_added, vehicle_data.get("User Name", ""),
+                                                    "", vehicle_data["Notes"], vehicle_id))
+
+    def add_vehicles_bulk(self, vehicles):
+        """
+        Validate and insert many vehicles, BULK_CHUNK rows per transaction so
+        other writers get the lock between chunks of a large file.
+        Rows use the same keys as add_vehicle. Duplicates within the batch are
+        found up front, duplicates against the database with one set-based
+        query per chunk. Supplied warranties are kept; missing ones are
+        classified in one batch. Both are stamped with this year, so
+        refresh_warranties treats them alike. If a chunk fails, the chunks
+        before it stay committed; importing the file again rejects those rows
+        as duplicates.
+        :param vehicles: iterable of vehicle dicts
+        :return: {"added": [stock numbers], "rejected": [{"row", "stock_number", "reason"}]}
+        """
+        now = datetime.now().strftime(NOTE_TS_DB_FORMAT)
+        max_year = datetime.now().year + 1
+        added, rejected = [], []
+        seen_stock, seen_vin = set(), set()
+
+        def reject(row_num, stock, reason):
+            rejected.append({"row": row_num, "stock_number": stock, "reason": reason})
 
-    def update_photos_taken(self, vehicle_id, value):
+        # ---------------- Validate rows ---------------- #
+        candidates = []
+        for row_num, data in enumerate(vehicles, start=1):
+            data = dict(data)
+            stock = str(data.get("Stock Number") or "").strip().upper()
+            vin = str(data.get("VIN") or "").replace(" ", "").upper()
+
+            if not validate_stock_number(stock):
+                reject(row_num, stock, "Stock Number must be 8 alphanumeric characters")
+                continue
+            if not validate_vin(vin):
+                reject(row_num, stock, "VIN must be 17 alphanumeric characters without I, O or Q")
+                continue
+            if not str(data.get("Make") or "").strip():
+                reject(row_num, stock, "Make is required")
+                continue
+            try:
+                year = int(str(data.get("Year") or "").strip())
+                mileage = int(str(data.get("Mileage") or "").replace(",", "").strip())
+            except ValueError:
+                reject(row_num, stock, "Year and Mileage must be whole numbers")
+                continue
+            if year < 1980 or year > max_year:
+                reject(row_num, stock, f"Year must be between 1980 and {max_year}")
+                continue
+            if mileage < 0:
+                reject(row_num, stock, "Mileage cannot be negative")
+                continue
+            if data.get("Date Added"):
+                data["Date Added"] = normalize_date(data["Date Added"])
+                if not data["Date Added"]:
+                    reject(row_num, stock, "Date Added must be a date like 2024-03-01 or 03/01/2024")
+                    continue
+            if stock in seen_stock:
+                reject(row_num, stock, "Duplicate Stock Number in import")
+                continue
+            if vin in seen_vin:
+                reject(row_num, stock, "Duplicate VIN in import")
+                continue
+            seen_stock.add(stock)
+            seen_vin.add(vin)
+
+            data["Stock Number"] = stock
+            data["VIN"] = vin
+            data["Make"] = str(data["Make"]).strip()
+            data["Year"] = str(year)
+            data["Mileage"] = str(mileage)
+            candidates.append((row_num, data))
+
+        if not candidates:
+            return {"added": added, "rejected": rejected}
+
+        # Classify missing warranties as one batch
+        reference_year = datetime.now().year
+        needs_warranty = [d for _, d in candidates if not d.get("Warranty")]
+        warranties = assign_warranty_batch(
+            [d["Make"] for d in needs_warranty],
+            [d["Year"] for d in needs_warranty],
+            [d["Mileage"] for d in needs_warranty],
+            reference_year
+        )
+        for data, warranty in zip(needs_warranty, warranties):
+            data["Warranty"] = warranty
+
+        for start in range(0, len(candidates), self.BULK_CHUNK):
+            added += self._insert_bulk_chunk(candidates[start:start + self.BULK_CHUNK],
+                                             now, reference_year, reject)
+
+        rejected.sort(key=lambda r: r["row"])
+        return {"added": added, "rejected": rejected}
+
+    def _insert_bulk_chunk(self, candidates, now, reference_year, reject):
+        """
+        Duplicate-check and insert validated rows in one transaction.
+        :param candidates: list of (row number, vehicle dict)
+        :return: stock numbers added
+        """
+        good = []
+        with self._writer() as conn:
+            # ---------------- Set-based duplicate check ---------------- #
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS import_keys (stock_number TEXT, vin TEXT)")
+            conn.execute("DELETE FROM import_keys")
+            conn.executemany(
+                "INSERT INTO import_keys (stock_number, vin) VALUES (?, ?)",
+                [(d["Stock Number"], d["VIN"]) for _, d in candidates]
+            )
+            existing_stock, existing_vin = set(), set()
+            for row in conn.execute("""
+                SELECT k.stock_number, k.vin,
+                       EXISTS (SELECT 1 FROM vehicles v WHERE v.stock_number = k.stock_number) AS stock_taken,
+                       EXISTS (SELECT 1 FROM vehicles v WHERE v.vin = k.vin) AS vin_taken
+                FROM import_keys k
+            """):
+                if row["stock_taken"]:
+                    existing_stock.add(row["stock_number"])
+                if row["vin_taken"]:
+                    existing_vin.add(row["vin"])
+            conn.execute("DELETE FROM import_keys")
+
+            for row_num, data in candidates:
+                if data["Stock Number"] in existing_stock:
+                    reject(row_num, data["Stock Number"], "Stock Number already exists")
+                elif data["VIN"] in existing_vin:
+                    reject(row_num, data["Stock Number"], "A vehicle with this VIN already exists")
+                else:
+                    good.append(data)
+
+            # ---------------- Insert ---------------- #
+            conn.executemany(self.INSERT_VEHICLE_SQL, [self._vehicle_params(d, now, reference_year) for d in good])
+            # Notes exported as rendered text split back into their original notes
+            conn.executemany("""
+                INSERT INTO vehicle_notes (vehicle_id, ts, author, department, body)
+                SELECT id, ?, ?, ?, ? FROM vehicles WHERE stock_number = ?
+            """, [(note["ts"] or now, note["author"], note["department"], note["body"], d["Stock Number"])
+                  for d in good if d.get("Notes")
+                  for note in parse_notes_blob(d["Notes"]) or [{"ts": "", "author": "", "department": "",
+                                                               "body": d["Notes"]}]])
+        return [d["Stock Number"] for d in good]
+
+    def update_photos_taken(self, vehicle_id, value, author=None):
         """
         Update the photos_taken field for a vehicle.
         :param vehicle_id: database ID of the vehicle
         :param value: 'Yes' or 'No'
         """
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "UPDATE vehicles SET photos_taken = ? WHERE id = ?",
-            (value, vehicle_id)
-        )
-        self.conn.commit()
+        author = author or self.user
+        if self.write_behind:
+            self._queue_field(vehicle_id, "photos_taken", value, author)
+            return
+        with self._writer() as conn:
+            self._write_field(conn, "photos_taken", [(vehicle_id, value, author)])
+
+    def update_photos_taken_bulk(self, updates, author=None):
+        """
+        Update photos_taken for many vehicles in one transaction.
+        :param updates: dict or iterable of (vehicle_id, 'Yes'/'No')
+        :return: number of rows written
+        """
+        if isinstance(updates, dict):
+            updates = updates.items()
+        author = author or self.user
+        params = [(vehicle_id, value, author) for vehicle_id, value in updates]
+        if not params:
+            return 0
+        with self._writer() as conn:
+            self._write_field(conn, "photos_taken", params)
+        return len(params)
 
 
 
     # ------------------------------- Sell Vehicle ------------------------------- #
+    SELL_CHUNK = 500  # stock numbers per statement (stays under SQLite's variable limit)
+
+    # Copies every vehicles column plus the rendered notes and sale fields in one statement
+    SELL_SQL = """
+        INSERT INTO sold_vehicles (
+            vehicle_id, user_name, stock_number, vin, make, model, year, mileage,
+            notes, status, location, warranty, warranty_year, photos_taken,
+            traded_in_by, certification, date_added, seller_name, date_sold
+        )
+        SELECT
+            v.id, v.user_name, v.stock_number, v.vin, v.make, v.model, v.year, v.mileage,
+            COALESCE((
+                SELECT group_concat(note, char(10)) FROM (
+                    SELECT format_note(n.ts, n.author, n.department, n.body) AS note
+                    FROM vehicle_notes n WHERE n.vehicle_id = v.id
+                    ORDER BY n.ts, n.id
+                )
+            ), ''),
+            v.status, v.location, v.warranty, v.warranty_year, v.photos_taken,
+            v.traded_in_by, v.certification, v.date_added, ?, ?
+        FROM vehicles v
+        WHERE v.stock_number IN ({placeholders})
+    """
+
     def sell_vehicle(self, stock_number, seller_name):
         """
         Sell a vehicle by Stock Number: move from 'vehicles' to 'sold_vehicles'.
         Returns True if successful, False if vehicle not found.
         """
-        cursor = self.conn.cursor()
+        return bool(self.sell_vehicles([stock_number], seller_name))
 
-        # Get the vehicle by stock number
-        vehicle = self.get_vehicle_by_stock(stock_number)
-        if not vehicle:
-            return False
+    def sell_vehicles(self, stock_numbers, seller_name):
+        """
+        Sell many vehicles at once (e.g. a month-end wholesale batch). Each one is
+        copied with INSERT ... SELECT and deleted, all in one transaction.
+        :return: list of the stock numbers that were found and sold
+        """
+        stock_numbers = list(dict.fromkeys(stock_numbers))
+        date_sold = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        sold = []
+
+        with self._writer() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+
+            for start in range(0, len(stock_numbers), self.SELL_CHUNK):
+                chunk = stock_numbers[start:start + self.SELL_CHUNK]
+                placeholders = ", ".join("?" * len(chunk))
+
+                sold += [row[0] for row in conn.execute(
+                    f"SELECT stock_number FROM vehicles WHERE stock_number IN ({placeholders})", chunk
+                )]
+                conn.execute(self.SELL_SQL.format(placeholders=placeholders),
+                             [seller_name, date_sold] + chunk)
+                conn.execute(f"DELETE FROM vehicles WHERE stock_number IN ({placeholders})", chunk)
+
+        return sold
+
+    # ------------------------------- Reports ------------------------------- #
+    # (label, lowest day, highest day or None for open-ended), in display order
+    AGING_BUCKETS = [("0-30", 0, 30), ("31-60", 31, 60), ("61-90", 61, 90), ("90+", 91, None)]
+    AGING_GROUPS = ("status", "make", "location")
+
+    # Turn-time grouping keys -> SQL expression over sold_vehicles
+    TURN_TIME_GROUPS = {"make": "make", "status": "status", "month": "substr(date_sold, 1, 7)"}
+
+    def aging_report(self, by=None, now=None):
+        """
+        Count active vehicles by days on the lot, aggregated in SQL.
+        Vehicles without a date_added (added before it was tracked) are left out.
+        :param by: optional "status", "make" or "location" to split each bucket by
+        :param now: reference datetime (defaults to now)
+        :return: {group: {bucket label: count}} with every bucket present;
+                 group is None when by is None
+        """
+        if by is not None and by not in self.AGING_GROUPS:
+            raise ValueError(f"Can't group aging by {by!r}; use one of {self.AGING_GROUPS}")
 
-        # Insert into sold_vehicles
-        cursor.execute("""
-            INSERT INTO sold_vehicles (
-                stock_number, vin, make, model, year, mileage,
-                notes, status, location, seller_name, date_sold
+        cases = " ".join(
+            f"WHEN days <= {high} THEN '{label}'" if high is not None else f"ELSE '{label}'"
+            for label, _, high in self.AGING_BUCKETS
+        )
+        group = by or "NULL"
+        sql = f"""
+            SELECT grp, CASE {cases} END AS bucket, COUNT(*)
+            FROM (
+                SELECT {group} AS grp, MAX(0, CAST(julianday(:now) - julianday(date_added) AS INTEGER)) AS days
+                FROM vehicles WHERE date_added IS NOT NULL
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            vehicle["stock_number"],
-            vehicle["vin"],
-            vehicle["make"],
-            vehicle["model"],
-            vehicle["year"],
-            vehicle["mileage"],
-            vehicle["notes"],
-            vehicle["status"],
-            vehicle["location"],
-            seller_name,
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # date_sold
-        ))
-
-        # Delete from active vehicles
-        cursor.execute("DELETE FROM vehicles WHERE stock_number = ?", (stock_number,))
-        self.conn.commit()
-        return True
+            GROUP BY grp, bucket
+        """
+        now = (now or datetime.now()).strftime(NOTE_TS_DB_FORMAT)
+
+        report = {}
+        with self._reader() as conn:
+            for grp, bucket, count in conn.execute(sql, {"now": now}):
+                counts = report.setdefault(grp, dict.fromkeys((b[0] for b in self.AGING_BUCKETS), 0))
+                counts[bucket] = count
+        return report
+
+    def count_vehicles(self, by="status"):
+        """Active vehicles per status / make / location: {value: count}, largest first."""
+        if by not in self.AGING_GROUPS:
+            raise ValueError(f"Can't count vehicles by {by!r}; use one of {self.AGING_GROUPS}")
+        with self._reader() as conn:
+            return dict(conn.execute(
+                f"SELECT {by}, COUNT(*) AS n FROM vehicles GROUP BY {by} ORDER BY n DESC, {by}"
+            ).fetchall())
+
+    def count_sold(self, since=None):
+        """Number of sold vehicles, optionally only those sold on or after since ("YYYY-MM-DD")."""
+        with self._reader() as conn:
+            if since:
+                return conn.execute("SELECT COUNT(*) FROM sold_vehicles WHERE date_sold >= ?",
+                                    (since,)).fetchone()[0]
+            return conn.execute("SELECT COUNT(*) FROM sold_vehicles").fetchone()[0]
+
+    def turn_time_report(self, group_by=("make",), since=None, until=None):
+        """
+        Days from date_added to date_sold for sold vehicles, aggregated in SQL.
+        The date_sold window is served by the idx_sold_turn_time covering index,
+        so the cost follows the window, not the whole sold history.
+        :param group_by: any of "make", "status", "month" (sale month, YYYY-MM)
+        :param since: first sale date included, "YYYY-MM-DD" (optional)
+        :param until: last sale date included, "YYYY-MM-DD" (optional)
+        :return: list of dicts with the group_by keys plus sold, avg_days, min_days, max_days
+        """
+        unknown = [g for g in group_by if g not in self.TURN_TIME_GROUPS]
+        if unknown:
+            raise ValueError(f"Can't group turn time by {unknown}; use any of {tuple(self.TURN_TIME_GROUPS)}")
+
+        where, params = ["date_added IS NOT NULL"], {}
+        if since:
+            where.append("date_sold >= :since")
+            params["since"] = since
+        if until:
+            # date_sold carries a time, so include the whole last day
+            where.append("date_sold < date(:until, '+1 day')")
+            params["until"] = until
+
+        columns = [f"{self.TURN_TIME_GROUPS[g]} AS {g}" for g in group_by] + [
+            "COUNT(*) AS sold",
+            "ROUND(AVG(days), 1) AS avg_days",
+            "ROUND(MIN(days), 1) AS min_days",
+            "ROUND(MAX(days), 1) AS max_days",
+        ]
+        group_clause = f"GROUP BY {', '.join(group_by)} ORDER BY {', '.join(group_by)}" if group_by else ""
+        # Inner SELECT reads only columns in idx_sold_turn_time, so the table itself is never touched
+        sql = f"""
+            SELECT {', '.join(columns)}
+            FROM (
+                SELECT date_sold, make, status, julianday(date_sold) - julianday(date_added) AS days
+                FROM sold_vehicles WHERE {' AND '.join(where)}
+            )
+            {group_clause}
+        """
+        with self._reader() as conn:
+            cursor = conn.execute(sql, params)
+            names = [c[0] for c in cursor.description]
+            rows = [dict(zip(names, row)) for row in cursor]
+        # Without group_by an empty window still yields one all-NULL row
+        return [row for row in rows if row["sold"]]
+
+    # ------------------------------- Change History ------------------------------- #
+    def get_vehicle_history(self, vehicle_id, field=None):
+        """
+        Every logged status / location / photos_taken change of one vehicle, oldest first.
+        Served by idx_vehicle_events_vehicle_ts; history survives the vehicle being sold.
+        :param field: only changes of this field (optional)
+        :return: list of dicts with ts, field, old_value, new_value, author
+        """
+        sql = "SELECT ts, field, old_value, new_value, author FROM vehicle_events WHERE vehicle_id = ?"
+        params = [vehicle_id]
+        if field is not None:
+            sql += " AND field = ?"
+            params.append(EVENT_FIELDS[field])
+        with self._reader() as conn:
+            return [
+                {"ts": ts, "field": EVENT_FIELD_NAMES.get(code, code),
+                 "old_value": old, "new_value": new, "author": author}
+                for ts, code, old, new, author in conn.execute(sql + " ORDER BY ts, id", params)
+            ]
+
+    def get_vehicles_as_of(self, ts):
+        """
+        Rebuild the inventory as it was at ts: vehicles added by then and not yet
+        sold, with status / location / photos_taken rolled back to their values at ts.
+
+        Starts from the current rows (vehicles, plus sold_vehicles sold after ts) and
+        undoes only the events logged after ts, so the cost follows how far back ts
+        is, not the size of the whole log. Vehicles from before date_added was kept
+        are included; sold rows from before vehicle_id was kept get a negative id.
+        :param ts: "YYYY-MM-DD HH:MM:SS" (or a datetime)
+        :return: list of Vehicle
+        """
+        if isinstance(ts, datetime):
+            ts = ts.strftime(NOTE_TS_DB_FORMAT)
+        columns = ", ".join(VEHICLE_COLUMNS[1:])
+        positions = {EVENT_FIELDS[name]: VEHICLE_COLUMNS.index(name) for name in EVENT_FIELDS}
+
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            rows = cursor.execute(f"""
+                SELECT id, {columns} FROM vehicles
+                WHERE date_added IS NULL OR date_added <= :ts
+                UNION ALL
+                SELECT COALESCE(vehicle_id, -id), {columns} FROM sold_vehicles
+                WHERE date_sold > :ts AND (date_added IS NULL OR date_added <= :ts)
+            """, {"ts": ts}).fetchall()
+
+            # Earliest event after ts per (vehicle, field): its old_value is the value at ts.
+            # SQLite takes the bare old_value column from the row that gives MIN(id).
+            # MATERIALIZED keeps the range scan on idx_vehicle_events_ts instead of a full
+            # walk of idx_vehicle_events_vehicle_ts for the GROUP BY order.
+            rollback = cursor.execute("""
+                WITH recent AS MATERIALIZED (
+                    SELECT id, vehicle_id, field, old_value FROM vehicle_events WHERE ts > ?
+                )
+                SELECT vehicle_id, field, old_value, MIN(id) FROM recent GROUP BY vehicle_id, field
+            """, (ts,)).fetchall()
+
+        by_id = {row[0]: list(row) for row in rows}
+        for vehicle_id, code, old_value, _ in rollback:
+            row = by_id.get(vehicle_id)
+            if row is not None and code in positions:
+                row[positions[code]] = old_value
+        return [Vehicle(*row) for row in by_id.values()]
+
+    # ------------------------------- Cross-Process Changes ------------------------------- #
+    def _prune_changes(self, keep=CHANGE_LOG_KEEP):
+        """Drop vehicle_changes rows older than the newest keep (a plain read when there are none)."""
+        with self._write_lock:
+            first, last = self.conn.execute("SELECT MIN(seq), MAX(seq) FROM vehicle_changes").fetchone()
+        if last is None or first > last - keep:
+            return
+        with self._writer() as conn:
+            conn.execute("DELETE FROM vehicle_changes WHERE seq <= (SELECT MAX(seq) FROM vehicle_changes) - ?",
+                         (keep,))
+
+    def get_change_seq(self):
+        """Newest vehicle_changes sequence number (0 when the log is empty)."""
+        with self._reader() as conn:
+            return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM vehicle_changes").fetchone()[0]
+
+    def get_changes_since(self, seq):
+        """
+        Vehicles inserted, updated or deleted (by any connection) after seq.
+        Triggers on vehicles fill vehicle_changes, so this reads only the new log
+        rows and the vehicles they name.
+        :return: {"seq": newest seq, "changed": [Vehicle], "removed": [vehicle ids]},
+                 or None when seq is older than the pruned log (reload everything)
+        """
+        with self._reader() as conn:
+            first, last = conn.execute("SELECT MIN(seq), MAX(seq) FROM vehicle_changes").fetchone()
+            if last is None or last <= seq:
+                return {"seq": max(seq, last or 0), "changed": [], "removed": []}
+            if seq < first - 1:
+                return None
+
+            ids = [row[0] for row in conn.execute(
+                "SELECT DISTINCT vehicle_id FROM vehicle_changes WHERE seq > ? AND seq <= ?", (seq, last)
+            )]
+            cursor = conn.cursor()
+            cursor.row_factory = vehicle_row_factory
+            changed = cursor.execute(f"""
+                {VEHICLE_SELECT} WHERE id IN (
+                    SELECT vehicle_id FROM vehicle_changes WHERE seq > ? AND seq <= ?
+                )
+            """, (seq, last)).fetchall()
+
+        found = {vehicle.id for vehicle in changed}
+        return {"seq": last, "changed": changed, "removed": [i for i in ids if i not in found]}
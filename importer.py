@@ -0,0 +1,73 @@
+import csv
+import json
+import os
+
+# Accepted column headers (lower-cased, '_' treated as ' ') -> add_vehicle keys.
+# An export's id and warranty_year columns are ignored: imported rows get new ones.
+HEADER_ALIASES = {
+    "stock number": "Stock Number",
+    "stock": "Stock Number",
+    "stock#": "Stock Number",
+    "stock #": "Stock Number",
+    "vin": "VIN",
+    "make": "Make",
+    "model": "Model",
+    "year": "Year",
+    "mileage": "Mileage",
+    "miles": "Mileage",
+    "odometer": "Mileage",
+    "notes": "Notes",
+    "status": "Status",
+    "location": "Location",
+    "warranty": "Warranty",
+    "photos taken": "Photos Taken",
+    "traded in by": "Traded In By",
+    "certification": "certification",
+    "user name": "User Name",
+    "date added": "Date Added",
+    "date in": "Date Added",
+    "received": "Date Added",
+}
+
+
+def normalize_row(row):
+    """Map an imported row's headers onto the keys VehicleDatabase.add_vehicle expects."""
+    vehicle = {}
+    for header, value in row.items():
+        if header is None:
+            continue
+        key = HEADER_ALIASES.get(str(header).strip().lower().replace("_", " "))
+        if key and value not in (None, ""):
+            vehicle[key] = str(value).strip()
+    return vehicle
+
+
+def read_import_file(path):
+    """
+    Read a CSV or JSON inventory export into a list of vehicle dicts.
+    JSON may be a list of objects or an object with a "vehicles" list.
+    """
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".json":
+        with open(path, encoding="utf-8-sig") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("vehicles", [])
+        return [normalize_row(row) for row in data]
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return [normalize_row(row) for row in csv.DictReader(f)]
+
+
+def format_import_report(report, max_lines=15):
+    """Human-readable summary of an add_vehicles_bulk report."""
+    lines = [f"Imported {len(report['added'])} vehicle(s)."]
+    rejected = report["rejected"]
+    if rejected:
+        lines.append(f"Rejected {len(rejected)} row(s):")
+        for r in rejected[:max_lines]:
+            lines.append(f"  Row {r['row']} ({r['stock_number'] or 'no stock #'}): {r['reason']}")
+        if len(rejected) > max_lines:
+            lines.append(f"  ...and {len(rejected) - max_lines} more")
+    return "\n".join(lines)
@@ -0,0 +1,211 @@
+"""
+In-memory index over the loaded Vehicle records.
+
+Primary maps find a vehicle by id, stock number or VIN in O(1). Secondary
+sets group vehicles by status, location and retail bucket and are updated
+on every add / remove / update, so building a view or applying an edit only
+touches the rows involved instead of rescanning the whole inventory.
+
+Secondary sets are sorted lists of vehicle ids, which is the order vehicles
+were loaded or added, so a view lists them that way and a vehicle that
+changes status or location keeps its place among the others. Moving one
+between sets is a bisect plus a list shift, never a re-sort.
+
+A sorted prefix index over stock numbers and VIN endings backs as-you-type
+suggestions (bisect, so each lookup is O(log n)).
+"""
+from bisect import bisect_left, insort
+from heapq import merge
+
+# Retail buckets in the order the ALL view shows them; wholesale goes below the separator
+RETAIL_BUCKET_ORDER = ["kia_cpo", "kia_limited", "kia_as_is", "non_kia_limited", "non_kia_as_is"]
+WHOLESALE_BUCKET = "wholesale"
+
+# VIN endings people read off the windshield / paperwork (last 8 = serial + plant + year)
+VIN_SUFFIX_LENGTHS = (8, 6)
+SUGGEST_LIMIT = 8
+
+
+def bucket_of(vehicle):
+    """Which ALL-view bucket a vehicle belongs to (by status, make and warranty)."""
+    if vehicle.status == "Wholesale":
+        return WHOLESALE_BUCKET
+    if "kia" in vehicle.make.lower():
+        if vehicle.warranty == "CPO":
+            return "kia_cpo"
+        if vehicle.warranty == "Limited":
+            return "kia_limited"
+        return "kia_as_is"
+    if vehicle.warranty == "Limited":
+        return "non_kia_limited"
+    return "non_kia_as_is"
+
+
+class InventoryIndex:
+    """Hash maps by id / stock number / VIN plus incrementally kept status, location and bucket sets."""
+
+    def __init__(self, vehicles=()):
+        self.by_id = {}
+        self.by_stock = {}
+        self.by_vin = {}
+        self.by_status = {}    # status -> sorted [vehicle id]
+        self.by_location = {}  # location -> sorted [vehicle id]
+        self.by_bucket = {}    # bucket name -> sorted [vehicle id]
+        self._stock_keys = []  # sorted (upper-case stock number, vehicle id)
+        self._vin_keys = []    # sorted (upper-case VIN ending, vehicle id)
+        self.load(vehicles)
+
+    # ------------------------------- Bulk ------------------------------- #
+    def load(self, vehicles):
+        """Replace the whole index with vehicles."""
+        for table in (self.by_id, self.by_stock, self.by_vin,
+                      self.by_status, self.by_location, self.by_bucket):
+            table.clear()
+        self._stock_keys = []
+        self._vin_keys = []
+        self.extend(vehicles)
+
+    def extend(self, vehicles):
+        """Add many vehicles (e.g. one loaded page), sorting the prefix index once."""
+        added = []
+        for vehicle in vehicles:
+            if vehicle.id in self.by_id:
+                self.remove(vehicle.id)
+            self._add(vehicle)
+            added.append(vehicle)
+
+        # Appending then sorting merges two sorted runs (fast), instead of inserting row by row
+        self._stock_keys.extend((v.stock_number.upper(), v.id) for v in added)
+        self._stock_keys.sort()
+        self._vin_keys.extend((key, v.id) for v in added for key in self._vin_keys_of(v))
+        self._vin_keys.sort()
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __iter__(self):
+        return iter(list(self.by_id.values()))
+
+    def __contains__(self, vehicle_id):
+        return vehicle_id in self.by_id
+
+    # ------------------------------- Lookups ------------------------------- #
+    def get(self, vehicle_id):
+        return self.by_id.get(vehicle_id)
+
+    def get_by_stock(self, stock_number):
+        return self.by_stock.get(stock_number)
+
+    def get_by_vin(self, vin):
+        return self.by_vin.get((vin or "").upper())
+
+    def with_status(self, *statuses):
+        """Vehicles whose status is any of statuses, grouped in the order given."""
+        return [self.by_id[i] for status in statuses for i in self.by_status.get(status, ())]
+
+    def without_status(self, *statuses):
+        """Vehicles whose status is none of statuses, in id order."""
+        groups = [ids for status, ids in self.by_status.items() if status not in statuses]
+        return [self.by_id[i] for i in merge(*groups)]
+
+    def at_location(self, location):
+        return [self.by_id[i] for i in self.by_location.get(location, ())]
+
+    def in_bucket(self, bucket):
+        return [self.by_id[i] for i in self.by_bucket.get(bucket, ())]
+
+    def suggest(self, text, limit=SUGGEST_LIMIT):
+        """
+        Vehicles whose stock number, or the last 8 / last 6 characters of whose
+        VIN, start with text (case-insensitive). Stock number matches come first.
+        """
+        prefix = (text or "").strip().upper()
+        if not prefix:
+            return []
+
+        suggestions, seen = [], set()
+        for keys in (self._stock_keys, self._vin_keys):
+            i = bisect_left(keys, (prefix,))
+            while i < len(keys) and keys[i][0].startswith(prefix) and len(suggestions) < limit:
+                vehicle_id = keys[i][1]
+                if vehicle_id not in seen:
+                    seen.add(vehicle_id)
+                    suggestions.append(self.by_id[vehicle_id])
+                i += 1
+        return suggestions
+
+    # ------------------------------- Mutations ------------------------------- #
+    def add(self, vehicle):
+        """Index a vehicle (replacing any earlier record with the same id)."""
+        if vehicle.id in self.by_id:
+            self.remove(vehicle.id)
+        self._add(vehicle)
+        insort(self._stock_keys, (vehicle.stock_number.upper(), vehicle.id))
+        for key in self._vin_keys_of(vehicle):
+            insort(self._vin_keys, (key, vehicle.id))
+
+    def _add(self, vehicle):
+        self.by_id[vehicle.id] = vehicle
+        self.by_stock[vehicle.stock_number] = vehicle
+        if vehicle.vin:
+            self.by_vin[vehicle.vin.upper()] = vehicle
+        self._link(vehicle)
+
+    def remove(self, vehicle_id):
+        """Drop a vehicle by id; returns the removed Vehicle or None."""
+        vehicle = self.by_id.pop(vehicle_id, None)
+        if vehicle is None:
+            return None
+        if self.by_stock.get(vehicle.stock_number) is vehicle:
+            del self.by_stock[vehicle.stock_number]
+        if vehicle.vin and self.by_vin.get(vehicle.vin.upper()) is vehicle:
+            del self.by_vin[vehicle.vin.upper()]
+        self._discard_key(self._stock_keys, (vehicle.stock_number.upper(), vehicle.id))
+        for key in self._vin_keys_of(vehicle):
+            self._discard_key(self._vin_keys, (key, vehicle.id))
+        self._unlink(vehicle)
+        return vehicle
+
+    def remove_stock(self, stock_number):
+        vehicle = self.by_stock.get(stock_number)
+        return self.remove(vehicle.id) if vehicle else None
+
+    def update(self, vehicle, **changes):
+        """
+        Set attributes on an indexed vehicle and move it between the
+        status / location / bucket sets it now belongs to. Sets whose key
+        didn't change are left alone.
+            index.update(vehicle, status="Wholesale")
+        """
+        old_keys = self._group_keys(vehicle)
+        for field, value in changes.items():
+            setattr(vehicle, field, value)
+        for (table, old), (_, new) in zip(old_keys, self._group_keys(vehicle)):
+            if old != new:
+                self._discard_key(table.get(old, []), vehicle.id)
+                insort(table.setdefault(new, []), vehicle.id)
+
+    # ------------------------------- Secondary sets ------------------------------- #
+    @staticmethod
+    def _vin_keys_of(vehicle):
+        vin = vehicle.vin.upper()
+        return {vin[-length:] for length in VIN_SUFFIX_LENGTHS if len(vin) >= length}
+
+    @staticmethod
+    def _discard_key(keys, entry):
+        i = bisect_left(keys, entry)
+        if i < len(keys) and keys[i] == entry:
+            del keys[i]
+
+    def _group_keys(self, vehicle):
+        return ((self.by_status, vehicle.status),
+                (self.by_location, vehicle.location),
+                (self.by_bucket, bucket_of(vehicle)))
+
+    def _link(self, vehicle):
+        for table, key in self._group_keys(vehicle):
+            insort(table.setdefault(key, []), vehicle.id)
+
+    def _unlink(self, vehicle):
+        for table, key in self._group_keys(vehicle):
+            self._discard_key(table.get(key, []), vehicle.id)
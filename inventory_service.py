@@ -0,0 +1,321 @@
+"""
+Headless HTTP/JSON service around VehicleDatabase.
+
+Run it on the machine that holds vehicles.db and point every desk at it
+(Main.py reads DB_SERVICE_URL / the VEHICLETRACKER_SERVICE environment
+variable) instead of opening the file over a share:
+
+    python inventory_service.py --host 0.0.0.0 --port 8765
+
+Every GET response carries an ETag built from VehicleDatabase.change_token().
+A client that sends it back in If-None-Match gets 304 Not Modified, without
+any table being read, until something is written to the database.
+
+Reads
+    GET  /vehicles                    ?status= &location= &make= &warranty= (repeatable)
+                                      &exclude_status= &order_by= &after= &limit=
+    GET  /vehicles/<id>
+    GET  /vehicles/<id>/notes         ?limit= &before_ts= &before_id=
+    GET  /vehicles/<id>/history       ?field=
+    GET  /stock/<stock_number>
+    GET  /vins/<vin>                  -> {"exists": bool}
+    GET  /inventory/as-of             ?ts=
+    GET  /changes                     ?since=<seq>  -> {"seq", "changed", "removed"} or {"expired": true}
+    GET  /changes/token               -> {"token", "seq"}
+    GET  /search                      ?q= &limit= &include_sold=
+    GET  /reports/aging               ?by= &now=
+    GET  /reports/turn-time           ?group_by=make,month &since= &until=
+Writes (JSON bodies)
+    POST  /vehicles                   add_vehicle keys ("Stock Number", "VIN", ...)
+    POST  /vehicles/bulk              list of add_vehicle dicts
+    PATCH /vehicles/<id>              {"status" / "location" / "photos_taken": value, "author"}
+    POST  /photos                     {"updates": {id: "Yes"/"No"}, "author"}
+    POST  /vehicles/<id>/notes        {"body", "author", "department", "ts"}
+    POST  /sell                       {"stock_numbers": [...], "seller_name"}
+    POST  /warranties/refresh         {"reference_year"}
+
+Errors come back as {"error": message}: 400 for bad input, 404 for unknown
+vehicles or paths, 500 for anything else.
+"""
+import argparse
+import json
+import re
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from database import VehicleDatabase, DB_FILE, VEHICLE_FILTER_COLUMNS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY = 16 * 1024 * 1024  # bulk imports of a few thousand rows fit easily
+
+
+class NotFound(Exception):
+    """Unknown vehicle or path (sent as 404)."""
+
+
+# ------------------------------- Routes ------------------------------- #
+# (method, path pattern, handler name); the first match wins
+ROUTES = [
+    ("GET", r"/vehicles", "list_vehicles"),
+    ("GET", r"/vehicles/(\d+)", "get_vehicle"),
+    ("GET", r"/vehicles/(\d+)/notes", "get_notes"),
+    ("GET", r"/vehicles/(\d+)/history", "get_history"),
+    ("GET", r"/stock/([^/]+)", "get_by_stock"),
+    ("GET", r"/vins/([^/]+)", "vin_exists"),
+    ("GET", r"/inventory/as-of", "as_of"),
+    ("GET", r"/changes", "get_changes"),
+    ("GET", r"/changes/token", "get_change_token"),
+    ("GET", r"/search", "search"),
+    ("GET", r"/reports/aging", "aging_report"),
+    ("GET", r"/reports/turn-time", "turn_time_report"),
+    ("POST", r"/vehicles", "add_vehicle"),
+    ("POST", r"/vehicles/bulk", "add_vehicles_bulk"),
+    ("PATCH", r"/vehicles/(\d+)", "update_vehicle"),
+    ("POST", r"/photos", "update_photos"),
+    ("POST", r"/vehicles/(\d+)/notes", "add_note"),
+    ("POST", r"/sell", "sell"),
+    ("POST", r"/warranties/refresh", "refresh_warranties"),
+]
+_ROUTES = [(method, re.compile(pattern + "$"), name) for method, pattern, name in ROUTES]
+
+
+def _one(query, name, default=None):
+    values = query.get(name)
+    return values[-1] if values else default
+
+
+def _flag(value):
+    return str(value).lower() in ("1", "true", "yes")
+
+
+class InventoryService:
+    """Route handlers: each takes (query, body, *path args) and returns (status, payload)."""
+
+    def __init__(self, db):
+        self.db = db
+
+    # ------------------------------- Reads ------------------------------- #
+    def list_vehicles(self, query, body):
+        filters = {c: query[c] for c in VEHICLE_FILTER_COLUMNS if c in query}
+        exclude_status = query.get("exclude_status")
+        order_by = _one(query, "order_by", "id")
+        after = _one(query, "after")
+        if after is not None and order_by == "id":
+            after = int(after)
+        limit = _one(query, "limit")
+
+        if limit is None:
+            vehicles = list(self.db.iter_vehicles(filters, order_by, after=after,
+                                                  exclude_status=exclude_status))
+        else:
+            vehicles = self.db.get_vehicles_page(filters, order_by, int(limit), after, exclude_status)
+        return 200, {"vehicles": [v.as_dict() for v in vehicles]}
+
+    def get_vehicle(self, query, body, vehicle_id):
+        vehicle = self.db.get_vehicle_by_id(int(vehicle_id))
+        if vehicle is None:
+            raise NotFound(f"Vehicle ID {vehicle_id} not found")
+        return 200, vehicle.as_dict()
+
+    def get_by_stock(self, query, body, stock_number):
+        vehicle = self.db.get_vehicle_by_stock(stock_number)
+        if vehicle is None:
+            raise NotFound(f"Stock number {stock_number} not found")
+        return 200, vehicle.as_dict()
+
+    def vin_exists(self, query, body, vin):
+        return 200, {"exists": self.db.vin_exists(vin)}
+
+    def get_notes(self, query, body, vehicle_id):
+        before = None
+        if _one(query, "before_ts") is not None:
+            before = (_one(query, "before_ts"), int(_one(query, "before_id", 0)))
+        kwargs = {"limit": int(query["limit"][-1])} if "limit" in query else {}
+        rows = self.db.get_notes(int(vehicle_id), before=before, **kwargs)
+        return 200, {"notes": [dict(row) for row in rows]}
+
+    def get_history(self, query, body, vehicle_id):
+        return 200, {"events": self.db.get_vehicle_history(int(vehicle_id), _one(query, "field"))}
+
+    def as_of(self, query, body):
+        ts = _one(query, "ts")
+        if not ts:
+            raise ValueError("ts is required")
+        return 200, {"vehicles": [v.as_dict() for v in self.db.get_vehicles_as_of(ts)]}
+
+    def get_changes(self, query, body):
+        changes = self.db.get_changes_since(int(_one(query, "since", 0)))
+        if changes is None:
+            return 200, {"expired": True}
+        return 200, {"seq": changes["seq"], "changed": [v.as_dict() for v in changes["changed"]],
+                     "removed": changes["removed"]}
+
+    def get_change_token(self, query, body):
+        return 200, {"token": self.db.change_token(), "seq": self.db.get_change_seq()}
+
+    def search(self, query, body):
+        kwargs = {"include_sold": _flag(_one(query, "include_sold", "true"))}
+        if "limit" in query:
+            kwargs["limit"] = int(_one(query, "limit"))
+        return 200, {"hits": self.db.search_notes(_one(query, "q", ""), **kwargs)}
+
+    def aging_report(self, query, body):
+        now = _one(query, "now")
+        report = self.db.aging_report(by=_one(query, "by"),
+                                      now=datetime.fromisoformat(now) if now else None)
+        # JSON object keys must be strings: the ungrouped report is keyed by None
+        return 200, {"report": [{"group": group, "buckets": buckets} for group, buckets in report.items()]}
+
+    def turn_time_report(self, query, body):
+        group_by = tuple(g for g in _one(query, "group_by", "make").split(",") if g)
+        return 200, {"report": self.db.turn_time_report(group_by, _one(query, "since"), _one(query, "until"))}
+
+    # ------------------------------- Writes ------------------------------- #
+    def add_vehicle(self, query, body):
+        if not isinstance(body, dict) or not body.get("Stock Number"):
+            raise ValueError("Stock Number is required")
+        self.db.add_vehicle(body)
+        return 201, self.db.get_vehicle_by_stock(body["Stock Number"]).as_dict()
+
+    def add_vehicles_bulk(self, query, body):
+        if not isinstance(body, list):
+            raise ValueError("Expected a list of vehicles")
+        return 200, self.db.add_vehicles_bulk(body)
+
+    def update_vehicle(self, query, body, vehicle_id):
+        vehicle_id = int(vehicle_id)
+        if self.db.get_vehicle_by_id(vehicle_id) is None:
+            raise NotFound(f"Vehicle ID {vehicle_id} not found")
+        author = body.pop("author", None)
+        # All fields of one PATCH in one transaction: a bad field leaves the vehicle untouched
+        self.db.update_vehicle_fields(vehicle_id, body, author)
+        return 200, self.db.get_vehicle_by_id(vehicle_id).as_dict()
+
+    def update_photos(self, query, body):
+        updates = {int(vehicle_id): value for vehicle_id, value in body.get("updates", {}).items()}
+        return 200, {"updated": self.db.update_photos_taken_bulk(updates, body.get("author"))}
+
+    def add_note(self, query, body, vehicle_id):
+        if not body.get("body"):
+            raise ValueError("Note body is required")
+        try:
+            self.db.add_note(int(vehicle_id), body["body"], body.get("author", ""),
+                             body.get("department", ""), body.get("ts"))
+        except ValueError as e:
+            raise NotFound(str(e)) from e
+        return 201, {}
+
+    def sell(self, query, body):
+        stock_numbers = body.get("stock_numbers")
+        if not stock_numbers or not body.get("seller_name"):
+            raise ValueError("stock_numbers and seller_name are required")
+        return 200, {"sold": self.db.sell_vehicles(stock_numbers, body["seller_name"])}
+
+    def refresh_warranties(self, query, body):
+        return 200, {"updated": self.db.refresh_warranties(body.get("reference_year"))}
+
+
+# ------------------------------- HTTP ------------------------------- #
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive: clients reuse one connection
+    service = None                 # set by make_server
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/") or "/"
+        query = parse_qs(url.query)
+
+        # Cheap check first: nothing written since the client's copy -> 304, no reads
+        etag = None
+        if method == "GET":
+            etag = f'"{self.service.db.change_token()}"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, None, etag)
+                return
+
+        try:
+            body = self._read_body()
+            for route_method, pattern, name in _ROUTES:
+                match = pattern.match(path)
+                if match and route_method == method:
+                    args = [unquote(arg) for arg in match.groups()]
+                    status, payload = getattr(self.service, name)(query, body, *args)
+                    break
+            else:
+                raise NotFound(f"No route for {method} {path}")
+        except NotFound as e:
+            status, payload, etag = 404, {"error": str(e)}, None
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            status, payload, etag = 400, {"error": str(e)}, None
+        except Exception as e:
+            status, payload, etag = 500, {"error": str(e)}, None
+        self._send(status, payload, etag)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            raise ValueError("Request body too large")
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _send(self, status, payload, etag=None):
+        data = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")  # always revalidate
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Quiet by default; the service usually runs unattended
+        pass
+
+
+def make_server(db, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    Build (but don't start) a threaded HTTP server for db.
+    port=0 picks a free port; read it back from server.server_address.
+    """
+    handler = type("InventoryHandler", (_Handler,), {"service": InventoryService(db)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VehicleTracker inventory service")
+    parser.add_argument("--db", default=DB_FILE, help="path of vehicles.db")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help="interface to listen on (0.0.0.0 for the whole LAN)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    # The service runs next to the file, so WAL + a reader pool is safe here
+    db = VehicleDatabase(args.db, pooled=True)
+    server = make_server(db, args.host, args.port)
+    print(f"serving {args.db} on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Versioned schema migrations for vehicles.db.
+
+PRAGMA user_version stores the number of the last migration applied.
+At startup every newer migration runs once, in order, each inside its own
+transaction, so existing databases upgrade in place.
+"""
+import sqlite3
+from utils import parse_notes_blob
+
+
+# ------------------------------- Migrations ------------------------------- #
+def _create_base_tables(cursor):
+    # Active vehicles table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS vehicles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_name TEXT,
+            stock_number TEXT UNIQUE NOT NULL,
+            vin TEXT,
+            make TEXT,
+            model TEXT,
+            year TEXT,
+            mileage TEXT,
+            notes TEXT,
+            status TEXT,
+            location TEXT,
+            warranty TEXT,
+            photos_taken TEXT DEFAULT 'No',
+            traded_in_by TEXT,
+            certification TEXT
+        )
+    """)
+
+    # Sold vehicles table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sold_vehicles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stock_number TEXT,
+            vin TEXT,
+            make TEXT,
+            model TEXT,
+            year TEXT,
+            mileage TEXT,
+            notes TEXT,
+            status TEXT,
+            location TEXT,
+            seller_name TEXT,
+            date_sold TEXT
+        )
+    """)
+
+
+def _add_lookup_indexes(cursor):
+    # vehicles.stock_number is already covered by its UNIQUE constraint
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_vehicles_vin ON vehicles(vin)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_vehicles_status ON vehicles(status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_vehicles_location ON vehicles(location)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sold_stock_number ON sold_vehicles(stock_number)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sold_vin ON sold_vehicles(vin)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sold_date_sold ON sold_vehicles(date_sold)")
+
+
+def _create_vehicle_notes(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS vehicle_notes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            vehicle_id INTEGER NOT NULL,
+            ts TEXT NOT NULL DEFAULT '',
+            author TEXT,
+            department TEXT,
+            body TEXT NOT NULL
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_vehicle_notes_vehicle_ts ON vehicle_notes(vehicle_id, ts)")
+
+    # Move the legacy notes blobs into one row per note
+    rows = cursor.execute(
+        "SELECT id, notes FROM vehicles WHERE notes IS NOT NULL AND notes != ''"
+    ).fetchall()
+    for vehicle_id, blob in rows:
+        cursor.executemany(
+            "INSERT INTO vehicle_notes (vehicle_id, ts, author, department, body) VALUES (?, ?, ?, ?, ?)",
+            [(vehicle_id, n["ts"], n["author"], n["department"], n["body"]) for n in parse_notes_blob(blob)]
+        )
+    cursor.execute("UPDATE vehicles SET notes = NULL WHERE notes IS NOT NULL")
+
+
+def _add_warranty_year(cursor):
+    # warranty_year = the year the stored warranty was computed for; NULL means stale
+    cursor.execute("ALTER TABLE vehicles ADD COLUMN warranty_year INTEGER")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_vehicles_warranty ON vehicles(warranty)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_vehicles_warranty_year ON vehicles(warranty_year)")
+
+
+def _create_notes_search(cursor):
+    # External-content FTS5 indexes: the text stays in vehicle_notes / sold_vehicles,
+    # triggers keep the indexes in step with every insert, update and delete.
+    # Idempotent: ensure_notes_search re-runs it on databases migrated without FTS5.
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS vehicle_notes_fts USING fts5(
+                body, author, content='vehicle_notes', content_rowid='id', tokenize='porter unicode61'
+            )
+        """)
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5: skip; ensure_notes_search adds it on a later open
+        return
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS sold_notes_fts USING fts5(
+            notes, content='sold_vehicles', content_rowid='id', tokenize='porter unicode61'
+        )
+    """)
+
+    for statement in (
+        """CREATE TRIGGER IF NOT EXISTS vehicle_notes_fts_ai AFTER INSERT ON vehicle_notes BEGIN
+               INSERT INTO vehicle_notes_fts (rowid, body, author) VALUES (new.id, new.body, new.author);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS vehicle_notes_fts_ad AFTER DELETE ON vehicle_notes BEGIN
+               INSERT INTO vehicle_notes_fts (vehicle_notes_fts, rowid, body, author)
+               VALUES ('delete', old.id, old.body, old.author);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS vehicle_notes_fts_au AFTER UPDATE OF body, author ON vehicle_notes BEGIN
+               INSERT INTO vehicle_notes_fts (vehicle_notes_fts, rowid, body, author)
+               VALUES ('delete', old.id, old.body, old.author);
+               INSERT INTO vehicle_notes_fts (rowid, body, author) VALUES (new.id, new.body, new.author);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS sold_notes_fts_ai AFTER INSERT ON sold_vehicles BEGIN
+               INSERT INTO sold_notes_fts (rowid, notes) VALUES (new.id, new.notes);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS sold_notes_fts_ad AFTER DELETE ON sold_vehicles BEGIN
+               INSERT INTO sold_notes_fts (sold_notes_fts, rowid, notes) VALUES ('delete', old.id, old.notes);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS sold_notes_fts_au AFTER UPDATE OF notes ON sold_vehicles BEGIN
+               INSERT INTO sold_notes_fts (sold_notes_fts, rowid, notes) VALUES ('delete', old.id, old.notes);
+               INSERT INTO sold_notes_fts (rowid, notes) VALUES (new.id, new.notes);
+           END""",
+    ):
+        cursor.execute(statement)
+
+    # Index everything already in the tables
+    cursor.execute("INSERT INTO vehicle_notes_fts (vehicle_notes_fts) VALUES ('rebuild')")
+    cursor.execute("INSERT INTO sold_notes_fts (sold_notes_fts) VALUES ('rebuild')")
+
+
+def _sold_vehicles_parity(cursor):
+    # Keep every vehicles column on the sold record (vehicle_id links back to vehicle_notes)
+    for column, sql_type in (
+        ("vehicle_id", "INTEGER"),
+        ("user_name", "TEXT"),
+        ("warranty", "TEXT"),
+        ("warranty_year", "INTEGER"),
+        ("photos_taken", "TEXT"),
+        ("traded_in_by", "TEXT"),
+        ("certification", "TEXT"),
+    ):
+        cursor.execute(f"ALTER TABLE sold_vehicles ADD COLUMN {column} {sql_type}")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sold_vehicle_id ON sold_vehicles(vehicle_id)")
+
+
+def _add_date_added(cursor):
+    # When a vehicle entered inventory; NULL for vehicles added before this migration
+    cursor.execute("ALTER TABLE vehicles ADD COLUMN date_added TEXT")
+    cursor.execute("ALTER TABLE sold_vehicles ADD COLUMN date_added TEXT")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_vehicles_date_added ON vehicles(date_added)")
+    # Covering index for turn-time reports over a date_sold window
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sold_turn_time
+        ON sold_vehicles(date_sold, date_added, make, status)
+    """)
+
+
+def _create_vehicle_events(cursor):
+    # Append-only field change log; field is an integer code (database.EVENT_FIELDS)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS vehicle_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            vehicle_id INTEGER NOT NULL,
+            ts TEXT NOT NULL,
+            field INTEGER NOT NULL,
+            old_value TEXT,
+            new_value TEXT,
+            author TEXT
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_vehicle_events_vehicle_ts ON vehicle_events(vehicle_id, ts)")
+    # Time-travel queries only read the events after the requested time
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_vehicle_events_ts ON vehicle_events(ts)")
+
+
+def _create_vehicle_changes(cursor):
+    # Ordered log of which vehicles rows changed (any column, any connection), so other
+    # processes can fetch just those rows; pruned by VehicleDatabase._prune_changes
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS vehicle_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            vehicle_id INTEGER NOT NULL
+        )
+    """)
+    for event, row in (("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old")):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS vehicle_changes_{event.lower()} AFTER {event} ON vehicles BEGIN
+                INSERT INTO vehicle_changes (vehicle_id) VALUES ({row}.id);
+            END
+        """)
+
+
+# (version, description, function) -- append only, never renumber
+MIGRATIONS = [
+    (1, "base vehicles / sold_vehicles tables", _create_base_tables),
+    (2, "indexes on hot lookup columns", _add_lookup_indexes),
+    (3, "vehicle_notes table, migrated from vehicles.notes", _create_vehicle_notes),
+    (4, "persisted warranty with its reference year", _add_warranty_year),
+    (5, "FTS5 full-text search over active and sold notes", _create_notes_search),
+    (6, "sold_vehicles carries every vehicles column", _sold_vehicles_parity),
+    (7, "date_added on vehicles and sold_vehicles", _add_date_added),
+    (8, "vehicle_events change history", _create_vehicle_events),
+    (9, "vehicle_changes log for cross-process refresh", _create_vehicle_changes),
+]
+
+
+# ------------------------------- Runner ------------------------------- #
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def ensure_notes_search(conn):
+    """
+    Create the notes search index if it is missing. Migration 5 skips it when
+    SQLite lacks FTS5, and user_version moves on regardless, so this runs on
+    every open: a plain read when the index exists or FTS5 is still missing.
+    :param conn: sqlite3 connection
+    :return: True when notes search is available
+    """
+    tables = {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE name IN ('vehicle_notes_fts', 'sold_notes_fts')"
+    )}
+    if len(tables) == 2:
+        return True
+    if not conn.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0]:
+        return False
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN")
+        _create_notes_search(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return True
+
+
+def apply_migrations(conn, migrations=MIGRATIONS):
+    """
+    Apply every migration newer than the database's user_version.
+    :param conn: sqlite3 connection
+    :param migrations: ordered list of (version, description, function)
+    :return: list of versions applied
+    """
+    current = get_schema_version(conn)
+    applied = []
+
+    for version, description, migrate in migrations:
+        if version <= current:
+            continue
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN")
+            migrate(cursor)
+            # PRAGMA doesn't accept bound parameters; version is always an int
+            cursor.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise RuntimeError(f"Migration {version} ({description}) failed: {e}") from e
+
+        applied.append(version)
+
+    return applied
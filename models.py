@@ -0,0 +1,67 @@
+"""
+Typed in-memory record for an active vehicle.
+
+VehicleDatabase builds these directly from SQLite rows (vehicle_row_factory),
+so the main window, the grid and every popup share one shape.
+"""
+
+# Column order of VehicleDatabase's vehicle SELECTs and of Vehicle.__init__
+VEHICLE_COLUMNS = (
+    "id", "user_name", "stock_number", "vin", "make", "model", "year", "mileage",
+    "status", "location", "warranty", "warranty_year", "photos_taken",
+    "traded_in_by", "certification", "date_added",
+)
+
+# Values the status / location dropdowns offer
+STATUSES = ("Undecided", "Retail", "Wholesale")
+LOCATIONS = ("Service", "Detail", "Retail lot", "Wholesale lot")
+
+
+def _to_int(value):
+    """int for numeric text like "2019" or "45,000"; None when blank or not a number."""
+    if value is None or isinstance(value, int):
+        return value
+    try:
+        return int(str(value).replace(",", "").strip())
+    except ValueError:
+        return None
+
+
+class Vehicle:
+    """
+    One row of the vehicles table. year and mileage are ints (None when blank);
+    empty status/location/photos_taken get the same defaults the UI shows.
+    """
+    __slots__ = VEHICLE_COLUMNS
+
+    def __init__(self, id, user_name, stock_number, vin, make, model, year, mileage,
+                 status, location, warranty, warranty_year, photos_taken,
+                 traded_in_by, certification, date_added):
+        self.id = id
+        self.user_name = user_name or ""
+        self.stock_number = stock_number
+        self.vin = vin or ""
+        self.make = make or ""
+        self.model = model or ""
+        self.year = _to_int(year)
+        self.mileage = _to_int(mileage)
+        self.status = status or "Undecided"
+        self.location = location or "Service"
+        self.warranty = warranty
+        self.warranty_year = warranty_year
+        self.photos_taken = photos_taken or "No"
+        self.traded_in_by = traded_in_by or ""
+        self.certification = certification or ""
+        self.date_added = date_added  # "YYYY-MM-DD HH:MM:SS", None for vehicles added before it was tracked
+
+    def as_dict(self):
+        """{column: value} in VEHICLE_COLUMNS order; Vehicle(**d) rebuilds the record."""
+        return {column: getattr(self, column) for column in VEHICLE_COLUMNS}
+
+    def __repr__(self):
+        return f"Vehicle(id={self.id!r}, stock_number={self.stock_number!r}, {self.year} {self.make} {self.model})"
+
+
+def vehicle_row_factory(cursor, row):
+    """sqlite3 row_factory for queries that select VEHICLE_COLUMNS in order."""
+    return Vehicle(*row)
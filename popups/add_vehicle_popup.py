@@ -1,51 +1,35 @@
 ﻿import customtkinter as ctk
 from tkinter import messagebox
 from datetime import datetime
-from utils import assign_warranty, validate_vin
+from utils import assign_warranty, validate_vin, validate_stock_number
+from vehicle_catalog import MAKE_MODEL_MAP, SORTED_MAKES, makes_with_prefix, find_make
 from .profile_popup import ProfilePopup
+from .popup_manager import ReusablePopup
 
+MAKE_BUTTON_POOL = 40  # most makes the dropdown shows at once; buttons are reused, never recreated
 
-class AddVehiclePopup(ctk.CTkToplevel):
-    def __init__(self, master, db, refresh_callback=None):
+
+class AddVehiclePopup(ReusablePopup, ctk.CTkToplevel):
+    def __init__(self, master, db, refresh_callback=None, db_async=None, visible=True):
         super().__init__(master)
+        self._make_reusable(visible)
 
         self.db = db
+        self.db_async = db_async  # optional AsyncVehicleDatabase; checks and insert then run off the Tk thread
         self.refresh_callback = refresh_callback
 
         self.title("Add Vehicle")
         self.geometry("400x450")
         self.transient(master)
-        self.focus_force()
-        self.center_window()
+        if visible:
+            self.focus_force()
+            self.center_window()
 
         self.make_selected = False
         self.ignore_next_make_focus = False
 
         # ---------------- Make / Model Mapping ---------------- #
-        self.make_model_map = {
-            "Acura": ["ILX","Integra","MDX","RDX","RLX","TLX","ZDX"],
-            "Audi": ["A3","A4","A5","A6","A7","A8","Q3","Q5","Q7","Q8","TT","e-tron"],
-            "BMW": ["2 Series","3 Series","4 Series","5 Series","7 Series","X1","X2","X3","X4","X5","X6","Z4"],
-            "Buick": ["Enclave","Encore","Encore GX","Envision","LaCrosse","Regal"],
-            "Cadillac": ["CT4","CT5","CT6","Escalade","XT4","XT5","XT6"],
-            "Chevrolet": ["Bolt EV","Camaro","Corvette","Equinox","Malibu","Silverado","Tahoe","Traverse","Trax","Suburban","Colorado"],
-            "Chrysler": ["300","Pacifica","Voyager"],
-            "Dodge": ["Challenger","Charger","Durango","Journey","Grand Caravan"],
-            "Ford": ["Bronco","EcoSport","Edge","Escape","Expedition","Explorer","F-150","F-250","F-350","Fusion","Mustang","Ranger","Transit Connect"],
-            "GMC": ["Acadia","Canyon","Sierra 1500","Sierra 2500","Sierra 3500","Terrain","Yukon"],
-            "Honda": ["Accord","Civic","CR-V","HR-V","Odyssey","Passport","Pilot","Ridgeline"],
-            "Hyundai": ["Accent","Elantra","Ioniq","Kona","Palisade","Santa Fe","Sonata","Tucson","Venue","Veloster"],
-            "Jeep": ["Cherokee","Compass","Grand Cherokee","Wrangler","Gladiator","Renegade"],
-            "Kia": ["Carnival","Forte","K5","K7","Niro","Sorento","Soul","Sportage","Stinger","Telluride"],
-            "Mazda": ["3","6","CX-3","CX-30","CX-5","CX-50","CX-9","MX-5 Miata"],
-            "Mercedes-Benz": ["A-Class","C-Class","E-Class","GLA","GLC","GLE","GLS","S-Class","EQB","EQC"],
-            "Nissan": ["Altima","Armada","Frontier","GT-R","Kicks","Leaf","Maxima","Murano","Pathfinder","Rogue","Sentra","Titan","Versa","Z"],
-            "Subaru": ["Ascent","BRZ","Crosstrek","Forester","Impreza","Outback","WRX"],
-            "Tesla": ["Model 3","Model S","Model X","Model Y","Cybertruck"],
-            "Toyota": ["4Runner","Avalon","Camry","Corolla","Highlander","Land Cruiser","Prius","RAV4","Sequoia","Sienna","Tacoma","Tundra","Venza","Yaris"],
-            "Volkswagen": ["Atlas","Golf","Jetta","Passat","Tiguan","ID.4"],
-            "Volvo": ["S60","S90","V60","V90","XC40","XC60","XC90"]
-        }
+        self.make_model_map = MAKE_MODEL_MAP
 
         self.fields = [
             "Stock Number", "VIN", "Make", "Model",
@@ -55,6 +39,9 @@ class AddVehiclePopup(ctk.CTkToplevel):
         self.entries = {}
         self.make_popup = None
         self.make_frame = None
+        self.make_buttons = []      # fixed pool, created with the dropdown window
+        self.make_visible = 0       # how many pool buttons are packed (always the first N)
+        self.make_dropdown_open = False
 
         # ---------------- Form Fields ---------------- #
         for field in self.fields:
@@ -88,8 +75,28 @@ class AddVehiclePopup(ctk.CTkToplevel):
         btn_frame = ctk.CTkFrame(self)
         btn_frame.pack(pady=15)
 
-        ctk.CTkButton(btn_frame, text="Add Vehicle", command=self.add_vehicle).grid(row=0, column=0, padx=5)
-        ctk.CTkButton(btn_frame, text="Cancel", command=self.destroy).grid(row=0, column=1, padx=5)
+        self.add_button = ctk.CTkButton(btn_frame, text="Add Vehicle", command=self.add_vehicle)
+        self.add_button.grid(row=0, column=0, padx=5)
+        ctk.CTkButton(btn_frame, text="Cancel", command=self.hide).grid(row=0, column=1, padx=5)
+
+    # ======================================================
+    # Reuse
+    # ======================================================
+    def reopen(self):
+        """Start again from an empty form."""
+        for field, entry in self.entries.items():
+            if field == "Model":
+                entry.configure(values=[])
+                entry.set("")
+            else:
+                entry.delete(0, "end")
+        self.make_selected = False
+        self.ignore_next_make_focus = False
+        self.add_button.configure(state="normal", text="Add Vehicle")
+
+    def hide(self):
+        self.close_make_dropdown()
+        super().hide()
 
     # ======================================================
     # Make Dropdown Logic
@@ -101,7 +108,7 @@ class AddVehiclePopup(ctk.CTkToplevel):
 
         self.make_selected = False
 
-        if self.make_popup and self.make_popup.winfo_exists():
+        if self.make_dropdown_open:
             return
 
         entry = self.entries["Make"]
@@ -111,62 +118,82 @@ class AddVehiclePopup(ctk.CTkToplevel):
         y = entry.winfo_rooty() + entry.winfo_height()
         width = entry.winfo_width()
 
+        if not self.make_popup or not self.make_popup.winfo_exists():
+            self._build_make_dropdown(width)
+
+        self.make_popup.geometry(f"{width}x200+{x}+{y}")
+        self.make_popup.deiconify()
+        self.make_popup.lift()
+        self.make_dropdown_open = True
+
+        self.populate_make_dropdown(makes_with_prefix(entry.get()))
+
+    def _build_make_dropdown(self, width):
+        """Create the (hidden) dropdown window and its pool of make buttons, once per popup."""
         self.make_popup = ctk.CTkToplevel(self)
+        self.make_popup.withdraw()
         self.make_popup.overrideredirect(True)
         self.make_popup.attributes("-topmost", True)
-        self.make_popup.geometry(f"{width}x200+{x}+{y}")
 
         self.make_frame = ctk.CTkScrollableFrame(
             self.make_popup, width=width, height=200
         )
         self.make_frame.pack(fill="both", expand=True)
 
-        self.populate_make_dropdown(self.make_model_map.keys())
-
-
+        self.make_buttons = [
+            ctk.CTkButton(
+                self.make_frame,
+                text="",
+                anchor="w",
+                height=26,
+                fg_color=("gray95", "gray20"),
+                hover_color=("gray80", "gray30"),
+                text_color=("black", "white"),
+                command=lambda i=i: self.select_make(self.make_buttons[i].cget("text"))
+            )
+            for i in range(min(len(SORTED_MAKES), MAKE_BUTTON_POOL))
+        ]
+        self.make_visible = 0
+        # Shown below the pool when more makes match than there are buttons
+        self.make_more_label = ctk.CTkLabel(self.make_frame, text="", anchor="w", text_color="gray")
 
     def filter_make_dropdown(self, event=None):
         if self.make_selected:
             return
 
-        text = self.entries["Make"].get().strip().lower()
+        matches = makes_with_prefix(self.entries["Make"].get())
 
-        if not self.make_popup or not self.make_popup.winfo_exists():
-            self.open_make_dropdown()
-
-        if not text:
-            self.populate_make_dropdown(self.make_model_map.keys())
+        if not matches:
+            self.close_make_dropdown()
             return
 
-        matches = [
-            make for make in self.make_model_map
-            if make.lower().startswith(text)
-        ]
-
-        if matches:
-            self.populate_make_dropdown(matches)
+        if not self.make_dropdown_open:
+            self.open_make_dropdown()
         else:
-            self.close_make_dropdown()
-
+            self.populate_make_dropdown(matches)
 
     def populate_make_dropdown(self, makes):
-        if not self.make_frame:
+        """Relabel, show and hide pooled buttons; no widgets are created or destroyed."""
+        if not self.make_buttons:
             return
 
-        for widget in self.make_frame.winfo_children():
-            widget.destroy()
+        hidden = len(makes) - len(self.make_buttons)
+        makes = makes[:len(self.make_buttons)]
+        for button, make in zip(self.make_buttons, makes):
+            if button.cget("text") != make:
+                button.configure(text=make)
 
-        for make in sorted(makes):
-            ctk.CTkButton(
-                self.make_frame,
-                text=make,
-                anchor="w",
-                height=26,
-                fg_color=("gray95", "gray20"),
-                hover_color=("gray80", "gray30"),
-                text_color=("black", "white"),
-                command=lambda m=make: self.select_make(m)
-            ).pack(fill="x", padx=6, pady=1)
+        # Visible buttons are always the first N of the pool, so packing order stays sorted
+        for button in self.make_buttons[len(makes):self.make_visible]:
+            button.pack_forget()
+        self.make_more_label.pack_forget()
+        for button in self.make_buttons[self.make_visible:len(makes)]:
+            button.pack(fill="x", padx=6, pady=1)
+        self.make_visible = len(makes)
+
+        if hidden > 0:
+            self.make_more_label.configure(text=f"+{hidden} more, keep typing")
+            self.make_more_label.pack(fill="x", padx=10, pady=(2, 4))
 
     def select_make(self, make):
         self.make_selected = True
@@ -183,11 +210,10 @@ class AddVehiclePopup(ctk.CTkToplevel):
     def close_make_dropdown(self):
         if self.make_popup and self.make_popup.winfo_exists():
             try:
-                self.make_popup.destroy()
+                self.make_popup.withdraw()
             except:
                 pass
-        self.make_popup = None
-        self.make_frame = None
+        self.make_dropdown_open = False
 
 
     def on_make_selected(self, make):
@@ -197,7 +223,7 @@ class AddVehiclePopup(ctk.CTkToplevel):
         model_box.set("")
 
     def _global_click_handler(self, event):
-        if not self.make_popup or not self.make_popup.winfo_exists():
+        if not self.make_dropdown_open:
             return
         widget = event.widget
         if widget is self.entries["Make"]:
@@ -234,17 +260,16 @@ class AddVehiclePopup(ctk.CTkToplevel):
 
     def center_window(self):
         self.update_idletasks()
-        w, h = self.winfo_width(), self.winfo_height()
+        w, h = 400, 450  # fixed size; winfo_width is 1 while the popup is still hidden
         x = (self.winfo_screenwidth() // 2) - (w // 2)
         y = (self.winfo_screenheight() // 2) - (h // 2)
         self.geometry(f"{w}x{h}+{x}+{y}")
 
     def confirm_make_from_text(self, event=None):
-        text = self.entries["Make"].get().strip().lower()
-        for make in self.make_model_map:
-            if make.lower() == text:
-                self.select_make(make)
-                return
+        make = find_make(self.entries["Make"].get())
+        if make:
+            self.select_make(make)
+            return
         self.close_make_dropdown()
 
     # ======================================================
@@ -261,20 +286,14 @@ class AddVehiclePopup(ctk.CTkToplevel):
                     return
 
             stock = data["Stock Number"]
-            if len(stock) != 8 or not stock.isalnum():
+            if not validate_stock_number(stock):
                 messagebox.showerror("Invalid Stock Number", "Stock Number must be 8 characters.")
                 return
-            if self.db.get_vehicle_by_stock(stock):
-                messagebox.showerror("Duplicate Stock Number", "Stock Number already exists.")
-                return
 
             vin = data["VIN"].replace(" ", "").upper()
-            if len(vin) != 17 or not vin.isalnum() or any(c in vin for c in ("I", "O", "Q")):
+            if not validate_vin(vin):
                 messagebox.showerror("Invalid VIN", "VIN must be 17 alphanumeric characters and cannot contain I, O, or Q.")
                 return
-            if self.db.vin_exists(vin):
-                messagebox.showerror("Duplicate VIN", "A vehicle with this VIN already exists.")
-                return
             self.entries["VIN"].delete(0, "end")
             self.entries["VIN"].insert(0, vin)
 
@@ -306,16 +325,53 @@ class AddVehiclePopup(ctk.CTkToplevel):
                 "Photos Taken": "No",
             }
 
-            self.db.add_vehicle(vehicle_data)
-
-            if self.refresh_callback:
-                self.refresh_callback()
-
-            # Show profile popup (keep timestamp if needed)
-            ProfilePopup(self.master, vehicle_data)
+            if self.db_async is None:
+                self._on_saved(*self._save(vehicle_data))
+                return
 
-            messagebox.showinfo("Success", "Vehicle added successfully.")
-            self.destroy()
+            self.add_button.configure(state="disabled", text="Adding...")
+            self.db_async.submit(self._save, vehicle_data,
+                                 callback=lambda result: self._on_saved(*result),
+                                 errback=self._on_save_failed)
 
         except Exception as e:
             messagebox.showerror("Error", str(e))
+
+    def _save(self, vehicle_data):
+        """
+        Duplicate checks, insert and re-fetch of the new row. Runs on the
+        database worker thread when db_async is set: no widget access here.
+        :return: (problem, vehicle); problem is "stock" or "vin" for a duplicate
+        """
+        stock = vehicle_data["Stock Number"]
+        if self.db.get_vehicle_by_stock(stock):
+            return "stock", None
+        if self.db.vin_exists(vehicle_data["VIN"]):
+            return "vin", None
+        self.db.add_vehicle(vehicle_data)
+        return None, self.db.get_vehicle_by_stock(stock)
+
+    def _on_saved(self, problem, vehicle):
+        if self.winfo_exists():
+            self.add_button.configure(state="normal", text="Add Vehicle")
+
+        if problem == "stock":
+            messagebox.showerror("Duplicate Stock Number", "Stock Number already exists.")
+            return
+        if problem == "vin":
+            messagebox.showerror("Duplicate VIN", "A vehicle with this VIN already exists.")
+            return
+
+        if self.refresh_callback:
+            self.refresh_callback(vehicle.stock_number)
+
+        # Show profile popup (keep timestamp if needed)
+        ProfilePopup(self.master, vehicle)
+
+        messagebox.showinfo("Success", "Vehicle added successfully.")
+        self.hide()
+
+    def _on_save_failed(self, error):
+        if self.winfo_exists():
+            self.add_button.configure(state="normal", text="Add Vehicle")
+        messagebox.showerror("Error", str(error))
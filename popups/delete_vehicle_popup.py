@@ -2,31 +2,47 @@
 
 import customtkinter as ctk
 from tkinter import messagebox, simpledialog
+from popups.popup_manager import ReusablePopup
+from inventory_index import SUGGEST_LIMIT
 
+SUGGEST_DELAY_MS = 120  # wait for a pause in typing before looking up suggestions
 
-class DeleteVehiclePopup(ctk.CTkToplevel):
-    def __init__(self, master, db, refresh_callback=None):
+
+class DeleteVehiclePopup(ReusablePopup, ctk.CTkToplevel):
+    modal = True
+
+    def __init__(self, master, db, refresh_callback=None, db_async=None, inventory=None, visible=True):
         """
         Popup to sell (delete) a vehicle by Stock Number.
         :param master: parent window
         :param db: database instance
-        :param refresh_callback: function to refresh main list after selling
+        :param refresh_callback: called with the sold Stock Number to patch the main list
+        :param db_async: optional AsyncVehicleDatabase; the sale then runs off the Tk thread
+        :param inventory: optional InventoryIndex; enables stock / VIN-ending suggestions
+        :param visible: False to build it hidden, ready for PopupManager to show later
         """
         super().__init__(master)
+        self._make_reusable(visible)
         self.db = db
+        self.db_async = db_async
         self.refresh_callback = refresh_callback
+        self.inventory = inventory
+        self._suggest_job = None
 
         self.title("Sell Vehicle")
-        self.geometry("400x200")
+        self.size = (460, 400) if inventory is not None else (400, 200)
+        self.geometry(f"{self.size[0]}x{self.size[1]}")
         self.transient(master)
-        self.grab_set()
-        self.focus_force()
-        self.center_window()
+        if visible:
+            self.grab_set()
+            self.focus_force()
+            self.center_window()
 
         # Instruction label
         ctk.CTkLabel(
             self,
-            text="Enter Stock Number to sell:",
+            text="Enter Stock Number (or last 6-8 of VIN) to sell:" if inventory is not None
+            else "Enter Stock Number to sell:",
             anchor="w"
         ).pack(pady=(20, 5), padx=20, fill="x")
 
@@ -36,37 +52,104 @@ class DeleteVehiclePopup(ctk.CTkToplevel):
         self.stock_entry.pack(pady=5, padx=20, fill="x")
         self.stock_entry.bind("<KeyRelease>", self.uppercase_stock)
 
+        # Suggestions (make / model / year for each match): a fixed pool of
+        # buttons that is relabelled as you type, never recreated
+        self.suggestion_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.suggestion_buttons = []
+        self.suggested = []  # vehicles behind the visible buttons, in order
+        self.no_match_label = ctk.CTkLabel(self.suggestion_frame, text="No matching vehicle",
+                                           text_color="gray", anchor="w")
+        if inventory is not None:
+            self.suggestion_frame.pack(padx=20, fill="x")
+            self.suggestion_buttons = [
+                ctk.CTkButton(
+                    self.suggestion_frame,
+                    text="",
+                    anchor="w",
+                    fg_color="transparent",
+                    text_color=("gray10", "gray90"),
+                    hover_color=("gray80", "gray30"),
+                    command=lambda i=i: self.pick_suggestion(self.suggested[i])
+                )
+                for i in range(SUGGEST_LIMIT)
+            ]
+
         # Buttons frame
         btn_frame = ctk.CTkFrame(self)
         btn_frame.pack(pady=15)
 
         # Sell button
-        ctk.CTkButton(
+        self.sell_button = ctk.CTkButton(
             btn_frame,
             text="Sell Vehicle",
             fg_color="#b30000",
             hover_color="#e60000",
             command=self.sell_vehicle
-        ).grid(row=0, column=0, padx=5)
+        )
+        self.sell_button.grid(row=0, column=0, padx=5)
 
         # Cancel button
         ctk.CTkButton(
             btn_frame,
             text="Cancel",
-            command=self.destroy
+            command=self.hide
         ).grid(row=0, column=1, padx=5)
 
+    # ---------------- Reuse ---------------- #
+    def reopen(self):
+        """Start again from an empty stock number."""
+        self.stock_var.set("")
+        if self._suggest_job is not None:
+            self.after_cancel(self._suggest_job)
+            self._suggest_job = None
+        self._show_matches("", [])
+        self.sell_button.configure(state="normal", text="Sell Vehicle")
+
     # ---------------- Helper Methods ---------------- #
     def uppercase_stock(self, event):
         """Force stock number entry to uppercase."""
         value = self.stock_var.get().upper()
         self.stock_var.set(value)
 
+        if self.inventory is not None:
+            if self._suggest_job is not None:
+                self.after_cancel(self._suggest_job)
+            self._suggest_job = self.after(SUGGEST_DELAY_MS, self.show_suggestions)
+
+    def show_suggestions(self):
+        """List vehicles whose stock number or VIN ending starts with what was typed."""
+        self._suggest_job = None
+        text = self.stock_var.get().strip()
+        self._show_matches(text, self.inventory.suggest(text, limit=len(self.suggestion_buttons)))
+
+    def _show_matches(self, text, matches):
+        """Relabel, show and hide pooled buttons; no widgets are created or destroyed."""
+        if text and not matches:
+            if not self.no_match_label.winfo_manager():
+                self.no_match_label.pack(fill="x")
+        else:
+            self.no_match_label.pack_forget()
+
+        for button, vehicle in zip(self.suggestion_buttons, matches):
+            label = f"{vehicle.stock_number}   {vehicle.year or ''} {vehicle.make} {vehicle.model}   …{vehicle.vin[-8:]}"
+            if button.cget("text") != label:
+                button.configure(text=label)
+
+        # Visible buttons are always the first N of the pool, so packing order stays sorted
+        for button in self.suggestion_buttons[len(matches):len(self.suggested)]:
+            button.pack_forget()
+        for button in self.suggestion_buttons[len(self.suggested):len(matches)]:
+            button.pack(fill="x", pady=1)
+        self.suggested = matches
+
+    def pick_suggestion(self, vehicle):
+        self.stock_var.set(vehicle.stock_number)
+        self.show_suggestions()
+
     def center_window(self):
         """Center the popup on the screen."""
         self.update_idletasks()
-        w = self.winfo_width()
-        h = self.winfo_height()
+        w, h = self.size  # winfo_width is 1 while the popup is still hidden
         x = (self.winfo_screenwidth() // 2) - (w // 2)
         y = (self.winfo_screenheight() // 2) - (h // 2)
         self.geometry(f"{w}x{h}+{x}+{y}")
@@ -80,10 +163,26 @@ class DeleteVehiclePopup(ctk.CTkToplevel):
             messagebox.showerror("Error", "Stock Number is required.")
             return
 
+        # Resolve against the loaded inventory before asking anything else
+        description = stock_number
+        if self.inventory is not None:
+            vehicle = self.inventory.get_by_stock(stock_number)
+            if vehicle is None:
+                matches = self.inventory.suggest(stock_number)
+                if len(matches) != 1:
+                    messagebox.showerror(
+                        "Not Found",
+                        f"No single vehicle matches {stock_number}. Pick one from the list."
+                    )
+                    return
+                vehicle = matches[0]
+                stock_number = vehicle.stock_number
+            description = f"{stock_number} ({vehicle.year or ''} {vehicle.make} {vehicle.model})"
+
         # Confirm sale
         if not messagebox.askyesno(
             "Confirm Sale",
-            f"Are you sure you want to sell vehicle {stock_number}?"
+            f"Are you sure you want to sell vehicle {description}?"
         ):
             return
 
@@ -97,28 +196,51 @@ class DeleteVehiclePopup(ctk.CTkToplevel):
             return
 
         # Attempt to sell vehicle
-        try:
-            success = self.db.sell_vehicle(stock_number, seller_name.strip())
-
-            if not success:
-                messagebox.showerror(
-                    "Not Found",
-                    f"No vehicle found with Stock Number {stock_number}."
-                )
-                return
+        seller_name = seller_name.strip()
+        if self.db_async is None:
+            try:
+                self._on_sold(stock_number, self.db.sell_vehicle(stock_number, seller_name))
+            except Exception as e:
+                self._on_sell_failed(e)
+            return
 
-            messagebox.showinfo(
-                "Success",
-                f"Vehicle {stock_number} sold successfully."
-            )
+        self.sell_button.configure(state="disabled", text="Selling...")
+        self.db_async.sell_vehicle(
+            stock_number, seller_name,
+            callback=lambda success: self._on_sold(stock_number, success),
+            errback=self._on_sell_failed
+        )
 
-            if self.refresh_callback:
-                self.refresh_callback()
+    def _on_sold(self, stock_number, success):
+        # Patch the main list even if this popup was closed while selling
+        if success and self.refresh_callback:
+            self.refresh_callback(stock_number)
 
-            self.destroy()
+        if not self.winfo_exists():
+            return
+        self.sell_button.configure(state="normal", text="Sell Vehicle")
+        if not self.winfo_viewable():
+            # Closed (hidden) while selling
+            return
 
-        except Exception as e:
+        if not success:
             messagebox.showerror(
-                "Database Error",
-                f"Failed to sell vehicle:\n{e}"
+                "Not Found",
+                f"No vehicle found with Stock Number {stock_number}."
             )
+            return
+
+        messagebox.showinfo(
+            "Success",
+            f"Vehicle {stock_number} sold successfully."
+        )
+
+        self.hide()
+
+    def _on_sell_failed(self, error):
+        if self.winfo_exists():
+            self.sell_button.configure(state="normal", text="Sell Vehicle")
+        messagebox.showerror(
+            "Database Error",
+            f"Failed to sell vehicle:\n{error}"
+        )
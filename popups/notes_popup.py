@@ -1,22 +1,32 @@
 ﻿import customtkinter as ctk
 import tkinter as tk
 from tkinter import font as tkfont
-from datetime import datetime
 from tkinter import messagebox
 from popups.profile_popup import ProfilePopup
+from utils import format_note
+from database import NOTES_PAGE_SIZE
+from popups.popup_manager import ReusablePopup
 
-class NotesPopup(ctk.CTkToplevel):
-    def __init__(self, master, db, vehicle):
+class NotesPopup(ReusablePopup, ctk.CTkToplevel):
+    modal = True
+
+    def __init__(self, master, db, vehicle, refresh_callback=None, db_async=None, visible=True):
         super().__init__(master)
+        self._make_reusable(visible)
         self.db = db
+        self.db_async = db_async  # optional AsyncVehicleDatabase; reads and writes then run off the Tk thread
         self.vehicle = vehicle
+        self.refresh_callback = refresh_callback
+        self.oldest_loaded = None  # (ts, id) keyset of the oldest note on screen
+        self._notes_request = None  # token of the newest page request; older answers are dropped
 
-        self.title(f"Notes – {vehicle['Stock Number']}")
+        self.title(f"Notes – {vehicle.stock_number}")
         self.geometry("700x750")
         self.transient(master)
-        self.grab_set()
-        self.focus_force()
-        self.center_window()
+        if visible:
+            self.grab_set()
+            self.focus_force()
+            self.center_window()
 
         self._setup_notes_display()
         self._setup_name_department()
@@ -25,6 +35,13 @@ class NotesPopup(ctk.CTkToplevel):
 
         self.load_notes()
 
+    def reopen(self, vehicle):
+        """Show another vehicle's notes in the already-built window."""
+        self.vehicle = vehicle
+        self.title(f"Notes – {vehicle.stock_number}")
+        self.note_entry.delete("1.0", "end")
+        self.load_notes()
+
     # ------------------------------- UI Setup ------------------------------- #
     def _setup_notes_display(self):
         ctk.CTkLabel(self, text="Notes", font=ctk.CTkFont(size=16, weight="bold")).pack(pady=(10,5))
@@ -85,36 +102,63 @@ class NotesPopup(ctk.CTkToplevel):
         frame = ctk.CTkFrame(self, fg_color="transparent")
         frame.pack(pady=15)
 
-        ctk.CTkButton(frame, text="Add Note", width=140, command=self.add_note).pack(side="left", padx=10)
+        self.add_button = ctk.CTkButton(frame, text="Add Note", width=140, command=self.add_note)
+        self.add_button.pack(side="left", padx=10)
+        self.older_button = ctk.CTkButton(frame, text="Load Older Notes", width=140, command=self.load_older_notes)
+        self.older_button.pack(side="left", padx=10)
         ctk.CTkButton(frame, text="Vehicle Profile", width=140, command=self.open_profile_popup).pack(side="left", padx=10)
 
     # ------------------------------- Notes Handling ------------------------------- #
     def load_notes(self):
+        """Show the newest page of notes (oldest at the top, newest at the bottom)."""
         self.notes_display.configure(state="normal")
         self.notes_display.delete("1.0", "end")
+        self.notes_display.configure(state="disabled")
+        self.oldest_loaded = None
+        self.load_older_notes()
+
+    def load_older_notes(self):
+        """Prepend the next page of older notes above what is already shown."""
+        request = self._notes_request = object()
+        vehicle_id, before = self.vehicle.id, self.oldest_loaded
+        if self.db_async is None:
+            self._show_notes(request, before, self.db.get_notes(vehicle_id, before=before))
+            return
 
-        row = self.db.get_vehicle_by_id(self.vehicle["id"])
-        notes = row[8] if row and len(row) > 8 else ""
+        self.older_button.configure(state="disabled")
+        self.db_async.get_notes(vehicle_id, before=before,
+                                callback=lambda rows: self._show_notes(request, before, rows),
+                                errback=self._on_db_error)
 
-        if notes:
-            notes_list = notes.split("\n\n")
-            notes_list.reverse()  # newest notes first
+    def _show_notes(self, request, before, rows):
+        if request is not self._notes_request or not self.winfo_exists():
+            return  # another vehicle or page was asked for since
+        if rows:
+            self.oldest_loaded = (rows[-1]["ts"], rows[-1]["id"])
 
-            for note in notes_list:
-                note_text = note.strip()
+        self.notes_display.configure(state="normal")
+        # rows are newest first; inserting each at the top leaves the oldest on top
+        for row in rows:
+            note_text = format_note(row["ts"], row["author"], row["department"], row["body"])
 
-                # Insert the note text (timestamp + content + separator)
-                self.notes_display.insert("1.0", note_text + "\n\n")
+            # Insert the note text (timestamp + content + separator)
+            self.notes_display.insert("1.0", note_text + "\n\n")
 
-                # Apply timestamp tag if exists
-                if note_text.startswith("[") and "]" in note_text:
-                    end_idx = note_text.find("]") + 1
-                    ts_start = "1.0"
-                    ts_end = f"1.0+{end_idx}c"
-                    self.notes_display.tag_add("timestamp", ts_start, ts_end)
+            # Apply timestamp tag if exists
+            if note_text.startswith("[") and "]" in note_text:
+                end_idx = note_text.find("]") + 1
+                self.notes_display.tag_add("timestamp", "1.0", f"1.0+{end_idx}c")
 
         self.notes_display.configure(state="disabled")
 
+        if before is None:
+            self.notes_display.see("end")
+
+        if len(rows) < NOTES_PAGE_SIZE:
+            self.older_button.configure(state="disabled")
+        else:
+            self.older_button.configure(state="normal")
+
     def add_note(self):
         name = self.name_entry.get().strip()
         department = self.department_var.get()
@@ -124,21 +168,33 @@ class NotesPopup(ctk.CTkToplevel):
             messagebox.showwarning("Missing Info", "Please enter your name and a note.")
             return
 
-        timestamp = datetime.now().strftime("%m/%d/%Y %I:%M %p")
-        # Add separator as part of the note
-        formatted_note = f"[{timestamp}] {name} ({department})\n{note_text}\n---------------------------------------------"
+        # Save to database (one row per note)
+        vehicle = self.vehicle
+        if self.db_async is None:
+            self.db.add_note(vehicle.id, note_text, author=name, department=department)
+            self._on_note_added(vehicle)
+            return
+
+        self.add_button.configure(state="disabled", text="Saving...")
+        self.db_async.add_note(vehicle.id, note_text, author=name, department=department,
+                               callback=lambda _: self._on_note_added(vehicle),
+                               errback=self._on_db_error)
 
-        # Save to database
-        self.db.append_note(self.vehicle["id"], formatted_note)
+    def _on_note_added(self, vehicle):
+        if self.refresh_callback:
+            self.refresh_callback(vehicle)
 
-        # Update local vehicle notes
-        if self.vehicle.get("notes"):
-            self.vehicle["notes"] += "\n\n" + formatted_note
-        else:
-            self.vehicle["notes"] = formatted_note
+        self.add_button.configure(state="normal", text="Add Note")
+        if vehicle is self.vehicle:
+            # Still showing this vehicle (not reopened for another one meanwhile)
+            self.note_entry.delete("1.0", "end")
+            self.load_notes()
 
-        self.note_entry.delete("1.0", "end")
-        self.load_notes()
+    def _on_db_error(self, error):
+        if self.winfo_exists():
+            self.add_button.configure(state="normal", text="Add Note")
+            self.older_button.configure(state="normal")
+        messagebox.showerror("Database Error", f"Notes could not be loaded or saved:\n{error}")
 
     # ------------------------------- Profile ------------------------------- #
     def open_profile_popup(self):
@@ -147,7 +203,7 @@ class NotesPopup(ctk.CTkToplevel):
     # ------------------------------- Utility ------------------------------- #
     def center_window(self):
         self.update_idletasks()
-        w, h = self.winfo_width(), self.winfo_height()
+        w, h = 700, 750  # fixed size; winfo_width is 1 while the popup is still hidden
         x = (self.winfo_screenwidth() // 2) - (w // 2)
         y = (self.winfo_screenheight() // 2) - (h // 2)
         self.geometry(f"{w}x{h}+{x}+{y}")
@@ -0,0 +1,69 @@
+import customtkinter as ctk
+
+
+class NotesSearchPopup(ctk.CTkToplevel):
+    """Lists VehicleDatabase.search_notes hits; active vehicles can be opened from here."""
+
+    def __init__(self, master, query, hits, on_open=None):
+        """
+        :param master: parent window
+        :param query: text that was searched for (shown in the title)
+        :param hits: list of search_notes result dicts, best first
+        :param on_open: called with a vehicle_id when "Open Notes" is clicked
+        """
+        super().__init__(master)
+        self.on_open = on_open
+
+        self.title(f"Notes Search – {query}")
+        self.geometry("700x500")
+        self.transient(master)
+        self.focus_force()
+        self.center_window()
+
+        ctk.CTkLabel(
+            self,
+            text=f"{len(hits)} vehicle(s) with notes matching \"{query}\"",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            anchor="w"
+        ).pack(fill="x", padx=20, pady=(15, 5))
+
+        self.results = ctk.CTkScrollableFrame(self)
+        self.results.pack(fill="both", expand=True, padx=20, pady=(0, 10))
+        self.results.grid_columnconfigure(0, weight=1)
+
+        for index, hit in enumerate(hits):
+            self._add_hit(index, hit)
+
+        ctk.CTkButton(self, text="Close", command=self.destroy).pack(pady=(0, 15))
+
+    # ------------------------------- Build UI ------------------------------- #
+    def _add_hit(self, index, hit):
+        row = ctk.CTkFrame(self.results)
+        row.grid(row=index, column=0, sticky="ew", pady=4)
+        row.grid_columnconfigure(0, weight=1)
+
+        title = f"{hit['stock_number']}  {hit['year'] or ''} {hit['make'] or ''} {hit['model'] or ''}"
+        if hit["sold"]:
+            title += "  (SOLD)"
+        ctk.CTkLabel(
+            row, text=title, anchor="w", font=ctk.CTkFont(size=13, weight="bold")
+        ).grid(row=0, column=0, sticky="w", padx=10, pady=(6, 0))
+
+        ctk.CTkLabel(
+            row, text=" ".join((hit["snippet"] or "").split()), anchor="w", justify="left",
+            wraplength=520
+        ).grid(row=1, column=0, sticky="w", padx=10, pady=(0, 6))
+
+        if not hit["sold"] and self.on_open:
+            ctk.CTkButton(
+                row, text="Open Notes", width=90,
+                command=lambda vid=hit["vehicle_id"]: self.on_open(vid)
+            ).grid(row=0, column=1, rowspan=2, padx=10)
+
+    # ------------------------------- Utility ------------------------------- #
+    def center_window(self):
+        self.update_idletasks()
+        w, h = self.winfo_width(), self.winfo_height()
+        x = (self.winfo_screenwidth() // 2) - (w // 2)
+        y = (self.winfo_screenheight() // 2) - (h // 2)
+        self.geometry(f"{w}x{h}+{x}+{y}")
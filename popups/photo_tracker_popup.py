@@ -1,21 +1,34 @@
 import customtkinter as ctk
 from tkinter import messagebox
+from popups.popup_manager import ReusablePopup
 
-class PhotoTrackerPopup(ctk.CTkToplevel):
+class PhotoTrackerPopup(ReusablePopup, ctk.CTkToplevel):
     """
     Photo Tracker popup with column alignment using SAFE padding offsets.
+    Rows are kept per vehicle between opens; reopening only adds, moves,
+    relabels or removes the rows whose vehicle changed. Given the main
+    window's InventoryIndex, it refreshes from those loaded records instead
+    of querying the database.
     """
+    modal = True
 
-    def __init__(self, master, db):
+    def __init__(self, master, db, db_async=None, inventory=None, visible=True):
         super().__init__(master)
+        self._make_reusable(visible)
         self.db = db
+        self.db_async = db_async  # optional AsyncVehicleDatabase; loads and saves then run off the Tk thread
+        self.inventory = inventory  # optional InventoryIndex kept current by the main window
         self.photo_widgets = {}
+        self.saved_values = {}  # vehicle_id -> photos_taken as last loaded/saved
+        self.dirty = {}         # vehicle_id -> new value, only rows the user changed
+        self.rows = {}          # vehicle_id -> {"index", "texts", "labels", "dropdown"}
 
         self.title("Photo Tracker")
         self.geometry("900x500")
         self.transient(master)
-        self.grab_set()
-        self.center_window()
+        if visible:
+            self.grab_set()
+            self.center_window()
 
         self._setup_container()
         self._setup_header()
@@ -70,48 +83,155 @@ class PhotoTrackerPopup(ctk.CTkToplevel):
         btn_frame.grid(row=2, column=0, sticky="ew", pady=(10, 0))
         btn_frame.grid_columnconfigure(0, weight=1)
 
-        save_btn = ctk.CTkButton(btn_frame, text="Save Changes", command=self.save_all)
-        save_btn.grid(row=0, column=0, sticky="e", padx=10)
+        self.auto_save_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            btn_frame, text="Auto-save", variable=self.auto_save_var, command=self._auto_save_toggled
+        ).grid(row=0, column=0, sticky="e", padx=10)
 
-    # ------------------------------- Load & Display Vehicles ------------------------------- #
-    def load_vehicles(self):
-        # Clear old rows
-        for widget in self.scroll.winfo_children():
-            widget.destroy()
-        self.photo_widgets.clear()
+        self.save_btn = ctk.CTkButton(btn_frame, text="Save Changes", command=self.save_all)
+        self.save_btn.grid(row=0, column=1, sticky="e", padx=10)
 
-        vehicles = self.db.get_vehicles(exclude_status="Wholesale")
+    # ------------------------------- Load & Display Vehicles ------------------------------- #
+    def reopen(self):
+        """Refresh from the loaded inventory (or the database); unsaved edits from the last visit are dropped."""
+        self.load_vehicles()
 
+    def load_vehicles(self):
+        if self.inventory is not None:
+            self._show_vehicles(self.inventory.without_status("Wholesale"))
+            return
+        if self.db_async is None:
+            self._show_vehicles(self.db.get_vehicles(exclude_status="Wholesale"))
+            return
+
+        self.save_btn.configure(state="disabled", text="Loading...")
+        self.db_async.get_vehicles(exclude_status="Wholesale", callback=self._show_vehicles,
+                                   errback=self._on_db_error)
+
+    def _show_vehicles(self, vehicles):
+        if not self.winfo_exists():
+            return
+        self.dirty.clear()
+        seen = set()
         for row_index, v in enumerate(vehicles):
-            vehicle_id = v[0]
-            stock, year, make, model, warranty, photos_done = v[2], v[6], v[4], v[5], v[11], v[12] or "No"
-
-            # Helper to add a label
-            def add_label(col, text):
-                ctk.CTkLabel(self.scroll, text=text or "", anchor="w").grid(
-                    row=row_index, column=col, sticky="w", padx=self.col_pad[col], pady=4
-                )
-
-            add_label(0, stock)
-            add_label(1, year)
-            add_label(2, make)
-            add_label(3, model)
-            add_label(4, warranty)
-
-            # Photos Done dropdown
-            dd = ctk.CTkComboBox(self.scroll, values=["No", "Yes"], width=95)
-            dd.set(photos_done)
-            dd.grid(row=row_index, column=5, sticky="w", padx=self.col_pad[5], pady=4)
-            self.photo_widgets[vehicle_id] = dd
+            seen.add(v.id)
+            texts = (v.stock_number, v.year, v.make, v.model, v.warranty)
+
+            row = self.rows.get(v.id)
+            if row is None:
+                row = self._create_row(v.id, row_index)
+            elif row["index"] != row_index:
+                for widget in row["labels"] + [row["dropdown"]]:
+                    widget.grid_configure(row=row_index)
+                row["index"] = row_index
+
+            if row["texts"] != texts:
+                for label, text in zip(row["labels"], texts):
+                    label.configure(text=text or "")
+                row["texts"] = texts
+
+            if row["dropdown"].get() != v.photos_taken:
+                row["dropdown"].set(v.photos_taken)
+            self.saved_values[v.id] = v.photos_taken
+
+        # Vehicles sold or moved to wholesale since the last load
+        for vehicle_id in set(self.rows) - seen:
+            row = self.rows.pop(vehicle_id)
+            for widget in row["labels"] + [row["dropdown"]]:
+                widget.destroy()
+            self.photo_widgets.pop(vehicle_id, None)
+            self.saved_values.pop(vehicle_id, None)
+
+        self.save_btn.configure(state="normal")
+        self._update_save_button()
+
+    def _create_row(self, vehicle_id, row_index):
+        labels = []
+        for col in range(5):
+            label = ctk.CTkLabel(self.scroll, text="", anchor="w")
+            label.grid(row=row_index, column=col, sticky="w", padx=self.col_pad[col], pady=4)
+            labels.append(label)
+
+        # Photos Done dropdown
+        dd = ctk.CTkComboBox(
+            self.scroll, values=["No", "Yes"], width=95,
+            command=lambda value, vid=vehicle_id: self._on_photos_changed(vid, value)
+        )
+        dd.set("")
+        dd.grid(row=row_index, column=5, sticky="w", padx=self.col_pad[5], pady=4)
+        self.photo_widgets[vehicle_id] = dd
+
+        row = {"index": row_index, "texts": None, "labels": labels, "dropdown": dd}
+        self.rows[vehicle_id] = row
+        return row
+
+    # ------------------------------- Change Tracking ------------------------------- #
+    def _on_photos_changed(self, vehicle_id, value):
+        if value == self.saved_values.get(vehicle_id):
+            self.dirty.pop(vehicle_id, None)
+        else:
+            self.dirty[vehicle_id] = value
+
+        if self.auto_save_var.get():
+            self.save_all(quiet=True)
+        self._update_save_button()
+
+    def _auto_save_toggled(self):
+        if self.auto_save_var.get() and self.dirty:
+            self.save_all(quiet=True)
+        self._update_save_button()
+
+    def _update_save_button(self):
+        count = len(self.dirty)
+        self.save_btn.configure(text=f"Save Changes ({count})" if count else "Save Changes")
 
     # ------------------------------- Save ------------------------------- #
-    def save_all(self):
-        try:
-            for vehicle_id, widget in self.photo_widgets.items():
-                self.db.update_photos_taken(vehicle_id, widget.get())
+    def save_all(self, quiet=False):
+        """Write only the rows the user changed, in one transaction."""
+        # Typed-in values don't fire the combobox command, so pick them up here
+        for vehicle_id, widget in self.photo_widgets.items():
+            value = widget.get()
+            if value != self.saved_values.get(vehicle_id):
+                self.dirty[vehicle_id] = value
+
+        updates = dict(self.dirty)
+        if self.db_async is None:
+            try:
+                self.db.update_photos_taken_bulk(updates)
+            except Exception as e:
+                self._on_db_error(e)
+                return
+            self._on_saved(updates, quiet)
+            return
+
+        self.save_btn.configure(state="disabled", text="Saving...")
+        self.db_async.update_photos_taken_bulk(updates, callback=lambda _: self._on_saved(updates, quiet),
+                                               errback=self._on_db_error)
+
+    def _on_saved(self, updates, quiet):
+        self.saved_values.update(updates)
+        if self.inventory is not None:
+            # Keep the shared records current so the next open shows what was saved
+            for vehicle_id, value in updates.items():
+                vehicle = self.inventory.get(vehicle_id)
+                if vehicle is not None:
+                    self.inventory.update(vehicle, photos_taken=value)
+        for vehicle_id, value in updates.items():
+            # Rows changed again while saving stay dirty
+            if self.dirty.get(vehicle_id) == value:
+                del self.dirty[vehicle_id]
+        if not self.winfo_exists():
+            return
+        self.save_btn.configure(state="normal")
+        self._update_save_button()
+        if not quiet:
             messagebox.showinfo("Saved", "Photo tracker updated successfully.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save updates:\n{e}")
+
+    def _on_db_error(self, error):
+        if self.winfo_exists():
+            self.save_btn.configure(state="normal")
+            self._update_save_button()
+        messagebox.showerror("Error", f"Failed to load or save the photo tracker:\n{error}")
 
     # ------------------------------- Utility ------------------------------- #
     def center_window(self):
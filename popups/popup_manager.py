@@ -0,0 +1,73 @@
+class ReusablePopup:
+    """
+    Mixin for CTkToplevel popups that PopupManager keeps alive between uses.
+    Closing hides the window (withdraw) instead of destroying it, and
+    reopen() rebinds it to new data before it is shown again.
+
+    Subclasses call _make_reusable(visible) right after CTkToplevel.__init__
+    and skip centering / grab_set while built hidden (visible=False).
+    """
+    modal = False  # grab input while shown
+
+    def _make_reusable(self, visible=True):
+        self.protocol("WM_DELETE_WINDOW", self.hide)
+        if not visible:
+            self.withdraw()
+
+    def reopen(self, *args):
+        """Rebind to new data before being shown again (override)."""
+
+    def hide(self):
+        try:
+            self.grab_release()
+        except Exception:
+            pass
+        self.withdraw()
+
+    def reveal(self):
+        self.deiconify()
+        self.center_window()
+        self.lift()
+        self.focus_force()
+        if self.modal:
+            self.grab_set()
+
+
+class PopupManager:
+    """
+    Builds each registered popup once and reuses it on every later open.
+
+        popups.register("notes", lambda vehicle, visible: NotesPopup(..., vehicle, visible=visible))
+        popups.show("notes", vehicle)   # builds it the first time, reopen(vehicle) after that
+        popups.prewarm("add_vehicle")   # build hidden now so the first click is instant
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._popups = {}
+
+    def register(self, name, factory):
+        """factory(*args, visible=bool) builds the popup; args are the ones given to show()."""
+        self._factories[name] = factory
+
+    def _live(self, name):
+        popup = self._popups.get(name)
+        try:
+            return popup if popup is not None and popup.winfo_exists() else None
+        except Exception:
+            return None
+
+    def show(self, name, *args):
+        popup = self._live(name)
+        if popup is None:
+            popup = self._factories[name](*args, visible=True)
+            self._popups[name] = popup
+        else:
+            popup.reopen(*args)
+            popup.reveal()
+        return popup
+
+    def prewarm(self, name, *args):
+        """Build a popup hidden ahead of its first use (no-op if it already exists)."""
+        if self._live(name) is None:
+            self._popups[name] = self._factories[name](*args, visible=False)
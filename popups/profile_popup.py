@@ -22,23 +22,18 @@ class ProfilePopup(ctk.CTkToplevel):
         ).pack(pady=(20, 10))
 
         # ------------------ Mileage ------------------ #
-        mileage_raw = vehicle.get("Mileage") or vehicle.get("mileage") or ""
-        try:
-            mileage_int = int(str(mileage_raw).replace(",", ""))
-            mileage_display = f"{mileage_int:,}"
-        except (ValueError, TypeError):
-            mileage_display = str(mileage_raw)
+        mileage_display = f"{vehicle.mileage:,}" if vehicle.mileage is not None else ""
 
 
         # ------------------ Fields ------------------ #
         self.fields = [
-            ("Stock Number", vehicle.get("Stock Number") or vehicle.get("stock_number") or ""),
-            ("VIN", vehicle.get("VIN") or vehicle.get("vin") or ""),
-            ("Make", vehicle.get("Make") or vehicle.get("make") or ""),
-            ("Model", vehicle.get("Model") or vehicle.get("model") or ""),
-            ("Year", vehicle.get("Year") or vehicle.get("year") or ""),
+            ("Stock Number", vehicle.stock_number),
+            ("VIN", vehicle.vin),
+            ("Make", vehicle.make),
+            ("Model", vehicle.model),
+            ("Year", str(vehicle.year or "")),
             ("Mileage", mileage_display),
-            ("Traded In By", vehicle.get("Traded In By") or vehicle.get("traded_in_by") or ""),
+            ("Traded In By", vehicle.traded_in_by),
         ]
 
         self._build_fields()
@@ -0,0 +1,236 @@
+"""
+VehicleDatabase look-alike that talks to inventory_service over HTTP.
+
+Has the VehicleDatabase methods the app uses, with the same arguments and
+return types (Vehicle records, note rows readable as row["ts"], ...), so
+Main.py and AsyncVehicleDatabase can use either one.
+
+GET responses are cached per URL with their ETag; repeat reads send
+If-None-Match and reuse the cached body on 304 Not Modified.
+"""
+import http.client
+import json
+import os
+import threading
+from urllib.parse import urlsplit, urlencode, quote
+
+from models import Vehicle
+
+REQUEST_TIMEOUT = 30  # seconds
+ETAG_CACHE_SIZE = 256  # cached GET responses (oldest dropped first)
+
+
+class ServiceError(RuntimeError):
+    """The inventory service answered with a 5xx error."""
+
+
+class RemoteVehicleDatabase:
+    """Client for inventory_service; see that module for the endpoints."""
+
+    def __init__(self, url, timeout=REQUEST_TIMEOUT, user=None):
+        parts = urlsplit(url)
+        # Sent as the change history author, like VehicleDatabase.user on this desk
+        self.user = user or os.environ.get("USERNAME") or os.environ.get("USER", "")
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()  # one keep-alive connection per thread
+        self._cache = {}                 # url -> (etag, payload)
+        self._cache_lock = threading.Lock()
+
+    # ------------------------------- HTTP ------------------------------- #
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, method, path, params=None, body=None):
+        """
+        Send one request and return the decoded JSON payload (None for 404 on GET).
+        Retries once on a dropped keep-alive connection. A POST/PATCH is only
+        resent when the connection failed while sending it: once it went out,
+        the service may have applied it (a duplicate note, or /sell answering
+        [] because the vehicles are already sold).
+        """
+        url = self.base_path + path
+        if params:
+            url += "?" + urlencode({k: v for k, v in params.items() if v is not None}, doseq=True)
+
+        headers = {}
+        cached = None
+        if method == "GET":
+            with self._cache_lock:
+                cached = self._cache.get(url)
+            if cached:
+                headers["If-None-Match"] = cached[0]
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+
+        for attempt in (1, 2):
+            conn = self._connection()
+            sent = False
+            try:
+                conn.request(method, url, body=data, headers=headers)
+                sent = True
+                response = conn.getresponse()
+                raw = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                self._local.conn = None
+                if attempt == 2 or (sent and method != "GET"):
+                    raise
+
+        if response.status == 304 and cached:
+            return cached[1]
+
+        payload = json.loads(raw) if raw else None
+        if response.status >= 500:
+            raise ServiceError(payload.get("error") if payload else f"HTTP {response.status}")
+        if response.status == 404 and method == "GET":
+            return None
+        if response.status >= 400:
+            raise ValueError(payload.get("error") if payload else f"HTTP {response.status}")
+
+        etag = response.getheader("ETag")
+        if method == "GET" and etag:
+            with self._cache_lock:
+                self._cache.pop(url, None)
+                if len(self._cache) >= ETAG_CACHE_SIZE:
+                    del self._cache[next(iter(self._cache))]
+                self._cache[url] = (etag, payload)
+        return payload
+
+    @staticmethod
+    def _vehicles(payload):
+        return [Vehicle(**v) for v in payload["vehicles"]]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def flush(self):
+        """Writes are sent immediately; nothing to flush."""
+        return False
+
+    def discard_pending(self):
+        return 0
+
+    # ------------------------------- Vehicle Retrieval ------------------------------- #
+    def get_vehicle_by_stock(self, stock_number):
+        payload = self._request("GET", f"/stock/{quote(stock_number, safe='')}")
+        return Vehicle(**payload) if payload else None
+
+    def get_vehicle_by_id(self, vehicle_id):
+        payload = self._request("GET", f"/vehicles/{int(vehicle_id)}")
+        return Vehicle(**payload) if payload else None
+
+    def stock_exists(self, stock_number):
+        return self.get_vehicle_by_stock(stock_number) is not None
+
+    def vin_exists(self, vin):
+        return self._request("GET", f"/vins/{quote(vin.upper(), safe='')}")["exists"]
+
+    def get_vehicles(self, exclude_status=None):
+        return self._vehicles(self._request("GET", "/vehicles", {"exclude_status": exclude_status}))
+
+    def get_vehicles_page(self, filters=None, order_by="id", limit=1000, after=None, exclude_status=None):
+        params = dict(filters or {})
+        params.update(order_by=order_by, limit=limit, after=after, exclude_status=exclude_status)
+        return self._vehicles(self._request("GET", "/vehicles", params))
+
+    def iter_vehicles(self, filters=None, order_by="id", page_size=1000, after=None, exclude_status=None):
+        while True:
+            page = self.get_vehicles_page(filters, order_by, page_size, after, exclude_status)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = getattr(page[-1], order_by)
+
+    def get_vehicles_as_of(self, ts):
+        return self._vehicles(self._request("GET", "/inventory/as-of", {"ts": str(ts)}))
+
+    # ------------------------------- Cross-Process Changes ------------------------------- #
+    def change_token(self):
+        return self._request("GET", "/changes/token")["token"]
+
+    def get_change_seq(self):
+        return self._request("GET", "/changes/token")["seq"]
+
+    def get_changes_since(self, seq):
+        payload = self._request("GET", "/changes", {"since": seq})
+        if payload.get("expired"):
+            return None
+        return {"seq": payload["seq"], "changed": self._vehicles({"vehicles": payload["changed"]}),
+                "removed": payload["removed"]}
+
+    # ------------------------------- Vehicle Updates ------------------------------- #
+    def update_vehicle(self, vehicle_id, field, value, author=None):
+        self._request("PATCH", f"/vehicles/{int(vehicle_id)}", body={field: value, "author": author or self.user})
+
+    def update_vehicle_fields(self, vehicle_id, changes, author=None):
+        self._request("PATCH", f"/vehicles/{int(vehicle_id)}", body={**changes, "author": author or self.user})
+
+    def update_photos_taken(self, vehicle_id, value, author=None):
+        self.update_vehicle(vehicle_id, "photos_taken", value, author)
+
+    def update_photos_taken_bulk(self, updates, author=None):
+        if not isinstance(updates, dict):
+            updates = dict(updates)
+        return self._request("POST", "/photos", body={
+            "updates": {str(k): v for k, v in updates.items()}, "author": author or self.user
+        })["updated"]
+
+    def get_vehicle_history(self, vehicle_id, field=None):
+        return self._request("GET", f"/vehicles/{int(vehicle_id)}/history", {"field": field})["events"]
+
+    # ------------------------------- Notes ------------------------------- #
+    def add_note(self, vehicle_id, body, author="", department="", ts=None):
+        self._request("POST", f"/vehicles/{int(vehicle_id)}/notes",
+                      body={"body": body, "author": author, "department": department, "ts": ts})
+
+    def get_notes(self, vehicle_id, limit=None, before=None):
+        params = {"limit": limit}
+        if before is not None:
+            params.update(before_ts=before[0], before_id=before[1])
+        return self._request("GET", f"/vehicles/{int(vehicle_id)}/notes", params)["notes"]
+
+    def search_notes(self, text, limit=None, include_sold=True):
+        return self._request("GET", "/search", {
+            "q": text, "limit": limit, "include_sold": "true" if include_sold else "false"
+        })["hits"]
+
+    # ------------------------------- Add / Sell ------------------------------- #
+    def add_vehicle(self, vehicle_data):
+        self._request("POST", "/vehicles", body=vehicle_data)
+
+    def add_vehicles_bulk(self, vehicles):
+        return self._request("POST", "/vehicles/bulk", body=list(vehicles))
+
+    def sell_vehicle(self, stock_number, seller_name):
+        return bool(self.sell_vehicles([stock_number], seller_name))
+
+    def sell_vehicles(self, stock_numbers, seller_name):
+        return self._request("POST", "/sell", body={
+            "stock_numbers": list(stock_numbers), "seller_name": seller_name
+        })["sold"]
+
+    def refresh_warranties(self, reference_year=None):
+        return self._request("POST", "/warranties/refresh", body={"reference_year": reference_year})["updated"]
+
+    # ------------------------------- Reports ------------------------------- #
+    def aging_report(self, by=None, now=None):
+        payload = self._request("GET", "/reports/aging", {"by": by, "now": now.isoformat() if now else None})
+        return {row["group"]: row["buckets"] for row in payload["report"]}
+
+    def turn_time_report(self, group_by=("make",), since=None, until=None):
+        return self._request("GET", "/reports/turn-time", {
+            "group_by": ",".join(group_by), "since": since, "until": until
+        })["report"]
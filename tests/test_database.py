@@ -0,0 +1,52 @@
+"""
+VehicleDatabase bulk import.
+
+    python -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+# Allow running from anywhere, like the benchmarks scripts
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import VehicleDatabase
+
+
+def vehicle(n, **fields):
+    return dict({"Stock Number": f"BK{n:06d}", "VIN": f"1HGCM8263{n:08d}", "Make": "Kia",
+                 "Model": "Soul", "Year": str(datetime.now().year - 1), "Mileage": "30000"}, **fields)
+
+
+class BulkImportTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.db = VehicleDatabase(os.path.join(self.workdir.name, "vehicles.db"))
+        self.db.BULK_CHUNK = 2
+
+    def tearDown(self):
+        self.db.close()
+        self.workdir.cleanup()
+
+    def test_chunks_check_duplicates_against_earlier_chunks_and_the_database(self):
+        self.db.add_vehicles_bulk([vehicle(4)])
+        report = self.db.add_vehicles_bulk([vehicle(n) for n in range(1, 7)] + [vehicle(2)])
+
+        self.assertEqual(report["added"], ["BK000001", "BK000002", "BK000003", "BK000005", "BK000006"])
+        self.assertEqual([(r["row"], r["reason"]) for r in report["rejected"]],
+                         [(4, "Stock Number already exists"), (7, "Duplicate Stock Number in import")])
+
+    def test_supplied_and_computed_warranties_are_current(self):
+        self.db.add_vehicles_bulk([vehicle(1, Warranty="As-Is"), vehicle(2), vehicle(3, Mileage="120000")])
+
+        self.assertEqual(self.db.refresh_warranties(), 0)
+        rows = {v.stock_number: (v.warranty, v.warranty_year) for v in self.db.iter_vehicles()}
+        year = datetime.now().year
+        self.assertEqual(rows, {"BK000001": ("As-Is", year), "BK000002": ("CPO", year),
+                                "BK000003": ("As-Is", year)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+inventory_service and RemoteVehicleDatabase against each other, offline.
+
+    python -m unittest discover tests
+"""
+import http.client
+import os
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+
+# Allow running from anywhere, like the benchmarks scripts
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import VehicleDatabase
+from inventory_service import make_server
+from remote_database import RemoteVehicleDatabase
+
+VEHICLE = {"Stock Number": "AB123456", "VIN": "1HGCM82633A004352", "Make": "Kia",
+           "Model": "Soul", "Year": "2021", "Mileage": "30000"}
+
+
+class InventoryServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.db = VehicleDatabase(os.path.join(self.workdir.name, "vehicles.db"), pooled=True)
+        self.server = make_server(self.db, port=0)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = RemoteVehicleDatabase(f"http://127.0.0.1:{self.port}")
+        self.client.add_vehicle(VEHICLE)
+        self.vehicle_id = self.client.get_vehicle_by_stock("AB123456").id
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.db.close()
+        self.workdir.cleanup()
+
+    def _get(self, path, etag=None):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        try:
+            conn.request("GET", path, headers={"If-None-Match": etag} if etag else {})
+            response = conn.getresponse()
+            response.read()
+            return response.status, response.getheader("ETag")
+        finally:
+            conn.close()
+
+    def test_etag_is_revalidated_until_a_write(self):
+        status, etag = self._get("/vehicles")
+        self.assertEqual((status, self._get("/vehicles", etag)[0]), (200, 304))
+
+        self.client.update_vehicle(self.vehicle_id, "status", "Retail")
+        status, new_etag = self._get("/vehicles", etag)
+        self.assertEqual(status, 200)
+        self.assertNotEqual(new_etag, etag)
+
+        # The client keeps serving its cached copy on 304
+        self.assertEqual(self.client.get_vehicles()[0].status, "Retail")
+        self.assertEqual(self.client.get_vehicles()[0].status, "Retail")
+
+    def test_patch_applies_every_field_or_none(self):
+        self.client.update_vehicle_fields(self.vehicle_id, {"status": "Retail", "location": "Detail"})
+        vehicle = self.client.get_vehicle_by_id(self.vehicle_id)
+        self.assertEqual((vehicle.status, vehicle.location), ("Retail", "Detail"))
+
+        with self.assertRaises(ValueError):
+            self.client.update_vehicle_fields(self.vehicle_id, {"status": "Wholesale", "warranty": "CPO"})
+        vehicle = self.client.get_vehicle_by_id(self.vehicle_id)
+        self.assertEqual((vehicle.status, vehicle.location), ("Retail", "Detail"))
+
+
+class DroppedConnectionTest(unittest.TestCase):
+    """A server that reads each request and hangs up without answering."""
+
+    def setUp(self):
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.requests = []
+        threading.Thread(target=self._serve, daemon=True).start()
+        self.client = RemoteVehicleDatabase(f"http://127.0.0.1:{self.listener.getsockname()[1]}")
+
+    def tearDown(self):
+        self.client.close()
+        self.listener.close()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            self.requests.append(conn.recv(65536).split(b" ", 1)[0].decode())
+            conn.close()
+
+    def test_get_is_retried_once(self):
+        with self.assertRaises(ConnectionError):
+            self.client.get_vehicles()
+        self.assertEqual(self.requests, ["GET", "GET"])
+
+    def test_post_is_not_resent(self):
+        with self.assertRaises(ConnectionError):
+            self.client.add_note(1, "Only once")
+        self.assertEqual(self.requests, ["POST"])
+
+
+if __name__ == "__main__":
+    unittest.main()
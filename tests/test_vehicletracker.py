@@ -0,0 +1,74 @@
+"""
+vehicletracker export followed by import into an empty database.
+
+    python -m unittest discover tests
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+# Allow running from anywhere, like the benchmarks scripts
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vehicletracker
+from database import VehicleDatabase
+
+VEHICLES = [
+    {"Stock Number": "AB123456", "VIN": "1HGCM82633A004352", "Make": "Kia", "Model": "Soul",
+     "Year": "2021", "Mileage": "30000", "Status": "Retail", "Location": "Detail",
+     "Traded In By": "Sam", "Date Added": "2024-03-01"},
+    {"Stock Number": "CD654321", "VIN": "2T1BURHE0JC014702", "Make": "Toyota", "Model": "Corolla",
+     "Year": "2018", "Mileage": "91000", "Warranty": "Limited"},
+]
+# Fields that must survive the round trip (ids are new on import)
+COMPARED = ("user_name", "stock_number", "vin", "make", "model", "year", "mileage", "status",
+            "location", "warranty", "photos_taken", "traded_in_by", "certification", "date_added")
+
+
+class ExportImportTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.workdir.name, "source.db")
+        db = VehicleDatabase(self.source)
+        db.add_vehicles_bulk(VEHICLES)
+        first = db.get_vehicle_by_stock("AB123456")
+        db.update_photos_taken(first.id, "Yes")
+        db.add_note(first.id, "Needs tires", author="Sam", department="Service", ts="2024-03-02 09:15:00")
+        db.add_note(first.id, "Tires done\nDetail next", author="Lee", department="Shop", ts="2024-03-03 14:00:00")
+        db.close()
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def _run(self, *argv):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return vehicletracker.main(list(argv))
+
+    def _snapshot(self, path):
+        db = VehicleDatabase(path)
+        try:
+            return {v.stock_number: ({c: getattr(v, c) for c in COMPARED},
+                                     [tuple(n)[2:] for n in reversed(db.get_notes(v.id))])
+                    for v in db.iter_vehicles()}
+        finally:
+            db.close()
+
+    def _round_trip(self, fmt):
+        export = os.path.join(self.workdir.name, f"inventory.{fmt}")
+        target = os.path.join(self.workdir.name, f"target_{fmt}.db")
+        self.assertEqual(self._run("--db", self.source, "export", "--format", fmt, "--output", export), 0)
+        self.assertEqual(self._run("--db", target, "import", export), 0)
+        self.assertEqual(self._snapshot(target), self._snapshot(self.source))
+
+    def test_csv_round_trip(self):
+        self._round_trip("csv")
+
+    def test_json_round_trip(self):
+        self._round_trip("json")
+
+
+if __name__ == "__main__":
+    unittest.main()
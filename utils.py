@@ -1,11 +1,29 @@
-﻿from datetime import datetime
+﻿import re
+from datetime import datetime
+
+_np = False  # numpy module, None when not installed, False until first looked up
+
+
+def _numpy():
+    """
+    NumPy, imported on first use so importing utils stays fast (the CLI and the
+    service never need it); None when it isn't installed.
+    """
+    global _np
+    if _np is False:
+        try:
+            import numpy
+        except ImportError:  # optional: assign_warranty_batch falls back to pure Python
+            numpy = None
+        _np = numpy
+    return _np
 
 # -------------------------------
 # Warranty assignment
 # -------------------------------
 from datetime import datetime
 
-def assign_warranty(make: str, year: int, mileage: int) -> str:
+def assign_warranty(make: str, year: int, mileage: int, reference_year: int = None) -> str:
     """
     Determines warranty type based on vehicle make, year, and mileage.
 
@@ -21,9 +39,10 @@ def assign_warranty(make: str, year: int, mileage: int) -> str:
     :param make: Vehicle make (string)
     :param year: Vehicle year (int)
     :param mileage: Vehicle mileage (int)
+    :param reference_year: Year to measure age against (default: this year)
     :return: Warranty type (string)
     """
-    current_year = datetime.now().year
+    current_year = reference_year or datetime.now().year
     age = current_year - year
     mileage = max(0, mileage)  # ensure mileage isn't negative
     make_lower = make.lower()
@@ -49,6 +68,68 @@ def assign_warranty(make: str, year: int, mileage: int) -> str:
         else:
             return "As-Is"
 
+
+def assign_warranty_batch(makes, years, mileages, reference_year: int = None) -> list:
+    """
+    Classify whole columns at once; same rules and results as assign_warranty.
+    Uses NumPy array operations when NumPy is installed, otherwise loops.
+
+    :param makes: sequence of makes
+    :param years: sequence of years (int or numeric str)
+    :param mileages: sequence of mileages (int or numeric str)
+    :param reference_year: Year to measure age against, shared by every row (default: this year)
+    :return: list of warranty types, in input order
+    """
+    reference_year = reference_year or datetime.now().year
+
+    np = _numpy()
+    if np is None:
+        return [assign_warranty(make or "", int(year), int(mileage), reference_year)
+                for make, year, mileage in zip(makes, years, mileages)]
+
+    age = reference_year - np.asarray(years, dtype=np.int64)
+    mileage = np.maximum(np.asarray(mileages, dtype=np.int64), 0)
+    is_kia = np.char.lower(np.asarray([m or "" for m in makes], dtype=str)) == "kia"
+
+    under_100k = mileage < 100000
+    kia_cpo = is_kia & (age <= 5) & (mileage < 80000)
+    kia_limited = is_kia & ~kia_cpo & (age <= 7) & under_100k
+    non_kia_limited = ~is_kia & (age < 7) & under_100k
+
+    result = np.full(age.shape, "As-Is", dtype=object)
+    result[kia_limited | non_kia_limited] = "Limited"
+    result[kia_cpo] = "CPO"
+    return result.tolist()
+
+# -------------------------------
+# Stale warranties on loaded vehicles
+# -------------------------------
+def fill_stale_warranties(vehicles, reference_year: int = None) -> list:
+    """
+    Make sure every loaded Vehicle carries this year's warranty. Stored
+    warranties computed for reference_year are kept; any stale ones are
+    classified together as one batch.
+
+    :param vehicles: list of models.Vehicle (updated in place)
+    :param reference_year: Year to measure age against (default: this year)
+    :return: the same list
+    """
+    reference_year = reference_year or datetime.now().year
+    stale = [v for v in vehicles if v.warranty_year != reference_year or not v.warranty]
+
+    if stale:
+        computed = assign_warranty_batch(
+            [v.make for v in stale],
+            [reference_year if v.year is None else v.year for v in stale],
+            [v.mileage or 0 for v in stale],
+            reference_year=reference_year
+        )
+        for vehicle, warranty in zip(stale, computed):
+            vehicle.warranty = warranty
+            vehicle.warranty_year = reference_year
+
+    return vehicles
+
 # -------------------------------
 # VIN validator (format only)
 # -------------------------------
@@ -59,6 +140,7 @@ def validate_vin(vin: str) -> bool:
     - Exactly 17 characters
     - Alphanumeric only
     - No spaces or special characters
+    - No I, O or Q (never used in VINs)
 
     :param vin: VIN string
     :return: True if valid, False otherwise
@@ -76,4 +158,137 @@ def validate_vin(vin: str) -> bool:
     if not vin.isalnum():
         return False
 
+    if any(c in vin for c in ("I", "O", "Q")):
+        return False
+
     return True
+
+# -------------------------------
+# Stock number validator
+# -------------------------------
+def validate_stock_number(stock_number: str) -> bool:
+    """
+    Validates stock number format.
+    - Required
+    - Exactly 8 characters
+    - Alphanumeric only
+
+    :param stock_number: Stock number string
+    :return: True if valid, False otherwise
+    """
+    if not stock_number:
+        return False
+
+    return len(stock_number) == 8 and stock_number.isalnum()
+
+# -------------------------------
+# Date added parsing
+# -------------------------------
+DATE_INPUT_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y"]
+
+
+def normalize_date(value: str):
+    """
+    Parse a date typed or imported in a common format.
+
+    :param value: e.g. "2024-03-01", "03/01/2024", "2024-03-01 14:05:00"
+    :return: "YYYY-MM-DD HH:MM:SS", or None if it doesn't parse
+    """
+    value = str(value or "").strip()
+    for fmt in DATE_INPUT_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime(NOTE_TS_DB_FORMAT)
+        except ValueError:
+            continue
+    return None
+
+# -------------------------------
+# Notes formatting / parsing
+# -------------------------------
+NOTE_TS_DB_FORMAT = "%Y-%m-%d %H:%M:%S"   # stored in vehicle_notes.ts (sortable)
+NOTE_TS_DISPLAY_FORMAT = "%m/%d/%Y %I:%M %p"
+NOTE_SEPARATOR = "---------------------------------------------"
+
+_NOTE_HEADER = re.compile(r"^\[(?P<ts>[^\]]+)\] (?P<author>.*?) \((?P<department>[^()]*)\)\s*$")
+
+
+def format_note(ts: str, author: str, department: str, body: str) -> str:
+    """
+    Render one note the way NotesPopup displays it.
+
+    :param ts: timestamp in NOTE_TS_DB_FORMAT (or empty for legacy notes)
+    :return: "[timestamp] author (department)\nbody\n-----" or just the body
+    """
+    if not ts and not author:
+        return f"{body}\n{NOTE_SEPARATOR}"
+    try:
+        ts_display = datetime.strptime(ts, NOTE_TS_DB_FORMAT).strftime(NOTE_TS_DISPLAY_FORMAT)
+    except (ValueError, TypeError):
+        ts_display = ts or ""
+    return f"[{ts_display}] {author} ({department})\n{body}\n{NOTE_SEPARATOR}"
+
+
+def parse_notes_blob(blob: str) -> list:
+    """
+    Split a legacy notes TEXT blob into individual notes.
+    Notes start with a "[timestamp] name (department)" header line and end
+    with a dashed separator. Text without a header becomes a note with no
+    timestamp or author.
+
+    :param blob: notes text as stored in vehicles.notes
+    :return: list of dicts with ts (NOTE_TS_DB_FORMAT or ""), author, department, body
+    """
+    notes = []
+    current = None
+
+    def finish():
+        if current is not None:
+            body = "\n".join(current["lines"]).strip()
+            if body or current["author"]:
+                notes.append({"ts": current["ts"], "author": current["author"],
+                              "department": current["department"], "body": body})
+
+    for line in (blob or "").splitlines():
+        match = _NOTE_HEADER.match(line.strip())
+        if match:
+            finish()
+            try:
+                ts = datetime.strptime(match["ts"], NOTE_TS_DISPLAY_FORMAT).strftime(NOTE_TS_DB_FORMAT)
+            except ValueError:
+                ts = match["ts"]
+            current = {"ts": ts, "author": match["author"], "department": match["department"], "lines": []}
+            continue
+
+        if set(line.strip()) == {"-"} and len(line.strip()) >= 10:
+            finish()
+            current = None
+            continue
+
+        if current is None:
+            current = {"ts": "", "author": "", "department": "", "lines": []}
+        current["lines"].append(line)
+
+    finish()
+    return notes
+
+# -------------------------------
+# Notes search query
+# -------------------------------
+_SEARCH_WORD = re.compile(r"\w+")
+
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text typed in the search box into a safe FTS5 MATCH query.
+    Every word must appear; the last word also matches as a prefix so
+    results show up while typing ("cracked winds" -> "cracked" "winds"*).
+
+    :param text: user input
+    :return: FTS5 query string, or "" when there is nothing to search for
+    """
+    words = _SEARCH_WORD.findall(text or "")
+    if not words:
+        return ""
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
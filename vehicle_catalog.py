@@ -0,0 +1,47 @@
+from bisect import bisect_left
+
+# Makes and models offered in the Add Vehicle form (and used to generate test inventory)
+MAKE_MODEL_MAP = {
+    "Acura": ["ILX","Integra","MDX","RDX","RLX","TLX","ZDX"],
+    "Audi": ["A3","A4","A5","A6","A7","A8","Q3","Q5","Q7","Q8","TT","e-tron"],
+    "BMW": ["2 Series","3 Series","4 Series","5 Series","7 Series","X1","X2","X3","X4","X5","X6","Z4"],
+    "Buick": ["Enclave","Encore","Encore GX","Envision","LaCrosse","Regal"],
+    "Cadillac": ["CT4","CT5","CT6","Escalade","XT4","XT5","XT6"],
+    "Chevrolet": ["Bolt EV","Camaro","Corvette","Equinox","Malibu","Silverado","Tahoe","Traverse","Trax","Suburban","Colorado"],
+    "Chrysler": ["300","Pacifica","Voyager"],
+    "Dodge": ["Challenger","Charger","Durango","Journey","Grand Caravan"],
+    "Ford": ["Bronco","EcoSport","Edge","Escape","Expedition","Explorer","F-150","F-250","F-350","Fusion","Mustang","Ranger","Transit Connect"],
+    "GMC": ["Acadia","Canyon","Sierra 1500","Sierra 2500","Sierra 3500","Terrain","Yukon"],
+    "Honda": ["Accord","Civic","CR-V","HR-V","Odyssey","Passport","Pilot","Ridgeline"],
+    "Hyundai": ["Accent","Elantra","Ioniq","Kona","Palisade","Santa Fe","Sonata","Tucson","Venue","Veloster"],
+    "Jeep": ["Cherokee","Compass","Grand Cherokee","Wrangler","Gladiator","Renegade"],
+    "Kia": ["Carnival","Forte","K5","K7","Niro","Sorento","Soul","Sportage","Stinger","Telluride"],
+    "Mazda": ["3","6","CX-3","CX-30","CX-5","CX-50","CX-9","MX-5 Miata"],
+    "Mercedes-Benz": ["A-Class","C-Class","E-Class","GLA","GLC","GLE","GLS","S-Class","EQB","EQC"],
+    "Nissan": ["Altima","Armada","Frontier","GT-R","Kicks","Leaf","Maxima","Murano","Pathfinder","Rogue","Sentra","Titan","Versa","Z"],
+    "Subaru": ["Ascent","BRZ","Crosstrek","Forester","Impreza","Outback","WRX"],
+    "Tesla": ["Model 3","Model S","Model X","Model Y","Cybertruck"],
+    "Toyota": ["4Runner","Avalon","Camry","Corolla","Highlander","Land Cruiser","Prius","RAV4","Sequoia","Sienna","Tacoma","Tundra","Venza","Yaris"],
+    "Volkswagen": ["Atlas","Golf","Jetta","Passat","Tiguan","ID.4"],
+    "Volvo": ["S60","S90","V60","V90","XC40","XC60","XC90"]
+}
+
+# Makes sorted once (case-insensitive) for prefix lookups while typing
+SORTED_MAKES = sorted(MAKE_MODEL_MAP, key=str.lower)
+_MAKE_KEYS = [make.lower() for make in SORTED_MAKES]
+
+
+def makes_with_prefix(prefix):
+    """Makes starting with prefix (case-insensitive), in sorted order; all makes for ""."""
+    prefix = (prefix or "").strip().lower()
+    start = bisect_left(_MAKE_KEYS, prefix)
+    end = bisect_left(_MAKE_KEYS, prefix + "\uffff", start)  # first key past every prefix match
+    return SORTED_MAKES[start:end]
+
+
+def find_make(text):
+    """The catalog spelling of a make typed in any case, or None."""
+    matches = makes_with_prefix(text)
+    if matches and matches[0].lower() == (text or "").strip().lower():
+        return matches[0]
+    return None
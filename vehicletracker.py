@@ -0,0 +1,221 @@
+"""
+Command-line interface for scripts and scheduled jobs, without the GUI.
+
+    python -m vehicletracker add --stock AB123456 --vin 1HGCM82633A004352 --make Kia --model Soul --year 2021 --mileage 30000
+    python -m vehicletracker sell AB123456 AB123457 --seller Tom
+    python -m vehicletracker sell - --seller Tom < month_end.txt
+    python -m vehicletracker update-status AB123456 --status Wholesale
+    python -m vehicletracker export --format csv --output inventory.csv
+    python -m vehicletracker import inventory.csv
+    python -m vehicletracker stats
+    python -m vehicletracker refresh-warranties
+
+Built on VehicleDatabase and utils only: customtkinter, the popups and
+NumPy are never imported, so a command starts in a few tens of ms.
+Exit status is 0 on success, 1 when some of the work failed (rows rejected,
+stock numbers not found), 2 for bad arguments.
+"""
+import argparse
+import csv
+import json
+import sys
+
+from database import VehicleDatabase, DB_FILE
+from models import VEHICLE_COLUMNS, STATUSES
+
+
+def _stock_numbers(values):
+    """Stock numbers from the command line; "-" reads whitespace-separated ones from stdin."""
+    stocks = []
+    for value in values:
+        stocks.extend(sys.stdin.read().split() if value == "-" else [value])
+    return [s.strip().upper() for s in stocks if s.strip()]
+
+
+# ------------------------------- Commands ------------------------------- #
+def cmd_add(db, args):
+    vehicle = {
+        "User Name": args.user,
+        "Stock Number": args.stock.strip().upper(),
+        "VIN": args.vin.strip().upper(),
+        "Make": args.make,
+        "Model": args.model,
+        "Year": args.year,
+        "Mileage": args.mileage,
+        "Status": args.status,
+        "Location": args.location,
+        "Traded In By": args.traded_in_by,
+    }
+    if args.notes:
+        vehicle["Notes"] = args.notes
+    if args.date_added:
+        vehicle["Date Added"] = args.date_added
+
+    # Same validation and duplicate checks as an import
+    report = db.add_vehicles_bulk([vehicle])
+    if report["rejected"]:
+        print(f"Not added: {report['rejected'][0]['reason']}", file=sys.stderr)
+        return 1
+    print(f"Added {vehicle['Stock Number']}")
+    return 0
+
+
+def cmd_sell(db, args):
+    stocks = _stock_numbers(args.stock_numbers)
+    sold = db.sell_vehicles(stocks, args.seller)
+    missing = [s for s in stocks if s not in set(sold)]
+    print(f"Sold {len(sold)} vehicle(s)")
+    for stock in missing:
+        print(f"  not found: {stock}", file=sys.stderr)
+    return 1 if missing else 0
+
+
+def cmd_update_status(db, args):
+    missing = []
+    for stock in _stock_numbers(args.stock_numbers):
+        vehicle = db.get_vehicle_by_stock(stock)
+        if vehicle is None:
+            missing.append(stock)
+            continue
+        db.update_vehicle(vehicle.id, "status", args.status, author=args.author)
+    for stock in missing:
+        print(f"  not found: {stock}", file=sys.stderr)
+    return 1 if missing else 0
+
+
+def cmd_export(db, args):
+    """
+    Stream vehicles out page by page; headers are importable by `import`.
+    Each vehicle's notes go in a "notes" column as the rendered text block,
+    which `import` splits back into separate notes.
+    """
+    filters = {"status": args.status} if args.status else None
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    count = 0
+    try:
+        if args.format == "csv":
+            writer = csv.writer(out)
+            writer.writerow(VEHICLE_COLUMNS + ("notes",))
+            for vehicle in db.iter_vehicles(filters):
+                writer.writerow([getattr(vehicle, c) for c in VEHICLE_COLUMNS] + [db.get_notes_text(vehicle.id)])
+                count += 1
+        else:
+            out.write('{"vehicles": [\n')
+            for vehicle in db.iter_vehicles(filters):
+                row = dict(vehicle.as_dict(), notes=db.get_notes_text(vehicle.id))
+                out.write((",\n" if count else "") + json.dumps(row))
+                count += 1
+            out.write("\n]}\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if args.output:
+        print(f"Exported {count} vehicle(s) to {args.output}")
+    return 0
+
+
+def cmd_import(db, args):
+    from importer import read_import_file, format_import_report
+
+    report = db.add_vehicles_bulk(read_import_file(args.path))
+    print(format_import_report(report, max_lines=args.max_lines))
+    return 1 if report["rejected"] else 0
+
+
+def cmd_stats(db, args):
+    stats = {
+        "by_status": db.count_vehicles("status"),
+        "by_location": db.count_vehicles("location"),
+        "sold": db.count_sold(args.since),
+        "aging": db.aging_report().get(None, {}),
+    }
+    stats["active"] = sum(stats["by_status"].values())
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return 0
+
+    print(f"Active vehicles: {stats['active']}")
+    for title, key in (("By status", "by_status"), ("By location", "by_location"), ("Days on lot", "aging")):
+        print(f"{title}:")
+        for name, count in stats[key].items():
+            print(f"  {name or '(blank)':<15} {count}")
+    print(f"Sold{' since ' + args.since if args.since else ''}: {stats['sold']}")
+    return 0
+
+
+def cmd_refresh_warranties(db, args):
+    # Opening the database already refreshes stale rows for this year, so without
+    # --year this only reports that everything is current
+    updated = db.refresh_warranties(args.year)
+    print(f"Warranties up to date ({updated} updated)")
+    return 0
+
+
+# ------------------------------- Parser ------------------------------- #
+def build_parser():
+    parser = argparse.ArgumentParser(prog="vehicletracker", description="VehicleTracker command line")
+    parser.add_argument("--db", default=DB_FILE, help="path of vehicles.db")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="add one vehicle")
+    add.add_argument("--stock", required=True)
+    add.add_argument("--vin", required=True)
+    add.add_argument("--make", required=True)
+    add.add_argument("--model", default="")
+    add.add_argument("--year", required=True)
+    add.add_argument("--mileage", required=True)
+    add.add_argument("--status", choices=STATUSES, default="Undecided")
+    add.add_argument("--location", default="Service")
+    add.add_argument("--traded-in-by", default="")
+    add.add_argument("--notes", default="")
+    add.add_argument("--date-added", help="defaults to now")
+    add.add_argument("--user", default="Default")
+    add.set_defaults(func=cmd_add)
+
+    sell = commands.add_parser("sell", help="sell vehicles by stock number")
+    sell.add_argument("stock_numbers", nargs="+", help='stock numbers, or "-" to read them from stdin')
+    sell.add_argument("--seller", required=True)
+    sell.set_defaults(func=cmd_sell)
+
+    status = commands.add_parser("update-status", help="set the status of vehicles")
+    status.add_argument("stock_numbers", nargs="+", help='stock numbers, or "-" to read them from stdin')
+    status.add_argument("--status", choices=STATUSES, required=True)
+    status.add_argument("--author", help="recorded in the change history (default: OS login)")
+    status.set_defaults(func=cmd_update_status)
+
+    export = commands.add_parser("export", help="export active vehicles and their notes as CSV or JSON")
+    export.add_argument("--format", choices=("csv", "json"), default="csv")
+    export.add_argument("--output", "-o", help="file to write (default: stdout)")
+    export.add_argument("--status", choices=STATUSES, action="append", help="only these statuses")
+    export.set_defaults(func=cmd_export)
+
+    imp = commands.add_parser("import", help="import a CSV or JSON inventory file")
+    imp.add_argument("path")
+    imp.add_argument("--max-lines", type=int, default=50, help="rejected rows to list")
+    imp.set_defaults(func=cmd_import)
+
+    stats = commands.add_parser("stats", help="inventory counts and aging")
+    stats.add_argument("--since", help="count sales from this date (YYYY-MM-DD)")
+    stats.add_argument("--json", action="store_true")
+    stats.set_defaults(func=cmd_stats)
+
+    warranties = commands.add_parser("refresh-warranties", help="recompute stored warranties")
+    warranties.add_argument("--year", type=int, help="reference year (default: this year)")
+    warranties.set_defaults(func=cmd_refresh_warranties)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    db = VehicleDatabase(args.db)
+    try:
+        return args.func(db, args)
+    except (ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+import math
+import sys
+import customtkinter as ctk
+from models import STATUSES, LOCATIONS
+
+
+class GridSeparator:
+    """Marker item that renders as a full-width separator row in the grid."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+# -------------------------------
+# RECONCILIATION
+# -------------------------------
+def item_key(item):
+    """Stable identity of a grid item across refreshes."""
+    if isinstance(item, GridSeparator):
+        return ("separator", item.text)
+    return item.id
+
+
+def item_signature(item):
+    """Tuple of everything a row displays; rows are only rebound when it changes."""
+    if isinstance(item, GridSeparator):
+        return (item.text,)
+    return (item.stock_number, item.make, item.model, item.year, item.status, item.location)
+
+
+def diff_items(old_positions, old_signatures, new_items):
+    """
+    Compare the previous render with a new ordered item list.
+    :param old_positions: {key: index} from the previous render
+    :param old_signatures: {key: signature} from the previous render
+    :param new_items: new ordered list of items
+    :return: dict of key sets: added, removed, changed, moved
+    """
+    added, changed, moved = set(), set(), set()
+    seen = set()
+
+    for index, item in enumerate(new_items):
+        key = item_key(item)
+        seen.add(key)
+        old_index = old_positions.get(key)
+        if old_index is None:
+            added.add(key)
+            continue
+        if old_signatures.get(key) != item_signature(item):
+            changed.add(key)
+        if old_index != index:
+            moved.add(key)
+
+    removed = set(old_positions) - seen
+    return {"added": added, "removed": removed, "changed": changed, "moved": moved}
+
+
+class VehicleGridRow(ctk.CTkFrame):
+    """
+    One recyclable row of the vehicle grid.
+    The widgets are created once and rebound to a different vehicle
+    (or a separator) as the grid scrolls.
+    """
+
+    STATUS_VALUES = list(STATUSES)
+    LOCATION_VALUES = list(LOCATIONS)
+
+    def __init__(self, grid, row_height):
+        super().__init__(grid.viewport, height=row_height, corner_radius=0, fg_color="transparent")
+        self.grid_propagate(False)
+        self.owner = grid
+        self.item = None
+        self.key = None
+        self.signature = None
+
+        for col, minw in enumerate(grid.col_widths):
+            self.grid_columnconfigure(col, weight=1, minsize=minw, uniform="fullwidth")
+        self.grid_rowconfigure(0, weight=1)
+
+        # -------------------------------
+        # TEXT COLUMNS
+        # -------------------------------
+        self.text_labels = []
+        for col in range(4):
+            lbl = ctk.CTkLabel(self, text="", font=grid.row_font)
+            lbl.grid(row=0, column=col, padx=8, sticky="w")
+            self.text_labels.append(lbl)
+
+        # -------------------------------
+        # STATUS / LOCATION DROPDOWNS
+        # -------------------------------
+        # Dropdowns use command= instead of variable traces, so rebinding
+        # a row with .set() never fires a change callback.
+        self.status_menu = ctk.CTkOptionMenu(
+            self,
+            values=self.STATUS_VALUES,
+            width=grid.dropdown_w,
+            command=self._status_selected
+        )
+        self.status_menu.grid(row=0, column=4, padx=8, sticky="w")
+
+        self.location_menu = ctk.CTkOptionMenu(
+            self,
+            values=self.LOCATION_VALUES,
+            width=grid.dropdown_w,
+            command=self._location_selected
+        )
+        self.location_menu.grid(row=0, column=5, padx=8, sticky="w")
+
+        # -------------------------------
+        # NOTES BUTTON
+        # -------------------------------
+        self.notes_btn = ctk.CTkButton(
+            self,
+            text="Notes",
+            width=grid.notes_w,
+            command=self._notes_clicked
+        )
+        self.notes_btn.grid(row=0, column=6, padx=(0, grid.notes_pad_right), sticky="w")
+
+        self.vehicle_widgets = self.text_labels + [self.status_menu, self.location_menu, self.notes_btn]
+
+        # -------------------------------
+        # SEPARATOR LABEL (hidden until bound to a separator)
+        # -------------------------------
+        self.sep_label = ctk.CTkLabel(
+            self,
+            text="",
+            text_color="blue",
+            font=ctk.CTkFont(size=12, weight="bold")
+        )
+        self.sep_label.grid(row=0, column=0, columnspan=len(grid.col_widths), sticky="ew")
+        self.sep_label.grid_remove()
+        self.showing_separator = False
+
+    # -------------------------------
+    # BINDING
+    # -------------------------------
+    def bind_item(self, item):
+        """
+        Point this row at a Vehicle or a GridSeparator.
+        Does nothing if the row already shows the same item with the same values.
+        """
+        key, signature = item_key(item), item_signature(item)
+        self.item = item
+        if key == self.key and signature == self.signature:
+            return
+        self.key, self.signature = key, signature
+
+        if isinstance(item, GridSeparator):
+            if not self.showing_separator:
+                for widget in self.vehicle_widgets:
+                    widget.grid_remove()
+                self.sep_label.grid()
+                self.showing_separator = True
+            self.sep_label.configure(text=item.text)
+            return
+
+        if self.showing_separator:
+            self.sep_label.grid_remove()
+            for widget in self.vehicle_widgets:
+                widget.grid()
+            self.showing_separator = False
+
+        texts = [item.stock_number, item.make, item.model, item.year or ""]
+        for lbl, text in zip(self.text_labels, texts):
+            lbl.configure(text=text)
+
+        self.status_menu.set(item.status)
+        self.location_menu.set(item.location)
+
+    # -------------------------------
+    # CALLBACKS
+    # -------------------------------
+    def unbind_item(self):
+        self.item = self.key = self.signature = None
+
+    def _status_selected(self, value):
+        if self.owner.on_status_change and not isinstance(self.item, GridSeparator):
+            self.owner.on_status_change(self.item, value)
+
+    def _location_selected(self, value):
+        if self.owner.on_location_change and not isinstance(self.item, GridSeparator):
+            self.owner.on_location_change(self.item, value)
+
+    def _notes_clicked(self):
+        if self.owner.on_notes and not isinstance(self.item, GridSeparator):
+            self.owner.on_notes(self.item)
+
+
+class VehicleGrid(ctk.CTkFrame):
+    """
+    Virtualized vehicle list.
+    Keeps a fixed pool of VehicleGridRow widgets sized to the viewport and
+    rebinds them to the visible slice of items on scroll, so painting and
+    scrolling cost the same no matter how many vehicles are loaded.
+    Refreshes are diffed against the previous render, so a single edit only
+    touches the rows that actually changed.
+    """
+
+    def __init__(self, master, col_widths, row_font, row_height=44, dropdown_w=90,
+                 notes_w=60, notes_pad_right=12, on_status_change=None,
+                 on_location_change=None, on_notes=None, **kwargs):
+        super().__init__(master, **kwargs)
+
+        self.col_widths = col_widths
+        self.row_font = row_font
+        self.row_height = row_height
+        self.dropdown_w = dropdown_w
+        self.notes_w = notes_w
+        self.notes_pad_right = notes_pad_right
+
+        self.on_status_change = on_status_change
+        self.on_location_change = on_location_change
+        self.on_notes = on_notes
+
+        self.items = []
+        self.positions = {}   # key -> index in self.items
+        self.signatures = {}  # key -> signature at last set_items / refresh_item
+        self.pool = []
+        self.offset = 0  # scroll position in (unscaled) pixels
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent", corner_radius=0)
+        self.viewport.grid(row=0, column=0, sticky="nsew")
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.viewport.bind("<Configure>", self._on_resize)
+        self.bind_all("<MouseWheel>", self._on_mousewheel, add="+")
+        self.bind_all("<Button-4>", self._on_mousewheel, add="+")
+        self.bind_all("<Button-5>", self._on_mousewheel, add="+")
+
+    # -------------------------------
+    # PUBLIC API
+    # -------------------------------
+    def set_items(self, items):
+        """
+        Reconcile the grid with a new ordered list of items (Vehicle records / GridSeparator).
+        Only visible rows whose item was added, removed, changed or moved are rebound.
+        :return: the diff (see diff_items)
+        """
+        items = list(items)
+        diff = diff_items(self.positions, self.signatures, items)
+
+        self.items = items
+        self.positions = {item_key(item): index for index, item in enumerate(items)}
+        self.signatures = {item_key(item): item_signature(item) for item in items}
+
+        self.offset = min(self.offset, self._max_offset())
+        self._render()
+        return diff
+
+    def refresh_item(self, item):
+        """Repaint a single item in place (if it is currently visible)."""
+        key = item_key(item)
+        if key not in self.positions:
+            return
+        self.signatures[key] = item_signature(item)
+        for row in self.pool:
+            if row.key == key:
+                row.bind_item(item)
+                break
+
+    def scroll_to(self, index):
+        """Scroll so the item at index is the first visible row."""
+        self.offset = max(0, min(index * self.row_height, self._max_offset()))
+        self._render()
+
+    # -------------------------------
+    # GEOMETRY
+    # -------------------------------
+    def _viewport_height(self):
+        return self.viewport._reverse_widget_scaling(self.viewport.winfo_height())
+
+    def _max_offset(self):
+        return max(0, len(self.items) * self.row_height - self._viewport_height())
+
+    def _ensure_pool(self):
+        """Grow the row pool so it can cover the viewport plus one partial row."""
+        needed = math.ceil(self._viewport_height() / self.row_height) + 1
+        while len(self.pool) < needed:
+            self.pool.append(VehicleGridRow(self, self.row_height))
+
+    # -------------------------------
+    # RENDERING
+    # -------------------------------
+    def _render(self):
+        self._ensure_pool()
+
+        first = int(self.offset // self.row_height)
+        shift = self.offset - first * self.row_height
+
+        for slot, row in enumerate(self.pool):
+            index = first + slot
+            if index < len(self.items):
+                row.bind_item(self.items[index])
+                row.place(x=0, y=slot * self.row_height - shift, relwidth=1)
+            elif row.item is not None:
+                row.unbind_item()
+                row.place_forget()
+
+        total = len(self.items) * self.row_height
+        if total <= 0:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total,
+                               min(1.0, (self.offset + self._viewport_height()) / total))
+
+    # -------------------------------
+    # EVENTS
+    # -------------------------------
+    def _on_resize(self, event=None):
+        self.offset = min(self.offset, self._max_offset())
+        self._render()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.offset = float(value) * len(self.items) * self.row_height
+        elif action == "scroll":
+            step = self.row_height if unit == "units" else self._viewport_height()
+            self.offset += int(value) * step
+        self.offset = max(0, min(self.offset, self._max_offset()))
+        self._render()
+
+    def _on_mousewheel(self, event):
+        if not self._contains(event.widget):
+            return
+        if sys.platform.startswith("win"):
+            delta = -int(event.delta / 40)
+        elif sys.platform == "darwin":
+            delta = -event.delta
+        else:
+            delta = -1 if event.num == 4 else 1
+        self._on_scrollbar("scroll", delta, "units")
+
+    def _contains(self, widget):
+        """True if widget lives inside this grid's viewport."""
+        while widget is not None:
+            if widget is self.viewport:
+                return True
+            widget = getattr(widget, "master", None)
+        return False